@@ -1,10 +1,24 @@
+import csv
+from datetime import datetime, timezone
+import functools
+import io
+import math
+import os
+import threading
+import time
+from typing import Callable, Iterator
+
 from dotenv import load_dotenv
 from flask import Flask, jsonify, make_response, Response, request
+from flask.logging import default_handler
 # from flask_cors import CORS
 
-from meal_max.models import kitchen_model
+from meal_max.models import arena_model, import_model, kitchen_model, simulation_model, tournament_model
 from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.utils.http_utils import compress_response, create_json_provider
+from meal_max.utils.logger import configure_logger, get_log_stats
+from meal_max.utils.random_utils import get_entropy_pool
+from meal_max.utils.sql_utils import check_database_connection, check_table_exists, configure_database, get_pool_stats
 
 
 # Load environment variables from .env file
@@ -16,8 +30,72 @@ app = Flask(__name__)
 # uncomment this
 # CORS(app)
 
-# Initialize the BattleModel
+# Route logs propagate to the same root handler as the models (a queue in LOG_MODE=queue),
+# so Flask's own stderr handler would print every line twice. The level comes from LOG_LEVEL
+# and LOG_LEVELS like any other logger; left unset it would inherit the root's WARNING.
+configure_logger(app.logger)
+app.logger.removeHandler(default_handler)
+
+# Serialize responses with orjson (JSON_PROVIDER) and compress large ones for clients that
+# accept it (COMPRESSION_ALGORITHMS, COMPRESSION_MIN_SIZE)
+app.json = create_json_provider(app)
+app.after_request(lambda response: compress_response(request, response))
+
+# Apply the database profile (WAL and tuning pragmas) and bring the schema up to date
+# before serving any requests
+configure_database()
+kitchen_model.migrate_meals_table()
+
+# Serve the leaderboard from memory. Every process keeps its own copy, so only enable this
+# when a single process writes to the database.
+if os.getenv("IN_MEMORY_LEADERBOARD", "true").lower() == "true":
+    kitchen_model.load_leaderboard()
+
+# Initialize the BattleModel shared by the /api/battle routes. Clients that need their own
+# combatants should use an arena instead.
 battle_model = BattleModel()
+battle_model_lock = threading.Lock()
+
+# Answer repeated reads of unchanged data with 304 Not Modified. The data version is counted
+# per process, so only enable this when a single process writes to the database.
+CONDITIONAL_GET = os.getenv("CONDITIONAL_GET", "true").lower() == "true"
+
+
+def conditional(view: Callable[..., Response]) -> Callable[..., Response]:
+    """
+    Adds ETag and Last-Modified validators, derived from the meals table's data version, to a
+    read-only route, and answers If-None-Match / If-Modified-Since with 304 before the route runs.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs) -> Response:
+        if not CONDITIONAL_GET:
+            return view(*args, **kwargs)
+
+        # Read the version before the data: a write landing in between makes the ETag older
+        # than the body, which only costs the client a full response next time
+        etag, modified = kitchen_model.get_data_version()
+
+        # HTTP dates have one-second resolution. While the data changed within the current
+        # second, a later write in that same second would carry the same date, so only the
+        # ETag is sent until the second has passed.
+        last_modified = None
+        if math.floor(modified) < math.floor(time.time()):
+            last_modified = datetime.fromtimestamp(math.floor(modified), timezone.utc)
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = (last_modified is not None and request.if_modified_since is not None
+                            and last_modified <= request.if_modified_since)
+
+        response = make_response('', 304) if not_modified else view(*args, **kwargs)
+        if response.status_code in (200, 304):
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+        return response
+    return wrapper
+
 
 ####################################################
 #
@@ -58,6 +136,29 @@ def db_check() -> Response:
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
 
+@app.route('/api/stats', methods=['GET'])
+def stats() -> Response:
+    """
+    Route to get runtime metrics of the service, such as connection pool usage and cache hit rates.
+
+    Returns:
+        JSON response with the current metrics.
+    """
+    try:
+        app.logger.info("Retrieving service stats")
+        return make_response(jsonify({
+            'status': 'success',
+            'db_pool': get_pool_stats(),
+            'meal_cache': kitchen_model.get_meal_cache_stats(),
+            'single_flight': kitchen_model.get_single_flight_stats(),
+            'random_pool': get_entropy_pool().stats(),
+            'arenas': arena_model.get_arena_store().stats(),
+            'logging': get_log_stats(),
+        }), 200)
+    except Exception as e:
+        app.logger.error(f"Error retrieving stats: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ##########################################################
 #
@@ -115,6 +216,71 @@ def add_meal() -> Response:
         app.logger.error("Failed to add combatant: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/create-meals', methods=['POST'])
+def add_meals() -> Response:
+    """
+    Route to add many meals to the database in a single transaction.
+
+    Expected JSON Input:
+        - meals (list): The meals to add, each with the same fields as /api/create-meal.
+
+    Returns:
+        JSON response with the number of meals created and the rows that were rejected.
+    Raises:
+        400 error if the request body is not a list of meals.
+        500 error if there is an issue adding the meals to the database.
+    """
+    app.logger.info('Creating meals in bulk')
+    try:
+        data = request.get_json()
+        meals = data.get('meals') if isinstance(data, dict) else None
+
+        if not isinstance(meals, list):
+            return make_response(jsonify({'error': 'Invalid input, expected a list of meals'}), 400)
+
+        result = kitchen_model.create_meals(meals)
+
+        app.logger.info("Meals added: %d, rejected: %d", result['created'], len(result['errors']))
+        return make_response(jsonify({'status': 'success', **result}), 201)
+    except Exception as e:
+        app.logger.error("Failed to add meals: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/import-meals', methods=['POST'])
+def import_meals() -> Response:
+    """
+    Route to stream a large catalog dump into the database.
+
+    The request body is read incrementally (chunked uploads are supported) and committed in
+    bounded batches, so memory use does not depend on the size of the upload.
+
+    Query Parameters:
+        - format (str): 'ndjson' or 'csv'. Defaults to 'csv' for a text/csv body, 'ndjson' otherwise.
+        - batch_size (int): The number of rows committed per transaction.
+
+    Returns:
+        JSON response with the number of rows processed, created and rejected.
+    Raises:
+        400 error if the format or batch size is invalid.
+        500 error if there is an issue importing the meals.
+    """
+    try:
+        fmt = request.args.get('format', 'csv' if request.mimetype == 'text/csv' else 'ndjson')
+        try:
+            batch_size = int(request.args.get('batch_size', kitchen_model.MEAL_BATCH_SIZE))
+        except ValueError:
+            return make_response(jsonify({'error': 'batch_size must be an integer'}), 400)
+        if fmt not in import_model.IMPORT_FORMATS or batch_size < 1:
+            return make_response(jsonify({'error': 'Invalid format or batch_size'}), 400)
+
+        app.logger.info("Importing meals from %s upload", fmt)
+        summary = import_model.import_meals(request.stream, fmt=fmt, batch_size=batch_size)
+
+        return make_response(jsonify({'status': 'success', **summary}), 200)
+    except Exception as e:
+        app.logger.error("Failed to import meals: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-meals', methods=['DELETE'])
 def clear_catalog() -> Response:
     """
@@ -152,6 +318,7 @@ def delete_meal(meal_id: int) -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
+@conditional
 def get_meal_by_id(meal_id: int) -> Response:
     """
     Route to get a meal by its ID.
@@ -160,12 +327,19 @@ def get_meal_by_id(meal_id: int) -> Response:
         - meal_id (int): The ID of the meal.
 
     Returns:
-        JSON response with the meal details or error message.
+        JSON response with the meal details or error message, or 304 if the client's copy
+        (If-None-Match / If-Modified-Since) is still current.
+    Raises:
+        404 error if the meal does not exist or has been deleted.
+        500 error if there is an issue retrieving the meal.
     """
     try:
         app.logger.info(f"Retrieving meal by ID: {meal_id}")
 
-        meal = kitchen_model.get_meal_by_id(meal_id)
+        try:
+            meal = kitchen_model.get_meal_by_id(meal_id)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 404)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving meal by ID: {e}")
@@ -181,6 +355,9 @@ def get_meal_by_name(meal_name: str) -> Response:
 
     Returns:
         JSON response with the meal details or error message.
+    Raises:
+        404 error if the meal does not exist or has been deleted.
+        500 error if there is an issue retrieving the meal.
     """
     try:
         app.logger.info(f"Retrieving meal by name: {meal_name}")
@@ -188,12 +365,91 @@ def get_meal_by_name(meal_name: str) -> Response:
         if not meal_name:
             return make_response(jsonify({'error': 'Meal name is required'}), 400)
 
-        meal = kitchen_model.get_meal_by_name(meal_name)
+        try:
+            meal = kitchen_model.get_meal_by_name(meal_name)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 404)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
         app.logger.error(f"Error retrieving meal by name: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/meals/lookup', methods=['POST'])
+def lookup_meals() -> Response:
+    """
+    Route to look up many meals at once by ID and/or name, with one database query per kind.
+
+    Expected JSON Input:
+        - ids (list of int, optional): The meal IDs to look up.
+        - names (list of str, optional): The meal names to look up.
+
+    Returns:
+        JSON response with the 'found' meals (those found by ID first, each meal once), and the
+        IDs and names of meals that are 'deleted' or 'missing'.
+    Raises:
+        400 error if neither list is given, either is malformed, or either is too long.
+        500 error if there is an issue looking up the meals.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or ('ids' not in data and 'names' not in data):
+            return make_response(jsonify({'error': 'Invalid input, expected ids and/or names'}), 400)
+
+        meal_ids = data.get('ids') or []
+        meal_names = data.get('names') or []
+        if not isinstance(meal_ids, list) or not isinstance(meal_names, list):
+            return make_response(jsonify({'error': 'ids and names must be lists'}), 400)
+
+        app.logger.info("Looking up %d meals by ID and %d by name", len(meal_ids), len(meal_names))
+        try:
+            by_id = kitchen_model.get_meals_by_ids(meal_ids)
+            by_name = kitchen_model.get_meals_by_names(meal_names)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        found = {meal.id: meal for meal in by_id['found'] + by_name['found']}
+        return make_response(jsonify({
+            'status': 'success',
+            'found': list(found.values()),
+            'deleted': {'ids': by_id['deleted'], 'names': by_name['deleted']},
+            'missing': {'ids': by_id['missing'], 'names': by_name['missing']},
+        }), 200)
+    except Exception as e:
+        app.logger.error(f"Error looking up meals: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/find-opponents/<int:meal_id>', methods=['GET'])
+def find_opponents(meal_id: int) -> Response:
+    """
+    Route to find the meals with the closest battle score to a given meal.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal.
+
+    Query Parameters:
+        - limit (int): The number of opponents to return. Default is 5.
+
+    Returns:
+        JSON response with the closest matched meals, closest first.
+    Raises:
+        400 error if the limit is invalid.
+        500 error if there is an issue finding opponents.
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', 5))
+        except ValueError:
+            return make_response(jsonify({'error': 'limit must be an integer'}), 400)
+        if limit < 1:
+            return make_response(jsonify({'error': 'limit must be a positive integer'}), 400)
+
+        app.logger.info("Finding %d opponents for meal %s", limit, meal_id)
+        opponents = kitchen_model.find_opponents(meal_id, limit)
+        return make_response(jsonify({'status': 'success', 'opponents': opponents}), 200)
+    except Exception as e:
+        app.logger.error(f"Error finding opponents: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ############################################################
 #
@@ -215,7 +471,8 @@ def battle() -> Response:
     try:
         app.logger.info('Two meals enter, one meal leaves!')
 
-        winner = battle_model.battle()
+        with battle_model_lock:
+            winner = battle_model.battle()
 
         return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
     except Exception as e:
@@ -234,7 +491,8 @@ def clear_combatants() -> Response:
     """
     try:
         app.logger.info('Clearing all combatants...')
-        battle_model.clear_combatants()
+        with battle_model_lock:
+            battle_model.clear_combatants()
         app.logger.info('Combatants cleared.')
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
@@ -251,7 +509,8 @@ def get_combatants() -> Response:
     """
     try:
         app.logger.info('Getting combatants...')
-        combatants = battle_model.get_combatants()
+        with battle_model_lock:
+            combatants = list(battle_model.get_combatants())
         return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
     except Exception as e:
         app.logger.error("Failed to get combatants: %s", str(e))
@@ -280,8 +539,9 @@ def prep_combatant() -> Response:
 
         try:
             meal = kitchen_model.get_meal_by_name(meal)
-            battle_model.prep_combatant(meal)
-            combatants = battle_model.get_combatants()
+            with battle_model_lock:
+                battle_model.prep_combatant(meal)
+                combatants = list(battle_model.get_combatants())
         except Exception as e:
             app.logger.error("Failed to prepare combatant: %s", str(e))
             return make_response(jsonify({'error': str(e)}), 500)
@@ -291,6 +551,255 @@ def prep_combatant() -> Response:
         app.logger.error("Failed to prepare combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/tournament', methods=['POST'])
+def run_tournament() -> Response:
+    """
+    Route to run a whole tournament server-side and record every result in one batch.
+
+    Expected JSON Input:
+        - meal_ids (list): The IDs of the entrants, in seeding order.
+        - format (str): 'single_elimination' (default), 'round_robin' or 'swiss'.
+        - rounds (int, optional): The number of rounds of a Swiss tournament, at most one fewer than the meals.
+
+    Returns:
+        JSON response with the champion, the bouts of every round and the final standings.
+    Raises:
+        400 error if the input is invalid or a meal cannot enter.
+        500 error if there is an issue running the tournament.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict) or not isinstance(data.get('meal_ids'), list):
+            return make_response(jsonify({'error': 'Invalid input, expected a list of meal_ids'}), 400)
+
+        meal_ids = data['meal_ids']
+        fmt = data.get('format', 'single_elimination')
+        rounds = data.get('rounds')
+
+        def is_int(value) -> bool:
+            # bool is a subclass of int, so true/false would otherwise pass as meal IDs
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        if not all(is_int(meal_id) for meal_id in meal_ids) or (rounds is not None and not is_int(rounds)):
+            return make_response(jsonify({'error': 'meal_ids and rounds must be integers'}), 400)
+
+        app.logger.info("Running %s tournament with %d meals", fmt, len(meal_ids))
+        try:
+            result = tournament_model.run_tournament(meal_ids, fmt, rounds)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', **result}), 200)
+    except Exception as e:
+        app.logger.error("Tournament error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/simulate', methods=['POST'])
+def simulate() -> Response:
+    """
+    Route to estimate battle outcomes in bulk without recording any results.
+
+    Expected JSON Input:
+        - meal_ids (list, optional): The meals to simulate. Defaults to every meal.
+        - pairs (list, optional): [first, second] meal ID pairings. Defaults to every pair of meals.
+        - trials (int, optional): The number of battles simulated per pairing. Default is 1000.
+        - seed (int, optional): Seed for reproducible results.
+
+    Returns:
+        JSON response with each meal's expected and simulated wins.
+    Raises:
+        400 error if the input is invalid or a meal cannot be simulated.
+        500 error if there is an issue running the simulation.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        meal_ids = data.get('meal_ids')
+        pairs = data.get('pairs')
+        trials = data.get('trials', 1000)
+        seed = data.get('seed')
+
+        def is_int(value) -> bool:
+            # bool is a subclass of int, so true/false would otherwise pass as meal IDs
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        def is_id_list(value) -> bool:
+            return isinstance(value, list) and all(is_int(item) for item in value)
+
+        if meal_ids is not None and not is_id_list(meal_ids):
+            return make_response(jsonify({'error': 'meal_ids must be a list of integers'}), 400)
+        if pairs is not None and not (isinstance(pairs, list) and
+                                      all(is_id_list(pair) and len(pair) == 2 for pair in pairs)):
+            return make_response(jsonify({'error': 'pairs must be a list of [meal_id, meal_id] pairs'}), 400)
+        if not is_int(trials) or (seed is not None and not is_int(seed)):
+            return make_response(jsonify({'error': 'trials and seed must be integers'}), 400)
+
+        app.logger.info("Running simulation with %d trials per pairing", trials)
+        try:
+            result = simulation_model.simulate(meal_ids, pairs, trials, seed)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', **result}), 200)
+    except Exception as e:
+        app.logger.error("Simulation error: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
+############################################################
+#
+# Arenas
+#
+############################################################
+
+
+@app.route('/api/arenas', methods=['POST'])
+def create_arena() -> Response:
+    """
+    Route to create an arena, an independent battle with its own combatants.
+
+    Returns:
+        JSON response with the new arena's ID.
+    Raises:
+        503 error if too many arenas are in use.
+    """
+    try:
+        arena_id = arena_model.get_arena_store().create()
+        return make_response(jsonify({'status': 'success', 'arena_id': arena_id}), 201)
+    except RuntimeError as e:
+        app.logger.error("Failed to create arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 503)
+    except Exception as e:
+        app.logger.error("Failed to create arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>', methods=['DELETE'])
+def delete_arena(arena_id: str) -> Response:
+    """
+    Route to remove an arena once it is no longer needed.
+
+    Raises:
+        404 error if the arena does not exist or has expired.
+    """
+    try:
+        arena_model.get_arena_store().delete(arena_id)
+        return make_response(jsonify({'status': 'success'}), 200)
+    except KeyError:
+        return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+    except Exception as e:
+        app.logger.error("Failed to delete arena: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/prep-combatant', methods=['POST'])
+def prep_arena_combatant(arena_id: str) -> Response:
+    """
+    Route to prepare a meal as a combatant in an arena.
+
+    Parameters:
+        - meal (str): The name of the meal
+
+    Returns:
+        JSON response with the arena's combatants.
+    Raises:
+        400 error if no meal is named or the arena is full.
+        404 error if the arena does not exist or has expired.
+        503 error if the arena is busy in another worker for too long.
+        500 error if there is an issue preparing the combatant.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        meal = data.get('meal')
+        if not meal:
+            return make_response(jsonify({'error': 'You must name a combatant'}), 400)
+
+        app.logger.info("Preparing combatant %s in arena %s", meal, arena_id)
+        meal = kitchen_model.get_meal_by_name(meal)
+        with arena_model.get_arena_store().use(arena_id) as arena:
+            try:
+                arena.prep_combatant(meal)
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            combatants = list(arena.get_combatants())
+
+        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+    except KeyError:
+        return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+    except RuntimeError as e:
+        return make_response(jsonify({'error': str(e)}), 503)
+    except Exception as e:
+        app.logger.error("Failed to prepare arena combatant: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/combatants', methods=['GET'])
+def get_arena_combatants(arena_id: str) -> Response:
+    """
+    Route to get the combatants of an arena.
+
+    Raises:
+        404 error if the arena does not exist or has expired.
+        503 error if the arena is busy in another worker for too long.
+    """
+    try:
+        with arena_model.get_arena_store().use(arena_id) as arena:
+            combatants = list(arena.get_combatants())
+        return make_response(jsonify({'status': 'success', 'combatants': combatants}), 200)
+    except KeyError:
+        return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+    except RuntimeError as e:
+        return make_response(jsonify({'error': str(e)}), 503)
+    except Exception as e:
+        app.logger.error("Failed to get arena combatants: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/clear-combatants', methods=['POST'])
+def clear_arena_combatants(arena_id: str) -> Response:
+    """
+    Route to clear the combatants of an arena.
+
+    Raises:
+        404 error if the arena does not exist or has expired.
+        503 error if the arena is busy in another worker for too long.
+    """
+    try:
+        with arena_model.get_arena_store().use(arena_id) as arena:
+            arena.clear_combatants()
+        return make_response(jsonify({'status': 'success'}), 200)
+    except KeyError:
+        return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+    except RuntimeError as e:
+        return make_response(jsonify({'error': str(e)}), 503)
+    except Exception as e:
+        app.logger.error("Failed to clear arena combatants: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/arenas/<string:arena_id>/battle', methods=['GET', 'POST'])
+def arena_battle(arena_id: str) -> Response:
+    """
+    Route to battle the two meals prepared in an arena.
+
+    Returns:
+        JSON response with the winner.
+    Raises:
+        400 error if two combatants are not prepared.
+        404 error if the arena does not exist or has expired.
+        503 error if the arena is busy in another worker for too long.
+        500 error if there is an issue during the battle.
+    """
+    try:
+        app.logger.info("Battle in arena %s", arena_id)
+        with arena_model.get_arena_store().use(arena_id) as arena:
+            try:
+                winner = arena.battle()
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+        return make_response(jsonify({'status': 'success', 'winner': winner}), 200)
+    except KeyError:
+        return make_response(jsonify({'error': f"Arena {arena_id} not found"}), 404)
+    except RuntimeError as e:
+        return make_response(jsonify({'error': str(e)}), 503)
+    except Exception as e:
+        app.logger.error(f"Arena battle error: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 
 ############################################################
 #
@@ -299,30 +808,138 @@ def prep_combatant() -> Response:
 ############################################################
 
 
+def stream_leaderboard(sort_by: str, fmt: str) -> Response:
+    """
+    Streams the whole leaderboard as NDJSON or CSV, one chunk per batch of rows read from the
+    database, so the server never holds more than one batch.
+    """
+    if fmt not in ('ndjson', 'csv'):
+        return make_response(jsonify({'error': f"Invalid stream format: {fmt}. Must be 'ndjson' or 'csv'."}), 400)
+
+    try:
+        batches = kitchen_model.stream_leaderboard(sort_by)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+
+    def generate_ndjson() -> Iterator[str]:
+        for batch in batches:
+            yield "".join(f"{app.json.dumps(entry)}\n" for entry in batch)
+
+    def generate_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=kitchen_model.LEADERBOARD_COLUMNS.split(", "))
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Nobody has battled yet: send the header on its own
+            yield buffer.getvalue()
+
+    if fmt == 'ndjson':
+        return Response(generate_ndjson(), mimetype='application/x-ndjson')
+    response = Response(generate_csv(), mimetype='text/csv')
+    response.headers['Content-Disposition'] = 'attachment; filename=leaderboard.csv'
+    return response
+
 @app.route('/api/leaderboard', methods=['GET'])
+@conditional
 def get_leaderboard() -> Response:
     """
-    Route to get the leaderboard of meals sorted by wins, battles, or win percentage.
+    Route to get the leaderboard of meals sorted by wins or win percentage.
 
     Query Parameters:
-        - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - sort (str): The field to sort by ('wins' or 'win_pct'). Default is 'wins'.
+        - top (int): Only return the top N meals. Shorthand for limit=N.
+        - limit (int): The maximum number of meals to return.
+        - offset (int): The number of meals to skip.
+        - after_wins, after_id (int): Keyset cursor from the last meal of the previous page (sort=wins only).
+        - stream (str): Export the whole leaderboard as 'ndjson' (one meal per line) or 'csv',
+          streamed in chunks. Cannot be combined with the paging parameters.
 
     Returns:
-        JSON response with a sorted leaderboard of meals.
+        JSON response with a sorted leaderboard of meals. When the page is full and sorted by wins,
+        the response also contains the cursor for the next page. 304 if the client's copy
+        (If-None-Match / If-Modified-Since) is still current. With stream, the whole leaderboard
+        as NDJSON or CSV.
     Raises:
+        400 error if the paging or stream parameters are invalid.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
         app.logger.info("Generating leaderboard sorted by %s", sort_by)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
+        try:
+            paging = {name: int(request.args[name])
+                      for name in ('top', 'limit', 'offset', 'after_wins', 'after_id')
+                      if name in request.args}
+        except ValueError:
+            return make_response(jsonify({'error': 'Paging parameters must be integers'}), 400)
+
+        if 'stream' in request.args:
+            if paging:
+                return make_response(jsonify({'error': 'Paging parameters cannot be combined with stream'}), 400)
+            return stream_leaderboard(sort_by, request.args['stream'])
+
+        limit = paging.get('top', paging.get('limit'))
+        try:
+            leaderboard_data = kitchen_model.get_leaderboard(
+                sort_by,
+                limit=limit,
+                offset=paging.get('offset', 0),
+                after_wins=paging.get('after_wins'),
+                after_id=paging.get('after_id'),
+            )
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
 
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+        response = {'status': 'success', 'leaderboard': leaderboard_data}
+        if sort_by == 'wins' and limit is not None and len(leaderboard_data) == limit:
+            last = leaderboard_data[-1]
+            response['next_cursor'] = {'after_wins': last['wins'], 'after_id': last['id']}
+
+        return make_response(jsonify(response), 200)
     except Exception as e:
         app.logger.error(f"Error generating leaderboard: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/leaderboard/rank/<int:meal_id>', methods=['GET'])
+def get_leaderboard_rank(meal_id: int) -> Response:
+    """
+    Route to get the leaderboard rank of a single meal.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal.
+
+    Query Parameters:
+        - sort (str): The field to rank by ('wins' or 'win_pct'). Default is 'wins'.
+
+    Returns:
+        JSON response with the meal's leaderboard entry and rank.
+    Raises:
+        400 error if the sort parameter is invalid.
+        404 error if the meal is not on the leaderboard.
+        500 error if there is an issue computing the rank.
+    """
+    try:
+        sort_by = request.args.get('sort', 'wins')
+        app.logger.info("Retrieving leaderboard rank of meal %s sorted by %s", meal_id, sort_by)
+
+        if sort_by not in ('wins', 'win_pct'):
+            return make_response(jsonify({'error': f"Invalid sort parameter: {sort_by}"}), 400)
+
+        try:
+            entry = kitchen_model.get_leaderboard_rank(meal_id, sort_by)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 404)
+
+        return make_response(jsonify({'status': 'success', 'meal': entry}), 200)
+    except Exception as e:
+        app.logger.error(f"Error retrieving leaderboard rank: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,317 @@
+"""
+Async read and battle sidecar for app.py, served by uvicorn when SERVER_MODE=async.
+
+Requests are coroutines rather than threads, so one process can hold thousands of slow
+requests open. Blocking work (SQLite) runs on a bounded executor sized like the database pool,
+and random numbers come from the entropy pool without blocking the event loop. The routes share
+kitchen_model with app.py and return the same JSON.
+
+Only the high-traffic routes are served: health, stats, meal lookup by ID or name, battle and
+the leaderboard. Creating, deleting, clearing and importing meals, batch lookups, arenas,
+tournaments and simulations are only in app.py, so run it alongside for those.
+
+The in-memory leaderboard is per process, so entrypoint.sh refuses UVICORN_WORKERS above 1
+while IN_MEMORY_LEADERBOARD is enabled, as gunicorn.conf.py does for gunicorn.
+
+Run locally with:
+    uvicorn asgi:app --port 5000
+"""
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+
+from dotenv import load_dotenv
+
+# Load environment variables before the models read them
+load_dotenv()
+
+from meal_max.models import kitchen_model  # noqa: E402
+from meal_max.models.battle_model import first_combatant_wins  # noqa: E402
+from meal_max.utils.async_utils import BoundedExecutor  # noqa: E402
+from meal_max.utils.logger import configure_logger, get_log_stats  # noqa: E402
+from meal_max.utils.random_utils import draw_random_async  # noqa: E402
+from meal_max.utils.sql_utils import DB_POOL_SIZE, close_pool, configure_database, get_pool_stats  # noqa: E402
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Threads for blocking calls (matching the pool means they never wait for a connection), and
+# the most blocking calls that may be queued before requests are turned away with a 503
+ASYNC_DB_WORKERS = int(os.getenv("ASYNC_DB_WORKERS", str(DB_POOL_SIZE)))
+ASYNC_MAX_PENDING = int(os.getenv("ASYNC_MAX_PENDING", "10000"))
+
+# Largest request body accepted, in bytes. Larger bodies get a 413 and are not read any further.
+ASGI_MAX_BODY_SIZE = int(os.getenv("ASGI_MAX_BODY_SIZE", str(1024 * 1024)))
+
+executor = BoundedExecutor(ASYNC_DB_WORKERS, ASYNC_MAX_PENDING)
+
+
+@dataclasses.dataclass
+class Request:
+    method: str
+    params: Dict[str, str]
+    query: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body or b'null')
+
+
+Handler = Callable[[Request], Awaitable[Tuple[int, dict]]]
+routes: List[Tuple[str, re.Pattern, Handler]] = []
+
+
+def route(method: str, pattern: str) -> Callable[[Handler], Handler]:
+    """
+    Registers a handler for a method and a path pattern such as '/api/meals/<int:meal_id>'.
+    """
+    def group(match: re.Match) -> str:
+        converter, name = match.groups()
+        value = r'\d+' if converter == 'int' else r'[^/]+'
+        return f"(?P<{name}>{value})"
+
+    regex = re.sub(r'<(?:(int|string):)?(\w+)>', group, pattern)
+
+    def register(handler: Handler) -> Handler:
+        routes.append((method, re.compile(f'^{regex}$'), handler))
+        return handler
+    return register
+
+
+####################################################
+#
+# Healthchecks
+#
+####################################################
+
+
+@route('GET', '/api/health')
+async def healthcheck(request: Request) -> Tuple[int, dict]:
+    return 200, {'status': 'healthy'}
+
+@route('GET', '/api/stats')
+async def stats(request: Request) -> Tuple[int, dict]:
+    return 200, {
+        'status': 'success',
+        'db_pool': await executor.run(get_pool_stats),
+        'meal_cache': kitchen_model.get_meal_cache_stats(),
+        'single_flight': kitchen_model.get_single_flight_stats(),
+        'executor': executor.stats(),
+        'logging': get_log_stats(),
+    }
+
+
+##########################################################
+#
+# Meals
+#
+##########################################################
+
+
+@route('GET', '/api/get-meal-by-id/<int:meal_id>')
+async def get_meal_by_id(request: Request) -> Tuple[int, dict]:
+    try:
+        meal = await executor.run(kitchen_model.get_meal_by_id, int(request.params['meal_id']))
+    except ValueError as e:
+        return 404, {'error': str(e)}
+    return 200, {'status': 'success', 'meal': dataclasses.asdict(meal)}
+
+@route('GET', '/api/get-meal-by-name/<string:meal_name>')
+async def get_meal_by_name(request: Request) -> Tuple[int, dict]:
+    try:
+        meal = await executor.run(kitchen_model.get_meal_by_name, request.params['meal_name'])
+    except ValueError as e:
+        return 404, {'error': str(e)}
+    return 200, {'status': 'success', 'meal': dataclasses.asdict(meal)}
+
+
+############################################################
+#
+# Battle
+#
+############################################################
+
+
+@route('POST', '/api/battle')
+async def battle(request: Request) -> Tuple[int, dict]:
+    """
+    Battles two meals named in the request body, {"meal_1": ..., "meal_2": ...}.
+
+    Unlike /api/battle in app.py there are no prepared combatants to share between clients:
+    each request names both meals, so concurrent battles never interfere.
+    """
+    data = request.json()
+    if (not isinstance(data, dict)
+            or not data.get('meal_1') or not isinstance(data['meal_1'], str)
+            or not data.get('meal_2') or not isinstance(data['meal_2'], str)):
+        return 400, {'error': 'You must name two combatants, meal_1 and meal_2'}
+
+    try:
+        combatant_1, combatant_2 = await asyncio.gather(
+            executor.run(kitchen_model.get_meal_by_name, data['meal_1']),
+            executor.run(kitchen_model.get_meal_by_name, data['meal_2']),
+        )
+    except ValueError as e:
+        return 404, {'error': str(e)}
+    random_number = await draw_random_async(executor.run)
+
+    if first_combatant_wins(combatant_1.battle_score, combatant_2.battle_score, random_number):
+        winner, loser = combatant_1, combatant_2
+    else:
+        winner, loser = combatant_2, combatant_1
+
+    await executor.run(kitchen_model.record_battle_result, winner.id, loser.id)
+    return 200, {'status': 'success', 'winner': winner.meal}
+
+
+############################################################
+#
+# Leaderboard
+#
+############################################################
+
+
+@route('GET', '/api/leaderboard')
+async def get_leaderboard(request: Request) -> Tuple[int, dict]:
+    """
+    Pages through the leaderboard with the same query parameters as app.py (sort, top, limit,
+    offset and the after_wins/after_id cursor), without its stream export.
+    """
+    sort_by = request.query.get('sort', 'wins')
+    if sort_by not in ('wins', 'win_pct'):
+        return 400, {'error': f"Invalid sort parameter: {sort_by}"}
+    try:
+        paging = {name: int(request.query[name])
+                  for name in ('top', 'limit', 'offset', 'after_wins', 'after_id')
+                  if name in request.query}
+    except ValueError:
+        return 400, {'error': 'Paging parameters must be integers'}
+
+    limit = paging.get('top', paging.get('limit'))
+    leaderboard = await executor.run(
+        kitchen_model.get_leaderboard,
+        sort_by,
+        limit=limit,
+        offset=paging.get('offset', 0),
+        after_wins=paging.get('after_wins'),
+        after_id=paging.get('after_id'),
+    )
+
+    response = {'status': 'success', 'leaderboard': leaderboard}
+    if sort_by == 'wins' and limit is not None and len(leaderboard) == limit:
+        last = leaderboard[-1]
+        response['next_cursor'] = {'after_wins': last['wins'], 'after_id': last['id']}
+    return 200, response
+
+
+####################################################
+#
+# ASGI plumbing
+#
+####################################################
+
+
+async def _read_body(receive: Callable, limit: int) -> Optional[bytes]:
+    # Returns None as soon as the body grows past the limit; chunked bodies have no length up front
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+async def _send_json(send: Callable, status: int, payload: dict) -> None:
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+def _match(method: str, path: str) -> Tuple[Optional[Handler], Dict[str, str], bool]:
+    # Returns the handler, the path parameters, and whether the path exists for another method
+    path_exists = False
+    for route_method, regex, handler in routes:
+        match = regex.match(path)
+        if match:
+            if route_method == method:
+                return handler, {key: unquote(value) for key, value in match.groupdict().items()}, True
+            path_exists = True
+    return None, {}, path_exists
+
+async def _lifespan(receive: Callable, send: Callable) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                # Same startup as app.py
+                await executor.run(configure_database)
+                await executor.run(kitchen_model.migrate_meals_table)
+                if os.getenv("IN_MEMORY_LEADERBOARD", "true").lower() == "true":
+                    await executor.run(kitchen_model.load_leaderboard)
+            except Exception as e:
+                logger.error("Startup failed: %s", str(e))
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # uvicorn has already drained in-flight requests
+            executor.shutdown()
+            close_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope: dict, receive: Callable, send: Callable) -> None:
+    """
+    The ASGI application.
+    """
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    handler, params, path_exists = _match(scope['method'], scope['path'])
+    if handler is None:
+        await _send_json(send, 405 if path_exists else 404, {'error': 'Method not allowed' if path_exists else 'Not found'})
+        return
+
+    content_length = dict(scope.get('headers', [])).get(b'content-length', b'')
+    if content_length.isdigit() and int(content_length) > ASGI_MAX_BODY_SIZE:
+        await _send_json(send, 413, {'error': 'Request body too large'})
+        return
+    body = await _read_body(receive, ASGI_MAX_BODY_SIZE)
+    if body is None:
+        await _send_json(send, 413, {'error': 'Request body too large'})
+        return
+
+    query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    request = Request(scope['method'], params, query, body)
+
+    try:
+        status, payload = await handler(request)
+    except json.JSONDecodeError:
+        status, payload = 400, {'error': 'Invalid JSON body'}
+    except ValueError as e:
+        status, payload = 400, {'error': str(e)}
+    except RuntimeError as e:
+        logger.error("Request to %s failed: %s", scope['path'], str(e))
+        status, payload = 503, {'error': str(e)}
+    except Exception as e:
+        logger.error("Request to %s failed: %s", scope['path'], str(e))
+        status, payload = 500, {'error': str(e)}
+
+    await _send_json(send, status, payload)
@@ -0,0 +1,84 @@
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+
+def main() -> int:
+    """
+    Benchmarks the arena stores: every thread repeatedly creates an arena, preps two
+    combatants, battles and deletes the arena, against a throwaway database.
+
+    Usage:
+        python bench_arenas.py
+        python bench_arenas.py --stores sqlite --threads 16 --rounds 200
+    """
+    parser = argparse.ArgumentParser(description="Compare the throughput of the arena stores.")
+    parser.add_argument('--stores', nargs='+', default=['memory', 'sqlite'], choices=['memory', 'sqlite'])
+    parser.add_argument('--threads', type=int, default=8, help="The number of concurrent clients.")
+    parser.add_argument('--rounds', type=int, default=100, help="The number of arenas each client runs.")
+    args = parser.parse_args()
+
+    # Point the models at a scratch database and local randomness before they read their settings
+    workdir = tempfile.mkdtemp(prefix="meal_max_bench_")
+    os.environ.update({
+        'DB_PATH': os.path.join(workdir, 'meal_max.db'),
+        'RANDOM_SOURCE': 'local',
+        'IN_MEMORY_LEADERBOARD': 'false',
+    })
+    logging.disable(logging.INFO)
+
+    from meal_max.models import arena_model, kitchen_model
+    from meal_max.utils.sql_utils import get_db_connection
+
+    with get_db_connection() as conn:
+        with open(os.path.join(os.path.dirname(__file__), 'sql', 'create_meal_table.sql')) as fh:
+            conn.executescript(fh.read())
+    kitchen_model.create_meals([
+        {'meal': f"Meal {i}", 'cuisine': 'Bench', 'price': 5.0 + i, 'difficulty': 'LOW'} for i in range(2)
+    ])
+
+    print(f"{'store':<8} {'arenas/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in args.stores:
+        store = arena_model.create_arena_store(name)
+        latencies = []
+        latencies_lock = threading.Lock()
+
+        def client() -> None:
+            timings = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                arena_id = store.create()
+                for meal in ("Meal 0", "Meal 1"):
+                    with store.use(arena_id) as battle_model:
+                        battle_model.prep_combatant(kitchen_model.get_meal_by_name(meal))
+                with store.use(arena_id) as battle_model:
+                    battle_model.battle()
+                store.delete(arena_id)
+                timings.append(time.perf_counter() - start)
+            with latencies_lock:
+                latencies.extend(timings)
+
+        threads = [threading.Thread(target=client) for _ in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<8} {len(latencies) / elapsed:>10.1f} {statistics.median(latencies) * 1000:>8.2f} {p99 * 1000:>8.2f}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
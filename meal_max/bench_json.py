@@ -0,0 +1,65 @@
+import argparse
+import random
+import statistics
+import sys
+import time
+
+
+def main() -> int:
+    """
+    Benchmarks serializing and compressing a large leaderboard response: CPU time per JSON
+    provider, and bytes on the wire and CPU time per content encoding.
+
+    Usage:
+        python bench_json.py
+        python bench_json.py --rows 10000 --repeat 20
+    """
+    parser = argparse.ArgumentParser(description="Compare JSON providers and response encodings.")
+    parser.add_argument('--rows', type=int, default=100000, help="The number of leaderboard entries.")
+    parser.add_argument('--repeat', type=int, default=5, help="How many times to time each step.")
+    args = parser.parse_args()
+
+    from flask import Flask
+    from meal_max.models.kitchen_model import _leaderboard_entry
+    from meal_max.utils.http_utils import COMPRESSORS, create_json_provider
+
+    rng = random.Random(0)
+    cuisines = ["Italian", "Japanese", "Mexican", "Indian", "French", "Thai"]
+    leaderboard = []
+    for meal_id in range(1, args.rows + 1):
+        battles = rng.randint(1, 500)
+        wins = rng.randint(0, battles)
+        leaderboard.append(_leaderboard_entry((meal_id, f"Meal {meal_id}", rng.choice(cuisines),
+                                               round(rng.uniform(5, 40), 2), rng.choice(["LOW", "MED", "HIGH"]),
+                                               battles, wins, wins / battles)))
+    payload = {'status': 'success', 'leaderboard': leaderboard}
+
+    def timed(func):
+        timings, result = [], None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return result, statistics.median(timings) * 1000
+
+    app = Flask(__name__)
+    body = None
+    print(f"{args.rows} leaderboard entries")
+    print(f"{'provider':<10} {'bytes':>12} {'ms':>9}")
+    for name in ('default', 'orjson'):
+        provider = create_json_provider(app, name)
+        with app.app_context():
+            response, elapsed = timed(lambda: provider.response(payload))
+        body = response.get_data()
+        print(f"{name:<10} {len(body):>12} {elapsed:>9.1f}")
+
+    print(f"\n{'encoding':<10} {'bytes':>12} {'ms':>9} {'ratio':>7}")
+    print(f"{'identity':<10} {len(body):>12} {0:>9.1f} {1:>7.2f}")
+    for name, compress in COMPRESSORS.items():
+        compressed, elapsed = timed(lambda: compress(body))
+        print(f"{name:<10} {len(compressed):>12} {elapsed:>9.1f} {len(body) / len(compressed):>7.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
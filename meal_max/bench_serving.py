@@ -0,0 +1,73 @@
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def main() -> int:
+    """
+    Load-tests a running server: every client sends requests back to back over one
+    keep-alive connection for a fixed time, then throughput and latency are reported.
+
+    Usage:
+        python bench_serving.py http://localhost:5000/api/health
+        python bench_serving.py http://localhost:5000/api/leaderboard --clients 32 --duration 20
+    """
+    parser = argparse.ArgumentParser(description="Measure the throughput of a running meal_max server.")
+    parser.add_argument('url', help="The URL to request.")
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--clients', type=int, default=16, help="The number of concurrent connections.")
+    parser.add_argument('--duration', type=float, default=10, help="How long to run, in seconds.")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    path = url.path + (f"?{url.query}" if url.query else "")
+    deadline = time.monotonic() + args.duration
+    latencies, errors = [], []
+    results_lock = threading.Lock()
+
+    def client() -> None:
+        timings, failures = [], 0
+        conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request(args.method, path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failures += 1
+                timings.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException):
+                failures += 1
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        conn.close()
+        with results_lock:
+            latencies.extend(timings)
+            errors.append(failures)
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print("No request succeeded.", file=sys.stderr)
+        return 1
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"requests={len(latencies)} errors={sum(errors)} req/s={len(latencies) / elapsed:.1f} "
+          f"p50_ms={statistics.median(latencies) * 1000:.2f} p99_ms={p99 * 1000:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,5 +13,26 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
-exec python app.py
+# Start the Python application. SERVER_MODE=production serves it with gunicorn (see
+# gunicorn.conf.py); SERVER_MODE=async serves asgi.py with uvicorn, a read and battle
+# sidecar without the write, import, arena, tournament and simulation routes;
+# SERVER_MODE=dev uses the Flask development server with the debugger.
+# exec hands the process over so SIGTERM from `docker stop` reaches the server directly.
+if [ "${SERVER_MODE:-production}" = "dev" ]; then
+    echo "Starting the development server..."
+    exec python app.py
+elif [ "$SERVER_MODE" = "async" ]; then
+    # Each uvicorn worker would keep its own in-memory leaderboard, as with gunicorn.conf.py
+    in_memory_leaderboard="${IN_MEMORY_LEADERBOARD:-true}"
+    if [ "${UVICORN_WORKERS:-1}" -gt 1 ] && [ "${in_memory_leaderboard,,}" = "true" ]; then
+        echo "Error: IN_MEMORY_LEADERBOARD is enabled, so ${UVICORN_WORKERS} uvicorn workers would serve" \
+            "conflicting leaderboards. Run a single worker, or set IN_MEMORY_LEADERBOARD=false." >&2
+        exit 1
+    fi
+    echo "Starting uvicorn..."
+    exec uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers "${UVICORN_WORKERS:-1}" \
+        --timeout-graceful-shutdown "${GUNICORN_GRACEFUL_TIMEOUT:-30}"
+else
+    echo "Starting gunicorn..."
+    exec gunicorn --config gunicorn.conf.py app:app
+fi
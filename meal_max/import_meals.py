@@ -0,0 +1,49 @@
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables (DB_PATH and friends) before the models read them
+load_dotenv()
+
+from meal_max.models import import_model  # noqa: E402
+from meal_max.models.kitchen_model import MEAL_BATCH_SIZE  # noqa: E402
+
+
+def main() -> int:
+    """
+    Command line entry point that streams an NDJSON or CSV catalog dump into the meals database.
+
+    Usage:
+        python import_meals.py catalog.ndjson
+        python import_meals.py catalog.csv --batch-size 2000
+        cat catalog.ndjson | python import_meals.py - --format ndjson
+    """
+    parser = argparse.ArgumentParser(description="Import meals from an NDJSON or CSV file.")
+    parser.add_argument('path', help="The file to import, or - to read from stdin.")
+    parser.add_argument('--format', choices=import_model.IMPORT_FORMATS,
+                        help="The file format. Defaults to csv for .csv files and ndjson otherwise.")
+    parser.add_argument('--batch-size', type=int, default=MEAL_BATCH_SIZE,
+                        help="The number of rows committed per transaction.")
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.path.lower().endswith('.csv') else 'ndjson')
+
+    def report(progress: dict) -> None:
+        print("processed={processed} created={created} rejected={rejected}".format(**progress), file=sys.stderr)
+
+    if args.path == '-':
+        summary = import_model.import_meals(sys.stdin.buffer, fmt=fmt, batch_size=args.batch_size, progress=report)
+    else:
+        with open(args.path, 'rb') as fh:
+            summary = import_model.import_meals(fh, fmt=fmt, batch_size=args.batch_size, progress=report)
+
+    for error in summary['errors']:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    print(f"Imported {summary['created']} meals from {summary['processed']} rows "
+          f"({summary['rejected']} rejected).")
+    return 0 if summary['rejected'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,405 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+from typing import ContextManager, Iterator, Optional
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import get_meals_by_ids
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Most arenas kept at once, and how long an unused arena lives, in seconds
+ARENA_MAX = int(os.getenv("ARENA_MAX", "10000"))
+ARENA_IDLE_TIMEOUT = float(os.getenv("ARENA_IDLE_TIMEOUT", "600"))
+
+# Where arena state lives: 'memory' keeps it in this process, 'sqlite' shares it between
+# worker processes through the database
+ARENA_STORE = os.getenv("ARENA_STORE", "memory")
+
+# How long a worker may hold an arena stored in SQLite before others may take it over, and
+# how long to wait for a busy arena, in seconds
+ARENA_LEASE = float(os.getenv("ARENA_LEASE", "30"))
+ARENA_LOCK_TIMEOUT = float(os.getenv("ARENA_LOCK_TIMEOUT", "10"))
+ARENA_LOCK_POLL = 0.01
+
+
+class ArenaStore:
+    """
+    Keeps the state of arenas, independent battles with their own combatants.
+
+    Subclasses decide where the state lives. Every store is bounded by `max_arenas` and drops
+    arenas that have been idle for longer than `idle_timeout` seconds.
+    """
+
+    name = "base"
+
+    def create(self) -> str:
+        """
+        Creates a new, empty arena.
+
+        Returns:
+            str: The new arena's ID.
+
+        Raises:
+            RuntimeError: If the store is full of arenas that are still in use.
+        """
+        raise NotImplementedError
+
+    def use(self, arena_id: str) -> ContextManager[BattleModel]:
+        """
+        Returns a context manager that locks an arena and yields its BattleModel.
+        Changes to the combatants are kept.
+
+        Args:
+            arena_id (str): The ID of the arena.
+
+        Raises:
+            KeyError: If the arena does not exist or has been evicted.
+            RuntimeError: If the arena stays busy for too long.
+        """
+        raise NotImplementedError
+
+    def delete(self, arena_id: str) -> None:
+        """
+        Removes an arena.
+
+        Raises:
+            KeyError: If the arena does not exist or has been evicted.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Returns the store's counters.
+        """
+        return {}
+
+
+class Arena:
+    """
+    An arena kept in memory by MemoryArenaStore.
+
+    Attributes:
+        id (str): The arena's ID.
+        battle_model (BattleModel): The arena's combatants and battle logic.
+        lock (threading.Lock): Held while the arena is being used, so one client's prep and
+            battle never interleave with another's.
+        last_used (float): When the arena was last used, from time.monotonic().
+    """
+
+    def __init__(self, arena_id: str):
+        self.id = arena_id
+        self.battle_model = BattleModel()
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class MemoryArenaStore(ArenaStore):
+    """
+    A thread-safe, bounded store of arenas living in this process.
+
+    Arenas are kept in least recently used order. Arenas idle for longer than `idle_timeout`
+    are evicted whenever the store is touched, so the cost of eviction is spread over
+    requests and no background thread is needed.
+
+    Attributes:
+        max_arenas (int): The maximum number of arenas.
+        idle_timeout (float): How long an unused arena is kept, in seconds.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_arenas: int = ARENA_MAX, idle_timeout: float = ARENA_IDLE_TIMEOUT):
+        if max_arenas < 1:
+            raise ValueError(f"Invalid arena limit: {max_arenas}. Must be at least 1.")
+
+        self.max_arenas = max_arenas
+        self.idle_timeout = idle_timeout
+
+        self._arenas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # metrics
+        self._created = 0
+        self._evicted = 0
+        self._rejected = 0
+
+    def _evict_idle(self) -> None:
+        # Called with the store lock held. The least recently used arenas come first.
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._arenas:
+            arena = next(iter(self._arenas.values()))
+            if arena.last_used > cutoff:
+                break
+            del self._arenas[arena.id]
+            self._evicted += 1
+            logger.info("Evicted idle arena %s", arena.id)
+
+    def create(self) -> str:
+        with self._lock:
+            self._evict_idle()
+            if len(self._arenas) >= self.max_arenas:
+                self._rejected += 1
+                logger.error("Cannot create arena, all %d arenas are in use", self.max_arenas)
+                raise RuntimeError("Too many active arenas, try again later.")
+
+            arena = Arena(uuid.uuid4().hex)
+            self._arenas[arena.id] = arena
+            self._created += 1
+
+        logger.info("Created arena %s", arena.id)
+        return arena.id
+
+    @contextmanager
+    def use(self, arena_id: str) -> Iterator[BattleModel]:
+        with self._lock:
+            self._evict_idle()
+            arena = self._arenas.get(arena_id)
+            if arena is None:
+                raise KeyError(f"Arena {arena_id} not found")
+            arena.last_used = time.monotonic()
+            self._arenas.move_to_end(arena_id)
+
+        with arena.lock:
+            try:
+                yield arena.battle_model
+            finally:
+                arena.last_used = time.monotonic()
+
+    def delete(self, arena_id: str) -> None:
+        with self._lock:
+            if self._arenas.pop(arena_id, None) is None:
+                raise KeyError(f"Arena {arena_id} not found")
+        logger.info("Deleted arena %s", arena_id)
+
+    def stats(self) -> dict:
+        """
+        Returns the store's counters.
+
+        Returns:
+            dict: The number of active arenas, the limit, and created/evicted/rejected counts.
+        """
+        with self._lock:
+            return {
+                'store': self.name,
+                'active': len(self._arenas),
+                'max_arenas': self.max_arenas,
+                'created': self._created,
+                'evicted': self._evicted,
+                'rejected': self._rejected,
+            }
+
+
+class SQLiteArenaStore(ArenaStore):
+    """
+    A bounded store of arenas kept in the database, shared by every worker process.
+
+    An arena's combatants are stored as a list of meal IDs. Using an arena takes a lease on
+    its row: a conditional UPDATE that only succeeds when no other worker holds an unexpired
+    lease. The lease is held while the caller works with the arena, but no database
+    transaction is, so battles can record their results in the meantime. Leases expire after
+    `lease` seconds, so a crashed worker cannot lock an arena forever.
+
+    Timestamps are wall-clock times, since they are compared across processes.
+
+    Attributes:
+        max_arenas (int): The maximum number of arenas.
+        idle_timeout (float): How long an unused arena is kept, in seconds.
+        lease (float): How long a worker may hold an arena, in seconds.
+        lock_timeout (float): How long to wait for a busy arena, in seconds.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, max_arenas: int = ARENA_MAX, idle_timeout: float = ARENA_IDLE_TIMEOUT,
+                 lease: float = ARENA_LEASE, lock_timeout: float = ARENA_LOCK_TIMEOUT):
+        if max_arenas < 1:
+            raise ValueError(f"Invalid arena limit: {max_arenas}. Must be at least 1.")
+
+        self.max_arenas = max_arenas
+        self.idle_timeout = idle_timeout
+        self.lease = lease
+        self.lock_timeout = lock_timeout
+
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+        # metrics, per process
+        self._created = 0
+        self._evicted = 0
+        self._rejected = 0
+        self._lock_waits = 0
+
+    def _ensure_table(self, conn) -> None:
+        if self._table_ready:
+            return
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS arenas (
+                id TEXT PRIMARY KEY,
+                combatants TEXT NOT NULL DEFAULT '[]',
+                last_used REAL NOT NULL,
+                lock_token TEXT,
+                locked_until REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_arenas_last_used ON arenas (last_used);
+        """)
+        self._table_ready = True
+
+    def create(self) -> str:
+        arena_id = uuid.uuid4().hex
+        now = time.time()
+        with get_db_connection() as conn:
+            self._ensure_table(conn)
+            # Take the write lock up front so concurrent creates cannot overshoot the limit
+            conn.execute("BEGIN IMMEDIATE")
+            evicted = conn.execute("DELETE FROM arenas WHERE last_used < ?", (now - self.idle_timeout,)).rowcount
+            active = conn.execute("SELECT COUNT(*) FROM arenas").fetchone()[0]
+            if active >= self.max_arenas:
+                conn.rollback()
+                with self._lock:
+                    self._rejected += 1
+                logger.error("Cannot create arena, all %d arenas are in use", self.max_arenas)
+                raise RuntimeError("Too many active arenas, try again later.")
+
+            conn.execute("INSERT INTO arenas (id, last_used) VALUES (?, ?)", (arena_id, now))
+            conn.commit()
+
+        with self._lock:
+            self._created += 1
+            self._evicted += evicted
+        logger.info("Created arena %s", arena_id)
+        return arena_id
+
+    def _acquire(self, arena_id: str, token: str) -> list:
+        # Claims the arena's lease and returns its combatant IDs, waiting while it is busy
+        deadline = time.monotonic() + self.lock_timeout
+        waited = False
+        while True:
+            now = time.time()
+            with get_db_connection() as conn:
+                self._ensure_table(conn)
+                claimed = conn.execute("""
+                    UPDATE arenas SET lock_token = ?, locked_until = ?, last_used = ?
+                    WHERE id = ? AND last_used >= ? AND (locked_until IS NULL OR locked_until < ?)
+                """, (token, now + self.lease, now, arena_id, now - self.idle_timeout, now)).rowcount
+                conn.commit()
+                row = conn.execute("SELECT combatants, last_used FROM arenas WHERE id = ?", (arena_id,)).fetchone()
+
+            if row is None or (not claimed and row[1] < now - self.idle_timeout):
+                raise KeyError(f"Arena {arena_id} not found")
+            if claimed:
+                return json.loads(row[0])
+
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._lock_waits += 1
+            if time.monotonic() >= deadline:
+                logger.error("Timed out waiting %.1fs for arena %s", self.lock_timeout, arena_id)
+                raise RuntimeError(f"Arena {arena_id} is busy, try again later.")
+            time.sleep(ARENA_LOCK_POLL)
+
+    @contextmanager
+    def use(self, arena_id: str) -> Iterator[BattleModel]:
+        token = uuid.uuid4().hex
+        meal_ids = self._acquire(arena_id, token)
+
+        battle_model = BattleModel()
+        rebuilt = False
+        try:
+            # Meal lookups are cached, so rebuilding the combatants is cheap. Meals deleted since
+            # they were prepared are dropped, and the release below stores the arena without them.
+            lookup = get_meals_by_ids(meal_ids)
+            if lookup['deleted'] or lookup['missing']:
+                logger.info("Dropped deleted meals %s from arena %s", lookup['deleted'] + lookup['missing'], arena_id)
+            for meal in lookup['found']:
+                battle_model.prep_combatant(meal)
+            rebuilt = True
+            yield battle_model
+        finally:
+            with get_db_connection() as conn:
+                if rebuilt:
+                    combatants = json.dumps([meal.id for meal in battle_model.get_combatants()])
+                    released = conn.execute("""
+                        UPDATE arenas SET combatants = ?, last_used = ?, lock_token = NULL, locked_until = NULL
+                        WHERE id = ? AND lock_token = ?
+                    """, (combatants, time.time(), arena_id, token)).rowcount
+                else:
+                    # The combatants were never loaded, so keep the stored ones and only give up the lease
+                    released = conn.execute("""
+                        UPDATE arenas SET lock_token = NULL, locked_until = NULL WHERE id = ? AND lock_token = ?
+                    """, (arena_id, token)).rowcount
+                conn.commit()
+            if not released:
+                logger.warning("Lease on arena %s expired before it was released, changes were dropped", arena_id)
+
+    def delete(self, arena_id: str) -> None:
+        with get_db_connection() as conn:
+            self._ensure_table(conn)
+            deleted = conn.execute("DELETE FROM arenas WHERE id = ? AND last_used >= ?",
+                                   (arena_id, time.time() - self.idle_timeout)).rowcount
+            conn.commit()
+        if not deleted:
+            raise KeyError(f"Arena {arena_id} not found")
+        logger.info("Deleted arena %s", arena_id)
+
+    def stats(self) -> dict:
+        """
+        Returns the store's counters. 'active' covers every worker, the other counts this one.
+
+        Returns:
+            dict: The number of active arenas, the limit, and created/evicted/rejected/lock wait counts.
+        """
+        with get_db_connection() as conn:
+            self._ensure_table(conn)
+            active = conn.execute("SELECT COUNT(*) FROM arenas WHERE last_used >= ?",
+                                  (time.time() - self.idle_timeout,)).fetchone()[0]
+        with self._lock:
+            return {
+                'store': self.name,
+                'active': active,
+                'max_arenas': self.max_arenas,
+                'created': self._created,
+                'evicted': self._evicted,
+                'rejected': self._rejected,
+                'lock_waits': self._lock_waits,
+            }
+
+
+def create_arena_store(name: str) -> ArenaStore:
+    """
+    Creates an arena store by name, 'memory' or 'sqlite'.
+
+    Raises:
+        ValueError: If the name is not a known store.
+    """
+    if name == "memory":
+        return MemoryArenaStore()
+    if name == "sqlite":
+        return SQLiteArenaStore()
+    raise ValueError(f"Invalid arena store: {name}. Must be 'memory' or 'sqlite'.")
+
+_store: Optional[ArenaStore] = None
+_store_lock = threading.Lock()
+
+
+def get_arena_store() -> ArenaStore:
+    """
+    Returns the process-wide arena store, configured from ARENA_STORE.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_arena_store(ARENA_STORE)
+    return _store
@@ -1,15 +1,33 @@
 import logging
 from typing import List
 
-from meal_max.models.kitchen_model import Meal, update_meal_stats
+from meal_max.models.kitchen_model import Meal, record_battle_result
 from meal_max.utils.logger import configure_logger
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.random_utils import draw_random
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
  
+def first_combatant_wins(score_1: float, score_2: float, random_number: float) -> bool:
+    """
+    Decides a bout: the first combatant wins if the normalized score delta beats the random number.
+
+    Args:
+        score_1 (float): The battle score of the first combatant.
+        score_2 (float): The battle score of the second combatant.
+        random_number (float): A random number between 0 and 1.
+    """
+    # Compute the delta and normalize between 0 and 1
+    delta = abs(score_1 - score_2) / 100
+
+    # Log the delta and normalized delta
+    logger.debug("Delta between scores: %.3f", delta)
+
+    return delta > random_number
+
+
 class BattleModel:
     """
     A class to manage a collection of meals.
@@ -52,23 +70,17 @@ class BattleModel:
         score_2 = self.get_battle_score(combatant_2)
 
         # Log the scores for both combatants
-        logger.info("Score for %s: %.3f", combatant_1.meal, score_1)
-        logger.info("Score for %s: %.3f", combatant_2.meal, score_2)
+        logger.debug("Score for %s: %.3f", combatant_1.meal, score_1)
+        logger.debug("Score for %s: %.3f", combatant_2.meal, score_2)
 
-        # Compute the delta and normalize between 0 and 1
-        delta = abs(score_1 - score_2) / 100
-
-        # Log the delta and normalized delta
-        logger.info("Delta between scores: %.3f", delta)
-
-        # Get random number from random.org
-        random_number = get_random()
+        # Get random number from the entropy pool
+        random_number = draw_random()
 
         # Log the random number
-        logger.info("Random number from random.org: %.3f", random_number)
+        logger.debug("Random number from entropy pool: %.3f", random_number)
 
         # Determine the winner based on the normalized delta
-        if delta > random_number:
+        if first_combatant_wins(score_1, score_2, random_number):
             winner = combatant_1
             loser = combatant_2
         else:
@@ -78,9 +90,8 @@ class BattleModel:
         # Log the winner
         logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
+        # Update stats for both combatants in a single transaction
+        record_battle_result(winner.id, loser.id)
 
         # Remove the losing combatant from combatants
         self.combatants.remove(loser)
@@ -96,30 +107,23 @@ class BattleModel:
 
     def get_battle_score(self, combatant: Meal) -> float:
         """
-        Calculates, logs, and gets the battle score of a combatant.
+        Logs and gets the battle score of a combatant.
+
+        The score is computed once when the Meal is created, see Meal.battle_score.
 
         Args:
-            combatant (Meal): the meal to calculate the battle score of.
+            combatant (Meal): the meal to get the battle score of.
         """
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
-
-        # Log the calculation process
-        logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
-                    combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
-
-        # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
-
         # Log the calculated score
-        logger.info("Battle score for %s: %.3f", combatant.meal, score)
+        logger.debug("Battle score for %s: %.3f", combatant.meal, combatant.battle_score)
 
-        return score
+        return combatant.battle_score
 
     def get_combatants(self) -> List[Meal]:
         """
         Returns a list of all combatants in the combatants list.
         """
-        logger.info("Retrieving current list of combatants.")
+        logger.debug("Retrieving current list of combatants.")
         return self.combatants
 
     def prep_combatant(self, combatant_data: Meal):
@@ -142,4 +146,5 @@ class BattleModel:
         self.combatants.append(combatant_data)
 
         # Log the current state of combatants
-        logger.info("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
@@ -0,0 +1,186 @@
+import csv
+import json
+import logging
+import math
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from meal_max.models.kitchen_model import MEAL_BATCH_SIZE, Meal, create_meals
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+IMPORT_FORMATS = ['ndjson', 'csv']
+
+# Only the first errors are kept in the import summary so memory stays flat on huge dumps
+MAX_REPORTED_ERRORS = 1000
+
+# A parsed record, or the error that made the line unreadable, along with its line number
+ParsedLine = Tuple[int, Union[dict, ValueError]]
+
+
+def _decode_line(line: Union[bytes, str]) -> str:
+    # utf-8-sig drops a byte order mark, which editors often put at the start of CSV exports
+    line = line.decode('utf-8-sig') if isinstance(line, bytes) else line
+    return line[1:] if line.startswith('\ufeff') else line
+
+def _decode_lines(lines: Iterable[Union[bytes, str]], errors: List[UnicodeDecodeError]) -> Iterator[str]:
+    # Lines that are not valid UTF-8 are passed on with replacement characters and their error
+    # is appended to `errors`, so the caller can reject the row instead of ending the import
+    for line in lines:
+        try:
+            yield _decode_line(line)
+        except UnicodeDecodeError as e:
+            errors.append(e)
+            yield line.decode('utf-8-sig', errors='replace')
+
+def parse_ndjson(lines: Iterable[Union[bytes, str]]) -> Iterator[ParsedLine]:
+    """
+    Lazily parses newline-delimited JSON, one meal object per line.
+
+    Args:
+        lines (Iterable[bytes | str]): The lines of the dump, e.g. an open file or request stream.
+
+    Yields:
+        Tuple[int, dict | ValueError]: The line number and the parsed object, or the parse error.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            line = _decode_line(line)
+        except UnicodeDecodeError as e:
+            yield line_number, ValueError(f"Invalid UTF-8: {e}")
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+
+def parse_csv(lines: Iterable[Union[bytes, str]]) -> Iterator[ParsedLine]:
+    """
+    Lazily parses CSV with a header row naming the meal, cuisine, price and difficulty columns.
+
+    Args:
+        lines (Iterable[bytes | str]): The lines of the dump, e.g. an open file or request stream.
+
+    Yields:
+        Tuple[int, dict | ValueError]: The line number and the parsed row, or the parse error.
+    """
+    decode_errors: List[UnicodeDecodeError] = []
+    reader = csv.DictReader(_decode_lines(lines, decode_errors))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            decode_errors.clear()
+            yield reader.line_num, ValueError(f"Invalid CSV: {e}")
+            continue
+        if decode_errors:
+            # The row was read from a line that is not valid UTF-8
+            error = decode_errors[-1]
+            decode_errors.clear()
+            yield reader.line_num, ValueError(f"Invalid UTF-8: {error}")
+            continue
+        yield reader.line_num, row
+
+def validate_meal_row(data: Any) -> dict:
+    """
+    Converts a parsed record into the fields of a meal, checking them like Meal does.
+
+    Args:
+        data (Any): A record produced by one of the parsers.
+
+    Returns:
+        dict: The meal's 'meal', 'cuisine', 'price' and 'difficulty'.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each meal must be an object")
+    if not data.get('meal') or not data.get('cuisine'):
+        raise ValueError("Meal name and cuisine are required")
+    if any(not isinstance(data.get(key), str) for key in ('meal', 'cuisine', 'difficulty')):
+        raise ValueError("Meal name, cuisine and difficulty must be strings")
+    try:
+        price = math.nan if isinstance(data.get('price'), bool) else float(data.get('price'))
+    except (TypeError, ValueError):
+        price = math.nan
+    # NaN and infinity parse as floats but would fail the price constraint for the whole batch
+    if not math.isfinite(price):
+        raise ValueError(f"Invalid price: {data.get('price')}. Price must be a number.")
+
+    meal = Meal(id=0, meal=data['meal'], cuisine=data['cuisine'], price=price, difficulty=data.get('difficulty'))
+    return {'meal': meal.meal, 'cuisine': meal.cuisine, 'price': meal.price, 'difficulty': meal.difficulty}
+
+def import_meals(lines: Iterable[Union[bytes, str]], fmt: str = 'ndjson', batch_size: int = MEAL_BATCH_SIZE,
+                 progress: Optional[Callable[[dict], None]] = None) -> dict[str, Any]:
+    """
+    Streams a catalog dump into the database, committing one batch of meals at a time.
+
+    The input is consumed lazily and at most `batch_size` rows are held in memory, so dumps of any
+    size can be imported. Rows that fail validation or already exist are counted and skipped.
+
+    Args:
+        lines (Iterable[bytes | str]): The lines of the dump.
+        fmt (str, optional): The format of the dump, 'ndjson' (default) or 'csv'.
+        batch_size (int, optional): The number of rows committed per transaction.
+        progress (Callable[[dict], None], optional): Called with the running totals after every batch.
+
+    Returns:
+        dict: The number of rows 'processed', meals 'created' and rows 'rejected', and the first
+            rejected rows as 'errors', each with its 'line' number and 'error' message.
+
+    Raises:
+        ValueError: If the format or batch size is invalid.
+        sqlite3.Error: For any database errors. Batches committed before the error are kept.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Invalid import format: {fmt}. Must be one of {IMPORT_FORMATS}.")
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Batch size must be a positive integer.")
+
+    parser = parse_ndjson if fmt == 'ndjson' else parse_csv
+    summary = {'processed': 0, 'created': 0, 'rejected': 0, 'errors': []}
+
+    def reject(line_number: int, error: str) -> None:
+        summary['rejected'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line_number, 'error': error})
+
+    def flush(batch: list, batch_lines: list) -> None:
+        result = create_meals(batch, batch_size=batch_size)
+        summary['created'] += result['created']
+        for error in result['errors']:
+            reject(batch_lines[error['index']], error['error'])
+
+        logger.info("Imported %d meals from %d rows so far", summary['created'], summary['processed'])
+        if progress:
+            progress({key: summary[key] for key in ('processed', 'created', 'rejected')})
+
+    batch, batch_lines = [], []
+    for line_number, data in parser(lines):
+        summary['processed'] += 1
+        try:
+            if isinstance(data, ValueError):
+                raise data
+            batch.append(validate_meal_row(data))
+            batch_lines.append(line_number)
+        except ValueError as e:
+            reject(line_number, str(e))
+
+        if len(batch) >= batch_size:
+            flush(batch, batch_lines)
+            batch, batch_lines = [], []
+
+    if batch:
+        flush(batch, batch_lines)
+
+    logger.info("Import finished: %d rows, %d meals created, %d rows rejected",
+                summary['processed'], summary['created'], summary['rejected'])
+    return summary
@@ -1,9 +1,16 @@
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from dataclasses import dataclass, field
 import logging
+import math
 import os
 import sqlite3
-from typing import Any
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
+from meal_max.utils.cache_utils import LRUCache, SingleFlight
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
@@ -12,6 +19,26 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Read-through caches for meal lookups. Meals never change after creation, so entries only
+# need to be dropped on delete or clear; the TTL bounds staleness across processes.
+# A MEAL_CACHE_SIZE of 0 disables caching and a MEAL_CACHE_TTL of 0 disables expiry.
+MEAL_CACHE_SIZE = int(os.getenv("MEAL_CACHE_SIZE", "1024"))
+MEAL_CACHE_TTL = float(os.getenv("MEAL_CACHE_TTL", "300")) or None
+
+_meals_by_id = LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL)
+_meals_by_name = LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL)
+
+# Number of rows inserted per executemany() call by create_meals()
+MEAL_BATCH_SIZE = int(os.getenv("MEAL_BATCH_SIZE", "500"))
+
+# Largest number of values bound into a single IN (...) list; older SQLite builds cap it at 999
+SQL_MAX_PARAMETERS = 500
+
+# Subtracted from a meal's battle score, so easier meals score higher.
+# Keep in sync with the battle_score column in create_meal_table.sql.
+DIFFICULTY_MODIFIER = {"HIGH": 1, "MED": 2, "LOW": 3}
+
+
 @dataclass
 class Meal:
     id: int
@@ -19,13 +46,252 @@ class Meal:
     cuisine: str
     price: float
     difficulty: str
+    battle_score: float = field(init=False, compare=False)
 
     def __post_init__(self):
         if self.price < 0:
             raise ValueError("Price must be a positive value.")
         if self.difficulty not in ['LOW', 'MED', 'HIGH']:
             raise ValueError("Difficulty must be 'LOW', 'MED', or 'HIGH'.")
+        # The score only depends on immutable attributes, so it is computed once per meal
+        self.battle_score = (self.price * len(self.cuisine)) - DIFFICULTY_MODIFIER[self.difficulty]
+
+
+def _leaderboard_entry(row: tuple) -> dict[str, Any]:
+    """
+    Converts a (id, meal, cuisine, price, difficulty, battles, wins, win_pct) row into a leaderboard entry.
+    """
+    return {
+        'id': row[0],
+        'meal': row[1],
+        'cuisine': row[2],
+        'price': row[3],
+        'difficulty': row[4],
+        'battles': row[5],
+        'wins': row[6],
+        'win_pct': round(row[7] * 100, 1)  # Convert to percentage
+    }
+
+
+class Leaderboard:
+    """
+    An in-process ranking of every meal that has battled, kept in sync with the meals table.
+
+    Each sort order is a sorted list of keys maintained with bisect, so a page of K meals is
+    served in O(K) after an O(log n) seek, and a meal's rank is a single binary search.
+    Keys sort the same way as the SQL leaderboard: by the criterion descending, then by ID.
+
+    Attributes:
+        loaded (bool): Whether the leaderboard has been loaded from the database. Until it is,
+            get_leaderboard() and get_leaderboard_rank() fall back to SQL.
+        lock (threading.RLock): Guards the leaderboard; writers hold it while committing so
+            updates are applied in commit order.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.lock = threading.RLock()
+        self._rows: dict[int, tuple] = {}
+        self._keys: dict[str, List[tuple]] = {'wins': [], 'win_pct': []}
+
+    @staticmethod
+    def _sort_keys(row: tuple) -> dict[str, tuple]:
+        return {'wins': (-row[6], row[0]), 'win_pct': (-row[7], row[0])}
+
+    def load(self, rows: List[tuple]) -> None:
+        """
+        Replaces the contents of the leaderboard.
+
+        Args:
+            rows (List[tuple]): (id, meal, cuisine, price, difficulty, battles, wins, win_pct) rows.
+        """
+        with self.lock:
+            self._rows = {row[0]: row for row in rows}
+            keys = [self._sort_keys(row) for row in rows]
+            self._keys = {sort_by: sorted(key[sort_by] for key in keys) for sort_by in self._keys}
+            self.loaded = True
+
+    def upsert(self, row: tuple) -> None:
+        """
+        Adds a meal to the leaderboard or moves it to its new position.
+
+        Args:
+            row (tuple): The meal's (id, meal, cuisine, price, difficulty, battles, wins, win_pct) row.
+        """
+        with self.lock:
+            self.remove(row[0])
+            self._rows[row[0]] = row
+            for sort_by, key in self._sort_keys(row).items():
+                insort(self._keys[sort_by], key)
+
+    def remove(self, meal_id: int) -> None:
+        """
+        Removes a meal from the leaderboard, if it is on it.
+
+        Args:
+            meal_id (int): The ID of the meal to remove.
+        """
+        with self.lock:
+            row = self._rows.pop(meal_id, None)
+            if row is None:
+                return
+            for sort_by, key in self._sort_keys(row).items():
+                keys = self._keys[sort_by]
+                del keys[bisect_left(keys, key)]
+
+    def clear(self) -> None:
+        """
+        Removes every meal from the leaderboard.
+        """
+        with self.lock:
+            self._rows = {}
+            self._keys = {sort_by: [] for sort_by in self._keys}
+
+    def page(self, sort_by: str, limit: Optional[int], offset: int,
+             after_wins: Optional[int], after_id: Optional[int]) -> List[dict[str, Any]]:
+        """
+        Returns a page of the leaderboard. Arguments have the same meaning as in get_leaderboard().
+        """
+        with self.lock:
+            keys = self._keys[sort_by]
+            start = offset
+            if after_wins is not None:
+                start += bisect_right(keys, (-after_wins, after_id))
+            end = len(keys) if limit is None else start + limit
+            return [_leaderboard_entry(self._rows[key[1]]) for key in keys[start:end]]
+
+    def rank(self, meal_id: int, sort_by: str) -> Optional[dict[str, Any]]:
+        """
+        Returns a meal's leaderboard entry with its 1-based rank, or None if it is not ranked.
+        """
+        with self.lock:
+            row = self._rows.get(meal_id)
+            if row is None:
+                return None
+            entry = _leaderboard_entry(row)
+            entry['rank'] = bisect_left(self._keys[sort_by], self._sort_keys(row)[sort_by]) + 1
+            return entry
+
+
+# The process-wide leaderboard, loaded at startup by load_leaderboard()
+_leaderboard = Leaderboard()
+
+
+class DataVersion:
+    """
+    Counts committed writes to the meals table, so readers can tell whether anything changed
+    without querying it.
+
+    The counter only sees writes made by this process. Another process writing to the same
+    database is not noticed, just as with the in-memory leaderboard.
+
+    Attributes:
+        modified (float): The wall-clock time of the last write, or of process start.
+    """
+
+    def __init__(self):
+        self.modified = time.time()
+        self._version = 0
+        self._epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        """
+        Records a committed write.
+        """
+        with self._lock:
+            self._version += 1
+            self.modified = time.time()
+
+    def current(self) -> Tuple[str, float]:
+        """
+        Returns an opaque token for the current version and the time of the last write.
+
+        The token includes a per-process epoch and pid, so a restarted or different process
+        never reuses a token for different data.
+        """
+        with self._lock:
+            return f"{self._epoch}-{os.getpid():x}-{self._version}", self.modified
 
+_data_version = DataVersion()
+
+def get_data_version() -> Tuple[str, float]:
+    """
+    Returns the current data version token and the time of the last write to the meals table.
+    """
+    return _data_version.current()
+
+
+# Concurrent identical reads (the same leaderboard page, the same meal) share one query
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "true").lower() == "true"
+
+_flights = SingleFlight()
+
+def _coalesce(key: tuple, func: Callable[[], Any]) -> Any:
+    if not SINGLE_FLIGHT:
+        return func()
+    # Keyed on the data version too, so a caller arriving after a write never shares a query
+    # that started before it
+    return _flights.do((*key, _data_version.current()[0]), func)
+
+def get_single_flight_stats() -> dict:
+    """
+    Returns how many reads ran a query and how many shared another caller's query.
+    """
+    return _flights.stats()
+
+LEADERBOARD_COLUMNS = "id, meal, cuisine, price, difficulty, battles, wins, win_pct"
+
+# The most keys one get_meals_by_ids() / get_meals_by_names() call may look up
+MEAL_LOOKUP_MAX = int(os.getenv("MEAL_LOOKUP_MAX", "10000"))
+
+# Rows fetched per round trip by stream_leaderboard(); bounds the memory one export holds
+LEADERBOARD_FETCH_SIZE = int(os.getenv("LEADERBOARD_FETCH_SIZE", "1000"))
+
+
+def _commit_and_update_leaderboard(conn: sqlite3.Connection, meal_ids: List[int]) -> None:
+    """
+    Commits the current transaction and moves the given meals on the in-memory leaderboard.
+    """
+    if not _leaderboard.loaded:
+        conn.commit()
+        _data_version.bump()
+        return
+
+    with _leaderboard.lock:
+        # Read the new stats inside the write transaction so no other writer can commit in between
+        cursor = conn.cursor()
+        rows = []
+        for start in range(0, len(meal_ids), SQL_MAX_PARAMETERS):
+            chunk = meal_ids[start:start + SQL_MAX_PARAMETERS]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor.execute(f"""
+                SELECT {LEADERBOARD_COLUMNS}, deleted = 0 AND battles > 0 FROM meals WHERE id IN ({placeholders})
+            """, chunk)
+            rows.extend(cursor.fetchall())
+        conn.commit()
+        for row in rows:
+            # A meal deleted before this write committed must not be put back on the leaderboard
+            if row[-1]:
+                _leaderboard.upsert(row[:-1])
+            else:
+                _leaderboard.remove(row[0])
+        _data_version.bump()
+
+
+def _validate_meal(price: float, difficulty: str) -> None:
+    """
+    Checks the price and difficulty of a new meal.
+
+    Raises:
+        ValueError: If the price is not a positive, finite number.
+        ValueError: If the difficulty is not 'LOW', 'MED', or 'HIGH'.
+    """
+    if (not isinstance(price, (int, float)) or isinstance(price, bool)
+            or not math.isfinite(price) or price <= 0):
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
 
 def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
     """
@@ -43,10 +309,7 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         ValueError: If a meal with the same name already exists.
         sqlite3.Error: For any other database errors.
     """
-    if not isinstance(price, (int, float)) or price <= 0:
-        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
-    if difficulty not in ['LOW', 'MED', 'HIGH']:
-        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    _validate_meal(price, difficulty)
 
     try:
         with get_db_connection() as conn:
@@ -56,6 +319,8 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
                 VALUES (?, ?, ?, ?)
             """, (meal, cuisine, price, difficulty))
             conn.commit()
+            _data_version.bump()
+            _meals_by_name.invalidate(meal)
 
             logger.info("Meal successfully added to the database: %s", meal)
 
@@ -67,6 +332,97 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
+def create_meals(meals: Iterable[dict], batch_size: int = MEAL_BATCH_SIZE) -> dict[str, Any]:
+    """
+    Creates many meals at once, inserting them with executemany() inside a single transaction.
+
+    Rows are validated in one pass before anything is written. Invalid rows and rows whose name
+    already exists (in the database or earlier in the same batch) are reported back instead of
+    aborting the import; every other row is inserted.
+
+    Args:
+        meals (Iterable[dict]): The meals to create, each with 'meal', 'cuisine', 'price' and 'difficulty' keys.
+        batch_size (int, optional): The number of rows per executemany() call.
+
+    Returns:
+        dict: The number of meals 'created' and a list of 'errors', each with the row's 'index',
+            'meal' name and 'error' message.
+
+    Raises:
+        ValueError: If the batch size is not positive.
+        sqlite3.Error: For any database errors. Nothing is written in that case.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Batch size must be a positive integer.")
+
+    rows = []
+    errors = []
+    seen = set()
+    for index, data in enumerate(meals):
+        name = data.get('meal') if isinstance(data, dict) else None
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Each meal must be an object")
+            if not name or not data.get('cuisine'):
+                raise ValueError("Meal name and cuisine are required")
+            if not isinstance(name, str) or not isinstance(data['cuisine'], str):
+                raise ValueError("Meal name and cuisine must be strings")
+            _validate_meal(data.get('price'), data.get('difficulty'))
+            if name in seen:
+                raise ValueError(f"Meal with name '{name}' already exists")
+        except ValueError as e:
+            errors.append({'index': index, 'meal': name, 'error': str(e)})
+            continue
+        seen.add(name)
+        rows.append((index, (name, data['cuisine'], data['price'], data['difficulty'])))
+
+    created = 0
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front so the duplicate check can't race another writer
+            cursor.execute("BEGIN IMMEDIATE")
+
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+
+                names = [values[0] for _, values in chunk]
+                existing = set()
+                for name_start in range(0, len(names), SQL_MAX_PARAMETERS):
+                    name_chunk = names[name_start:name_start + SQL_MAX_PARAMETERS]
+                    placeholders = ", ".join("?" for _ in name_chunk)
+                    cursor.execute(f"SELECT meal FROM meals WHERE meal IN ({placeholders})", name_chunk)
+                    existing.update(row[0] for row in cursor.fetchall())
+
+                new_rows = []
+                for index, values in chunk:
+                    if values[0] in existing:
+                        errors.append({'index': index, 'meal': values[0],
+                                       'error': f"Meal with name '{values[0]}' already exists"})
+                    else:
+                        new_rows.append(values)
+
+                cursor.executemany("""
+                    INSERT INTO meals (meal, cuisine, price, difficulty)
+                    VALUES (?, ?, ?, ?)
+                """, new_rows)
+                created += len(new_rows)
+
+            conn.commit()
+            if created:
+                _data_version.bump()
+
+    except sqlite3.Error as e:
+        logger.error("Database error while creating meals: %s", str(e))
+        raise e
+
+    for _, values in rows:
+        _meals_by_name.invalidate(values[0])
+
+    errors.sort(key=lambda error: error['index'])
+    logger.info("Bulk created %d meals, %d rows rejected", created, len(errors))
+    return {'created': created, 'errors': errors}
+
 def clear_meals() -> None:
     """
     Recreates the meals table, effectively deleting all meals.
@@ -80,7 +436,12 @@ def clear_meals() -> None:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.executescript(create_table_script)
-            conn.commit()
+            # Clear under the leaderboard lock so a battle's update cannot interleave with it
+            with _leaderboard.lock:
+                conn.commit()
+                _data_version.bump()
+                _leaderboard.clear()
+            clear_meal_cache()
 
             logger.info("Meals cleared successfully.")
 
@@ -88,6 +449,53 @@ def clear_meals() -> None:
         logger.error("Database error while clearing meals: %s", str(e))
         raise e
 
+def migrate_meals_table() -> None:
+    """
+    Brings an existing meals table up to date with the current schema.
+
+    Adds the generated win_pct and battle_score columns if they are missing and creates
+    the leaderboard indexes. Safe to run on every startup; a missing meals table is left alone.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # table_xinfo (unlike table_info) also lists generated columns
+            cursor.execute("PRAGMA table_xinfo(meals)")
+            columns = [row[1] for row in cursor.fetchall()]
+            if not columns:
+                logger.warning("Meals table does not exist, skipping migration.")
+                return
+
+            if 'win_pct' not in columns:
+                # SQLite can only add VIRTUAL generated columns to an existing table
+                cursor.execute("""
+                    ALTER TABLE meals ADD COLUMN win_pct REAL
+                    GENERATED ALWAYS AS (CASE WHEN battles > 0 THEN wins * 1.0 / battles END) VIRTUAL
+                """)
+                logger.info("Added win_pct column to the meals table.")
+
+            if 'battle_score' not in columns:
+                cursor.execute("""
+                    ALTER TABLE meals ADD COLUMN battle_score REAL
+                    GENERATED ALWAYS AS (price * LENGTH(cuisine) - CASE difficulty
+                        WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END) VIRTUAL
+                """)
+                logger.info("Added battle_score column to the meals table.")
+
+            with open(os.getenv("SQL_MIGRATE_TABLE_PATH", "/app/sql/migrate_meal_table.sql"), "r") as fh:
+                migrate_table_script = fh.read()
+            cursor.executescript(migrate_table_script)
+            conn.commit()
+
+            logger.info("Meals table migrated successfully.")
+
+    except sqlite3.Error as e:
+        logger.error("Database error while migrating meals: %s", str(e))
+        raise e
+
 def delete_meal(meal_id: int) -> None:
     """
     Mark a meal as deleted in the database by setting its `deleted` flag.
@@ -113,7 +521,15 @@ def delete_meal(meal_id: int) -> None:
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
-            conn.commit()
+            # Commit and remove under the leaderboard lock, as battles do, so updates reach the
+            # leaderboard in commit order. The write lock is already held, which keeps the lock
+            # order the same as in _commit_and_update_leaderboard().
+            with _leaderboard.lock:
+                conn.commit()
+                _data_version.bump()
+                _leaderboard.remove(meal_id)
+            _meals_by_id.invalidate(meal_id)
+            _meals_by_name.invalidate_where(lambda cached: cached.id == meal_id)
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -121,49 +537,74 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None, offset: int=0,
+                    after_wins: Optional[int]=None, after_id: Optional[int]=None) -> dict[str, Any]:
     """
     Retrieve a leaderboard of meals based on battle performance, sorted by wins or win percentage.
 
+    Pagination is pushed down into SQL. Pages can be addressed by `limit` and `offset`, or, when
+    sorting by wins, by the keyset cursor (`after_wins`, `after_id`) taken from the last row of the
+    previous page, which stays fast however deep the page is. Once load_leaderboard() has run,
+    pages are served from the in-memory leaderboard without touching the database.
+
     Args:
         sort_by (str, optional): The sorting criterion for the leaderboard. Can be either "wins" (default) or "win_pct" (for win percentage).
+        limit (int, optional): The maximum number of meals to return. Defaults to all meals.
+        offset (int, optional): The number of meals to skip. Defaults to 0.
+        after_wins (int, optional): The wins of the last meal on the previous page; requires `after_id`.
+        after_id (int, optional): The ID of the last meal on the previous page; requires `after_wins`.
 
     Raises:
         ValueError: If the `sort_by` parameter is neither "wins" nor "win_pct".
+        ValueError: If `limit` or `offset` is out of range, or the cursor is incomplete or used with "win_pct".
         sqlite3.Error: For any database-related errors encountered.
     """
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
-    """
+    if sort_by not in ("wins", "win_pct"):
+        logger.error("Invalid sort_by parameter: %s", sort_by)
+        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a positive integer.")
+    if offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Offset must not be negative.")
+
+    if after_wins is not None or after_id is not None:
+        if after_wins is None or after_id is None:
+            raise ValueError("Both after_wins and after_id are required to page by cursor.")
+        if sort_by != "wins":
+            raise ValueError("Cursor pagination is only supported when sorting by wins.")
+
+    if _leaderboard.loaded:
+        logger.debug("Leaderboard served from memory")
+        return _leaderboard.page(sort_by, limit, offset, after_wins, after_id)
+
+    # The WHERE clause must match the partial leaderboard indexes exactly for SQLite to use them
+    query = f"SELECT {LEADERBOARD_COLUMNS} FROM meals WHERE deleted = 0 AND battles > 0"
+    params = []
+
+    if after_wins is not None:
+        # wins <= ? lets SQLite seek straight to the cursor in the index
+        query += " AND wins <= ? AND (wins < ? OR id > ?)"
+        params.extend([after_wins, after_wins, after_id])
 
     if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
+        query += " ORDER BY win_pct DESC, id"
     else:
-        logger.error("Invalid sort_by parameter: %s", sort_by)
-        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+        query += " ORDER BY wins DESC, id"
+
+    if limit is not None or offset:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+
+    return _coalesce(("leaderboard", query, tuple(params)), lambda: _fetch_leaderboard(query, params))
 
+def _fetch_leaderboard(query: str, params: List[Any]) -> List[dict]:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
+        leaderboard = [_leaderboard_entry(row) for row in rows]
 
         logger.info("Leaderboard retrieved successfully")
         return leaderboard
@@ -172,6 +613,149 @@ def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
         logger.error("Database error: %s", str(e))
         raise e
 
+def stream_leaderboard(sort_by: str="wins", batch_size: int=LEADERBOARD_FETCH_SIZE) -> Iterator[List[dict]]:
+    """
+    Streams the full leaderboard in batches, for exports too large to build in memory.
+
+    Each batch is a keyset query that seeks past the last row of the previous batch, with the
+    database connection taken from the pool for that query only. A slow client therefore never
+    holds a pooled connection between batches, and only one batch is held in memory at a time.
+    As with paging, the batches are not one snapshot: a meal whose stats change during the
+    export may be skipped or appear twice. The in-memory leaderboard is not used, since walking
+    it would hold its lock for the whole export.
+
+    Args:
+        sort_by (str, optional): "wins" (default) or "win_pct".
+        batch_size (int, optional): The number of rows per batch.
+
+    Returns:
+        Iterator[List[dict]]: Batches of leaderboard entries, in leaderboard order.
+
+    Raises:
+        ValueError: If the `sort_by` parameter is neither "wins" nor "win_pct", or `batch_size` is not positive.
+        sqlite3.Error: For any database-related errors encountered while iterating.
+    """
+    # Validate now rather than when the first batch is requested, which may be after the
+    # response has started
+    if sort_by not in ("wins", "win_pct"):
+        logger.error("Invalid sort_by parameter: %s", sort_by)
+        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}. Batch size must be a positive integer.")
+
+    return _stream_rows(sort_by, batch_size)
+
+def _stream_rows(sort_by: str, batch_size: int) -> Iterator[List[dict]]:
+    # The sort column's position in LEADERBOARD_COLUMNS, for the cursor taken from each batch
+    sort_index = 7 if sort_by == "win_pct" else 6
+    cursor_after = None
+    streamed = 0
+    try:
+        while True:
+            query = f"SELECT {LEADERBOARD_COLUMNS} FROM meals WHERE deleted = 0 AND battles > 0"
+            params: List[Any] = []
+            if cursor_after is not None:
+                # Same seek as get_leaderboard's cursor, on whichever column the export is sorted by
+                query += f" AND {sort_by} <= ? AND ({sort_by} < ? OR id > ?)"
+                params.extend([cursor_after[0], cursor_after[0], cursor_after[1]])
+            query += f" ORDER BY {sort_by} DESC, id LIMIT ?"
+            params.append(batch_size)
+
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+            if not rows:
+                break
+            streamed += len(rows)
+            cursor_after = (rows[-1][sort_index], rows[-1][0])
+            yield [_leaderboard_entry(row) for row in rows]
+            if len(rows) < batch_size:
+                break
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.info("Leaderboard streamed: %d meals", streamed)
+
+def load_leaderboard() -> None:
+    """
+    Loads every ranked meal into the in-memory leaderboard.
+
+    From then on the leaderboard is kept up to date by update_meal_stats(), record_battle_result(),
+    delete_meal() and clear_meals(), and get_leaderboard() no longer queries the database.
+
+    Raises:
+        sqlite3.Error: For any database-related errors encountered.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Hold the lock so no write lands between the load and the first incremental update
+            with _leaderboard.lock:
+                cursor.execute(f"SELECT {LEADERBOARD_COLUMNS} FROM meals WHERE deleted = 0 AND battles > 0")
+                _leaderboard.load(cursor.fetchall())
+
+        logger.info("Leaderboard loaded into memory")
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def get_leaderboard_rank(meal_id: int, sort_by: str="wins") -> dict[str, Any]:
+    """
+    Retrieve a meal's leaderboard entry together with its 1-based rank.
+
+    Args:
+        meal_id (int): The ID of the meal.
+        sort_by (str, optional): The sorting criterion for the ranking. Can be either "wins" (default) or "win_pct".
+
+    Returns:
+        dict: The meal's leaderboard entry with an additional 'rank' key.
+
+    Raises:
+        ValueError: If the `sort_by` parameter is neither "wins" nor "win_pct".
+        ValueError: If the meal is not found, has been deleted, or has not battled yet.
+        sqlite3.Error: For any database-related errors encountered.
+    """
+    if sort_by not in ("wins", "win_pct"):
+        logger.error("Invalid sort_by parameter: %s", sort_by)
+        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+
+    if _leaderboard.loaded:
+        entry = _leaderboard.rank(meal_id, sort_by)
+        if entry is None:
+            logger.info("Meal with ID %s is not on the leaderboard", meal_id)
+            raise ValueError(f"Meal with ID {meal_id} is not on the leaderboard")
+        return entry
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {LEADERBOARD_COLUMNS} FROM meals WHERE id = ? AND deleted = 0 AND battles > 0",
+                           (meal_id,))
+            row = cursor.fetchone()
+            if not row:
+                logger.info("Meal with ID %s is not on the leaderboard", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} is not on the leaderboard")
+
+            column = 'wins' if sort_by == 'wins' else 'win_pct'
+            value = row[6] if sort_by == 'wins' else row[7]
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM meals WHERE deleted = 0 AND battles > 0
+                AND ({column} > ? OR ({column} = ? AND id < ?))
+            """, (value, value, meal_id))
+            entry = _leaderboard_entry(row)
+            entry['rank'] = cursor.fetchone()[0] + 1
+
+        return entry
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
 def get_meal_by_id(meal_id: int) -> Meal:
     """
     Retrieves a meal from the database by its meal name.
@@ -185,6 +769,15 @@ def get_meal_by_id(meal_id: int) -> Meal:
     Raises:
         ValueError: If the meal is not found or is marked as deleted.
     """
+    cached = _meals_by_id.get(meal_id)
+    if cached is not None:
+        return cached
+
+    return _coalesce(("meal_by_id", meal_id), lambda: _fetch_meal_by_id(meal_id))
+
+def _fetch_meal_by_id(meal_id: int) -> Meal:
+    # Read before the query, so a row loaded before a delete is not cached after it
+    generation = _meals_by_id.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -195,7 +788,9 @@ def get_meal_by_id(meal_id: int) -> Meal:
                 if row[5]:
                     logger.info("Meal with ID %s has been deleted", meal_id)
                     raise ValueError(f"Meal with ID {meal_id} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                _meals_by_id.set(meal.id, meal, generation)
+                return meal
             else:
                 logger.info("Meal with ID %s not found", meal_id)
                 raise ValueError(f"Meal with ID {meal_id} not found")
@@ -216,6 +811,15 @@ def get_meal_by_name(meal_name: str) -> Meal:
         ValueError: If the meal is deleted or does not exist.
         sqlite3.Error: For any database-related errors encountered.
     """
+    cached = _meals_by_name.get(meal_name)
+    if cached is not None:
+        return cached
+
+    return _coalesce(("meal_by_name", meal_name), lambda: _fetch_meal_by_name(meal_name))
+
+def _fetch_meal_by_name(meal_name: str) -> Meal:
+    # Read before the query, so a row loaded before a delete is not cached after it
+    generation = _meals_by_name.generation()
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -226,7 +830,9 @@ def get_meal_by_name(meal_name: str) -> Meal:
                 if row[5]:
                     logger.info("Meal with name %s has been deleted", meal_name)
                     raise ValueError(f"Meal with name {meal_name} has been deleted")
-                return Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+                _meals_by_name.set(meal.meal, meal, generation)
+                return meal
             else:
                 logger.info("Meal with name %s not found", meal_name)
                 raise ValueError(f"Meal with name {meal_name} not found")
@@ -235,6 +841,175 @@ def get_meal_by_name(meal_name: str) -> Meal:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _lookup_meal_rows(column: str, keys: List[Any]) -> dict[Any, tuple]:
+    """
+    Fetches the (id, meal, cuisine, price, difficulty, deleted) rows whose `column` is one of
+    `keys` with a single query, keyed by that column.
+
+    Up to SQL_MAX_PARAMETERS keys are bound into an IN list; larger lookups are loaded into a
+    temporary table on the connection and joined against meals, which uses the same index.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        columns = "m.id, m.meal, m.cuisine, m.price, m.difficulty, m.deleted"
+        if len(keys) <= SQL_MAX_PARAMETERS:
+            placeholders = ", ".join("?" for _ in keys)
+            cursor.execute(f"SELECT {columns} FROM meals m WHERE m.{column} IN ({placeholders})", keys)
+            rows = cursor.fetchall()
+        else:
+            # The temp table lives in the connection's own temp database, so filling it takes no
+            # lock on meals; rolling back empties it again for the connection's next user
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS meal_lookup (key PRIMARY KEY)")
+            cursor.executemany("INSERT OR IGNORE INTO temp.meal_lookup (key) VALUES (?)", [(key,) for key in keys])
+            cursor.execute(f"SELECT {columns} FROM temp.meal_lookup l JOIN meals m ON m.{column} = l.key")
+            rows = cursor.fetchall()
+            conn.rollback()
+
+    index = 0 if column == "id" else 1
+    return {row[index]: row for row in rows}
+
+def _get_meals_by(column: str, keys: List[Any], cache: LRUCache) -> dict[str, list]:
+    if len(keys) > MEAL_LOOKUP_MAX:
+        raise ValueError(f"Too many meals to look up: {len(keys)}. At most {MEAL_LOOKUP_MAX} per call.")
+
+    result = {'found': [], 'deleted': [], 'missing': []}
+    if not keys:
+        return result
+
+    # Keep the caller's order and drop repeats
+    keys = list(dict.fromkeys(keys))
+    cached = {key: cache.get(key) for key in keys}
+    uncached = [key for key in keys if cached[key] is None]
+
+    rows = {}
+    generation = cache.generation()
+    if uncached:
+        try:
+            rows = _lookup_meal_rows(column, uncached)
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+    for key in keys:
+        meal = cached[key]
+        if meal is None and key in rows:
+            row = rows[key]
+            if row[5]:
+                result['deleted'].append(key)
+                continue
+            meal = Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4])
+            cache.set(key, meal, generation)
+        if meal is None:
+            result['missing'].append(key)
+        else:
+            result['found'].append(meal)
+
+    logger.info("Looked up %d meals by %s: %d found, %d deleted, %d missing", len(keys), column,
+                len(result['found']), len(result['deleted']), len(result['missing']))
+    return result
+
+def get_meals_by_ids(meal_ids: List[int]) -> dict[str, list]:
+    """
+    Retrieves many meals by ID with one database query, serving cached meals from the cache.
+
+    Args:
+        meal_ids (List[int]): The IDs to look up. Repeated IDs are looked up once.
+
+    Returns:
+        dict: 'found' (List[Meal]) in the order requested, and the IDs of meals that are
+        'deleted' or 'missing'.
+
+    Raises:
+        ValueError: If an ID is not an integer, or there are more than MEAL_LOOKUP_MAX IDs.
+        sqlite3.Error: For any database-related errors encountered.
+    """
+    if any(not isinstance(meal_id, int) or isinstance(meal_id, bool) for meal_id in meal_ids):
+        raise ValueError("Meal IDs must be integers.")
+    return _get_meals_by("id", meal_ids, _meals_by_id)
+
+def get_meals_by_names(meal_names: List[str]) -> dict[str, list]:
+    """
+    Retrieves many meals by name with one database query, serving cached meals from the cache.
+
+    Args:
+        meal_names (List[str]): The names to look up. Repeated names are looked up once.
+
+    Returns:
+        dict: 'found' (List[Meal]) in the order requested, and the names of meals that are
+        'deleted' or 'missing'.
+
+    Raises:
+        ValueError: If a name is not a string, or there are more than MEAL_LOOKUP_MAX names.
+        sqlite3.Error: For any database-related errors encountered.
+    """
+    if any(not isinstance(meal_name, str) for meal_name in meal_names):
+        raise ValueError("Meal names must be strings.")
+    return _get_meals_by("meal", meal_names, _meals_by_name)
+
+
+def find_opponents(meal_id: int, limit: int = 5) -> List[Meal]:
+    """
+    Finds the meals whose battle score is closest to a given meal's, for evenly matched battles.
+
+    Scans the battle_score index upwards and downwards from the meal's score, so only about
+    2 * limit rows are read regardless of the size of the catalog.
+
+    Args:
+        meal_id (int): The ID of the meal looking for opponents.
+        limit (int, optional): The number of opponents to return. Default is 5.
+
+    Returns:
+        List[Meal]: The closest matched meals, closest first.
+
+    Raises:
+        ValueError: If the limit is not positive, or the meal is deleted or does not exist.
+        sqlite3.Error: If any database error occurs.
+    """
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a positive integer.")
+
+    meal = get_meal_by_id(meal_id)
+    score = meal.battle_score
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty FROM meals
+                WHERE deleted = 0 AND battle_score >= ? AND id != ?
+                ORDER BY battle_score, id LIMIT ?
+            """, (score, meal_id, limit))
+            rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty FROM meals
+                WHERE deleted = 0 AND battle_score < ?
+                ORDER BY battle_score DESC, id LIMIT ?
+            """, (score, limit))
+            rows.extend(cursor.fetchall())
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    opponents = [Meal(id=row[0], meal=row[1], cuisine=row[2], price=row[3], difficulty=row[4]) for row in rows]
+    opponents.sort(key=lambda opponent: (abs(opponent.battle_score - score), opponent.id))
+    logger.info("Found %d opponents for meal %s", min(len(opponents), limit), meal_id)
+    return opponents[:limit]
+
+
+def clear_meal_cache() -> None:
+    """
+    Drops every cached meal lookup.
+    """
+    _meals_by_id.clear()
+    _meals_by_name.clear()
+
+def get_meal_cache_stats() -> dict[str, dict]:
+    """
+    Returns the hit/miss counters of the meal lookup caches.
+    """
+    return {'by_id': _meals_by_id.stats(), 'by_name': _meals_by_name.stats()}
+
 
 def update_meal_stats(meal_id: int, result: str) -> None:
     """
@@ -270,7 +1045,118 @@ def update_meal_stats(meal_id: int, result: str) -> None:
             else:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
-            conn.commit()
+            _commit_and_update_leaderboard(conn, [meal_id])
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def record_battle_result(winner_id: int, loser_id: int) -> None:
+    """
+    Records the outcome of a battle, updating the stats of both meals in one transaction.
+
+    Both meals are validated with a single query and both rows are updated by a single
+    statement, so the winner and loser are always updated together.
+
+    Args:
+        winner_id (int): The id of the meal that won the battle.
+        loser_id (int): The id of the meal that lost the battle.
+
+    Raises:
+        ValueError: If the winner and loser are the same meal.
+        ValueError: If either meal has been deleted.
+        ValueError: If either meal is not found.
+        sqlite3.Error: If any database error occurs.
+    """
+    if winner_id == loser_id:
+        raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # sqlite3 only opens a transaction at the first write, so take the write lock up front
+            # to keep a concurrent delete from landing between the check and the update
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT id, deleted FROM meals WHERE id IN (?, ?)", (winner_id, loser_id))
+            deleted_by_id = dict(cursor.fetchall())
+
+            for meal_id in (winner_id, loser_id):
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if deleted_by_id[meal_id]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+            cursor.execute("""
+                UPDATE meals
+                SET battles = battles + 1,
+                    wins = wins + CASE WHEN id = ? THEN 1 ELSE 0 END
+                WHERE id IN (?, ?)
+            """, (winner_id, winner_id, loser_id))
+            _commit_and_update_leaderboard(conn, [winner_id, loser_id])
+
+            logger.info("Battle result recorded: winner %s, loser %s", winner_id, loser_id)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def record_battle_results(results: List[Tuple[int, int]]) -> None:
+    """
+    Records the outcomes of many battles, e.g. a whole tournament, in one transaction.
+
+    Results are aggregated per meal first, so each meal's row is updated once no matter how
+    many battles it fought.
+
+    Args:
+        results (List[Tuple[int, int]]): (winner_id, loser_id) pairs.
+
+    Raises:
+        ValueError: If a meal battles itself.
+        ValueError: If any meal has been deleted or is not found.
+        sqlite3.Error: If any database error occurs. No results are recorded in that case.
+    """
+    battles = Counter()
+    wins = Counter()
+    for winner_id, loser_id in results:
+        if winner_id == loser_id:
+            raise ValueError(f"Meal with ID {winner_id} cannot battle itself")
+        battles[winner_id] += 1
+        battles[loser_id] += 1
+        wins[winner_id] += 1
+
+    meal_ids = list(battles)
+    if not meal_ids:
+        return
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Hold the write lock from the check to the commit, as record_battle_result() does
+            cursor.execute("BEGIN IMMEDIATE")
+            deleted_by_id = {}
+            for start in range(0, len(meal_ids), SQL_MAX_PARAMETERS):
+                chunk = meal_ids[start:start + SQL_MAX_PARAMETERS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"SELECT id, deleted FROM meals WHERE id IN ({placeholders})", chunk)
+                deleted_by_id.update(cursor.fetchall())
+
+            for meal_id in meal_ids:
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if deleted_by_id[meal_id]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+            cursor.executemany(
+                "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?",
+                [(battles[meal_id], wins[meal_id], meal_id) for meal_id in meal_ids]
+            )
+            _commit_and_update_leaderboard(conn, meal_ids)
+
+            logger.info("Recorded %d battle results for %d meals", len(results), len(meal_ids))
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -0,0 +1,237 @@
+from dataclasses import dataclass
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from meal_max.models.kitchen_model import DIFFICULTY_MODIFIER, SQL_MAX_PARAMETERS
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Difficulties are stored as small integer codes that index into DIFFICULTY_MODIFIERS
+DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(DIFFICULTY_MODIFIER)}
+DIFFICULTY_MODIFIERS = np.array(list(DIFFICULTY_MODIFIER.values()), dtype=np.float64)
+
+# Upper bound on the pairings of a single simulation, to keep its arrays in memory
+SIMULATION_MAX_PAIRS = int(os.getenv("SIMULATION_MAX_PAIRS", "1000000"))
+
+
+@dataclass
+class MealArrays:
+    """
+    The battle-relevant columns of a set of meals, one NumPy array per column.
+
+    Row i of every array describes the same meal, so any pairing of meals can be expressed as
+    two arrays of row indices.
+    """
+    ids: np.ndarray
+    names: List[str]
+    prices: np.ndarray
+    cuisine_lengths: np.ndarray
+    difficulty_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self) -> np.ndarray:
+        """
+        Returns the battle score of every meal, as Meal.battle_score computes it.
+        """
+        return battle_scores(self.prices, self.cuisine_lengths, self.difficulty_codes)
+
+    def indices(self, meal_ids: Any) -> np.ndarray:
+        """
+        Maps meal IDs to row indices.
+
+        Raises:
+            ValueError: If any meal is not part of these arrays.
+        """
+        meal_ids = np.asarray(meal_ids, dtype=np.int64)
+        order = np.argsort(self.ids)
+        positions = np.searchsorted(self.ids, meal_ids, sorter=order)
+        positions = np.minimum(positions, len(self.ids) - 1)
+        indices = order[positions]
+        missing = self.ids[indices] != meal_ids
+        if missing.any():
+            raise ValueError(f"Meal with ID {int(meal_ids[missing][0])} not found")
+        return indices
+
+
+def battle_scores(prices: np.ndarray, cuisine_lengths: np.ndarray, difficulty_codes: np.ndarray) -> np.ndarray:
+    """
+    Computes battle scores in bulk: price * len(cuisine) - difficulty modifier.
+    """
+    return prices * cuisine_lengths - DIFFICULTY_MODIFIERS[difficulty_codes]
+
+def win_probabilities(scores_1: np.ndarray, scores_2: np.ndarray) -> np.ndarray:
+    """
+    Returns the chance that the first combatant of each pairing wins.
+
+    A battle goes to the first combatant when the normalized score delta beats a uniform
+    random number in [0, 1), so that chance is the delta itself, capped at 1.
+    """
+    return np.minimum(np.abs(scores_1 - scores_2) / 100, 1.0)
+
+def win_probability_matrix(scores: np.ndarray) -> np.ndarray:
+    """
+    Returns an n x n matrix whose entry [i, j] is the chance that meal i wins when it is the
+    first combatant against meal j.
+    """
+    return win_probabilities(scores[:, np.newaxis], scores[np.newaxis, :])
+
+def simulate_pairs(scores_1: np.ndarray, scores_2: np.ndarray, trials: int,
+                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Simulates `trials` battles for each pairing and counts the first combatant's wins.
+
+    Every battle is an independent draw of `delta > U(0, 1)`, so the wins of a pairing follow a
+    binomial distribution and can be sampled in one step instead of one draw per battle.
+
+    Args:
+        scores_1 (np.ndarray): The battle scores of the first combatants.
+        scores_2 (np.ndarray): The battle scores of the second combatants.
+        trials (int): The number of battles per pairing.
+        rng (np.random.Generator, optional): The random generator to use.
+
+    Returns:
+        np.ndarray: The number of battles won by the first combatant of each pairing.
+    """
+    rng = rng or np.random.default_rng()
+    return rng.binomial(trials, win_probabilities(scores_1, scores_2))
+
+def load_meal_arrays(meal_ids: Optional[List[int]] = None) -> MealArrays:
+    """
+    Loads meals from the database into NumPy arrays with a single query per chunk of IDs.
+
+    Args:
+        meal_ids (List[int], optional): The meals to load. Defaults to every meal not deleted.
+
+    Returns:
+        MealArrays: The loaded meals, ordered as `meal_ids`, or by ID when loading every meal.
+
+    Raises:
+        ValueError: If any requested meal is not found or has been deleted.
+        sqlite3.Error: If any database error occurs.
+    """
+    rows = []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if meal_ids is None:
+            cursor.execute("""
+                SELECT id, meal, price, LENGTH(cuisine), difficulty, deleted FROM meals
+                WHERE deleted = 0 ORDER BY id
+            """)
+            rows = cursor.fetchall()
+        else:
+            for start in range(0, len(meal_ids), SQL_MAX_PARAMETERS):
+                chunk = meal_ids[start:start + SQL_MAX_PARAMETERS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"""
+                    SELECT id, meal, price, LENGTH(cuisine), difficulty, deleted FROM meals
+                    WHERE id IN ({placeholders})
+                """, chunk)
+                rows.extend(cursor.fetchall())
+
+    if meal_ids is not None:
+        rows_by_id = {row[0]: row for row in rows}
+        for meal_id in meal_ids:
+            if meal_id not in rows_by_id:
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if rows_by_id[meal_id][5]:
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+        rows = [rows_by_id[meal_id] for meal_id in meal_ids]
+
+    logger.info("Loaded %d meals into arrays", len(rows))
+    return MealArrays(
+        ids=np.array([row[0] for row in rows], dtype=np.int64),
+        names=[row[1] for row in rows],
+        prices=np.array([row[2] for row in rows], dtype=np.float64),
+        cuisine_lengths=np.array([row[3] for row in rows], dtype=np.float64),
+        difficulty_codes=np.array([DIFFICULTY_CODES[row[4]] for row in rows], dtype=np.int8),
+    )
+
+def simulate(meal_ids: Optional[List[int]] = None, pairs: Optional[List[Tuple[int, int]]] = None,
+             trials: int = 1000, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Estimates how meals fare against each other without recording anything.
+
+    Meals are loaded once and every pairing is scored and simulated in bulk, so the cost does not
+    depend on the database beyond the initial load.
+
+    Args:
+        meal_ids (List[int], optional): The meals to simulate. Defaults to every meal not deleted.
+        pairs (List[Tuple[int, int]], optional): (first, second) meal ID pairings. Defaults to
+            every pair of `meal_ids`, with the meal listed first as the first combatant.
+        trials (int, optional): The number of battles simulated per pairing.
+        seed (int, optional): Seed for the random generator, for reproducible results.
+
+    Returns:
+        dict: The number of 'meals', 'pairs' and 'trials', and the 'standings': each meal's
+            'score', 'bouts', 'expected_wins', 'simulated_wins' and 'win_rate', best first.
+
+    Raises:
+        ValueError: If the trials, pairs or meals are invalid, a meal is listed twice, or there
+            are too many pairings.
+        sqlite3.Error: If any database error occurs while loading meals.
+    """
+    if trials < 1:
+        raise ValueError(f"Invalid number of trials: {trials}. Must be a positive integer.")
+    if meal_ids is not None and len(set(meal_ids)) != len(meal_ids):
+        raise ValueError("Each meal can only be simulated once.")
+
+    if pairs is not None:
+        if not pairs:
+            raise ValueError("At least one pairing is required.")
+        if len(pairs) > SIMULATION_MAX_PAIRS:
+            raise ValueError(f"A simulation can have at most {SIMULATION_MAX_PAIRS} pairings.")
+        pair_ids = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        if (pair_ids[:, 0] == pair_ids[:, 1]).any():
+            raise ValueError("A meal cannot battle itself.")
+        if meal_ids is None:
+            meal_ids = [int(meal_id) for meal_id in np.unique(pair_ids)]
+
+    arrays = load_meal_arrays(meal_ids)
+    count = len(arrays)
+
+    if pairs is not None:
+        first, second = arrays.indices(pair_ids[:, 0]), arrays.indices(pair_ids[:, 1])
+    else:
+        if count * (count - 1) // 2 > SIMULATION_MAX_PAIRS:
+            raise ValueError(f"A simulation can have at most {SIMULATION_MAX_PAIRS} pairings.")
+        first, second = np.triu_indices(count, k=1)
+        if not len(first):
+            raise ValueError("A simulation needs at least two meals.")
+
+    scores = arrays.scores()
+    probabilities = win_probabilities(scores[first], scores[second])
+    wins_first = simulate_pairs(scores[first], scores[second], trials, np.random.default_rng(seed))
+
+    bouts = np.bincount(first, minlength=count) + np.bincount(second, minlength=count)
+    expected_wins = (np.bincount(first, weights=probabilities, minlength=count)
+                     + np.bincount(second, weights=1 - probabilities, minlength=count)) * trials
+    simulated_wins = (np.bincount(first, weights=wins_first, minlength=count)
+                      + np.bincount(second, weights=trials - wins_first, minlength=count))
+
+    logger.info("Simulated %d battles over %d pairings of %d meals", len(first) * trials, len(first), count)
+
+    standings = []
+    for i in np.argsort(-simulated_wins, kind='stable'):
+        if not bouts[i]:
+            continue
+        standings.append({
+            'id': int(arrays.ids[i]),
+            'meal': arrays.names[i],
+            'score': float(scores[i]),
+            'bouts': int(bouts[i]) * trials,
+            'expected_wins': round(float(expected_wins[i]), 2),
+            'simulated_wins': int(simulated_wins[i]),
+            'win_rate': round(float(simulated_wins[i]) / (int(bouts[i]) * trials), 4),
+        })
+
+    return {'meals': count, 'pairs': len(first), 'trials': trials, 'standings': standings}
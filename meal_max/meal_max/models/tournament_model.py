@@ -0,0 +1,229 @@
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from meal_max.models.battle_model import BattleModel, first_combatant_wins
+from meal_max.models.kitchen_model import Meal, get_meals_by_ids, record_battle_results
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.random_utils import draw_random
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+TOURNAMENT_FORMATS = ['single_elimination', 'round_robin', 'swiss']
+
+# Largest field a single tournament may have; round robin grows quadratically with it
+TOURNAMENT_MAX_MEALS = int(os.getenv("TOURNAMENT_MAX_MEALS", "1024"))
+
+
+class Tournament:
+    """
+    Runs every bout of a tournament server-side and records the results in one batch.
+
+    Meals are loaded and scored once up front, so each bout only costs a random draw. Results are
+    collected in memory and written with record_battle_results() when the tournament is over.
+
+    Attributes:
+        meals (List[Meal]): The entrants, in seeding order.
+        rounds (List[List[dict]]): The bouts of each round, filled in by the run_* methods.
+        results (List[tuple]): The (winner_id, loser_id) pair of every bout, filled in by the run_* methods.
+    """
+
+    def __init__(self, meals: List[Meal]):
+        self.meals = meals
+        self.rounds: List[List[dict]] = []
+        self.results: List[tuple] = []
+
+        battle_model = BattleModel()
+        self._scores = {meal.id: battle_model.get_battle_score(meal) for meal in meals}
+        self._wins = {meal.id: 0 for meal in meals}
+        self._losses = {meal.id: 0 for meal in meals}
+
+    def bout(self, meal_1: Meal, meal_2: Meal) -> Meal:
+        """
+        Runs a single battle between two entrants and returns the winner.
+        """
+        if first_combatant_wins(self._scores[meal_1.id], self._scores[meal_2.id], draw_random()):
+            winner, loser = meal_1, meal_2
+        else:
+            winner, loser = meal_2, meal_1
+
+        self._wins[winner.id] += 1
+        self._losses[loser.id] += 1
+        self.results.append((winner.id, loser.id))
+        self.rounds[-1].append({'meal_1': meal_1.id, 'meal_2': meal_2.id, 'winner': winner.id})
+        return winner
+
+    def bye(self, meal: Meal) -> None:
+        """
+        Lets a meal sit out the current round.
+        """
+        self.rounds[-1].append({'bye': meal.id})
+
+    def standings(self) -> List[Dict[str, Any]]:
+        """
+        Returns the entrants ordered by wins, then by fewest losses, then by seed.
+        """
+        seeds = {meal.id: seed for seed, meal in enumerate(self.meals)}
+        ordered = sorted(self.meals, key=lambda meal: (-self._wins[meal.id], self._losses[meal.id], seeds[meal.id]))
+        return [
+            {'id': meal.id, 'meal': meal.meal, 'wins': self._wins[meal.id], 'losses': self._losses[meal.id]}
+            for meal in ordered
+        ]
+
+    def run_single_elimination(self) -> Meal:
+        """
+        Runs a knockout bracket laid out in standard seed order (1 v 8, 4 v 5, 2 v 7, 3 v 6 for
+        eight meals), so the top two seeds can only meet in the final. When the field is not a
+        power of two, the top seeds get first-round byes.
+        """
+        size = 2 ** math.ceil(math.log2(len(self.meals)))
+        slots = [self.meals[seed - 1] if seed <= len(self.meals) else None for seed in _bracket_order(size)]
+
+        self.rounds.append([])
+        remaining = []
+        for meal_1, meal_2 in zip(slots[::2], slots[1::2]):
+            if meal_2 is None:
+                self.bye(meal_1)
+                remaining.append(meal_1)
+            else:
+                remaining.append(self.bout(meal_1, meal_2))
+
+        while len(remaining) > 1:
+            self.rounds.append([])
+            remaining = [self.bout(remaining[i], remaining[i + 1]) for i in range(0, len(remaining), 2)]
+
+        return remaining[0]
+
+    def run_round_robin(self) -> Meal:
+        """
+        Runs a bout between every pair of entrants, scheduled with the circle method so every
+        meal fights at most once per round.
+        """
+        entrants: List[Optional[Meal]] = list(self.meals)
+        if len(entrants) % 2:
+            entrants.append(None)
+
+        for _ in range(len(entrants) - 1):
+            self.rounds.append([])
+            half = len(entrants) // 2
+            for meal_1, meal_2 in zip(entrants[:half], reversed(entrants[half:])):
+                if meal_1 is None or meal_2 is None:
+                    self.bye(meal_1 or meal_2)
+                else:
+                    self.bout(meal_1, meal_2)
+            # Keep the first entrant fixed and rotate everyone else
+            entrants = [entrants[0], entrants[-1]] + entrants[1:-1]
+
+        return self.meals_by_id()[self.standings()[0]['id']]
+
+    def run_swiss(self, rounds: Optional[int] = None) -> Meal:
+        """
+        Runs a Swiss system: each round pairs meals with equal or similar records, avoiding
+        rematches where possible. With an odd field the lowest ranked meal without a bye sits out.
+
+        Args:
+            rounds (int, optional): The number of rounds. Defaults to ceil(log2(number of meals)).
+        """
+        rounds = rounds or math.ceil(math.log2(len(self.meals)))
+        meals_by_id = self.meals_by_id()
+        played = {meal.id: set() for meal in self.meals}
+        had_bye = set()
+
+        for _ in range(rounds):
+            self.rounds.append([])
+            ranked = [meals_by_id[entry['id']] for entry in self.standings()]
+
+            if len(ranked) % 2:
+                sitting_out = next((meal for meal in reversed(ranked) if meal.id not in had_bye), ranked[-1])
+                had_bye.add(sitting_out.id)
+                ranked.remove(sitting_out)
+                self.bye(sitting_out)
+
+            while ranked:
+                meal_1 = ranked.pop(0)
+                # Pair with the closest ranked meal not met yet, or the closest one if all have been met
+                opponent = next((meal for meal in ranked if meal.id not in played[meal_1.id]), ranked[0])
+                ranked.remove(opponent)
+                played[meal_1.id].add(opponent.id)
+                played[opponent.id].add(meal_1.id)
+                self.bout(meal_1, opponent)
+
+        return meals_by_id[self.standings()[0]['id']]
+
+    def meals_by_id(self) -> Dict[int, Meal]:
+        return {meal.id: meal for meal in self.meals}
+
+
+def _bracket_order(size: int) -> List[int]:
+    """
+    Returns the seeds 1..size in bracket order: neighbouring slots meet in the first round, and
+    the top seeds are spread out so they meet as late as possible.
+    """
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+def run_tournament(meal_ids: List[int], fmt: str = 'single_elimination', rounds: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Runs a whole tournament between the given meals and records every result.
+
+    Args:
+        meal_ids (List[int]): The IDs of the entrants, in seeding order.
+        fmt (str, optional): 'single_elimination' (default), 'round_robin' or 'swiss'.
+        rounds (int, optional): The number of rounds of a Swiss tournament.
+
+    Returns:
+        dict: The 'format', the 'champion', the bouts of every round as 'rounds', and the final 'standings'.
+
+    Raises:
+        ValueError: If the format is invalid, there are fewer than two or duplicate meals, the
+            field is larger than TOURNAMENT_MAX_MEALS, or there are more Swiss rounds than meals - 1.
+        ValueError: If any meal is not found or has been deleted.
+        sqlite3.Error: If any database error occurs while loading meals or recording results.
+    """
+    if fmt not in TOURNAMENT_FORMATS:
+        raise ValueError(f"Invalid tournament format: {fmt}. Must be one of {TOURNAMENT_FORMATS}.")
+    if len(meal_ids) < 2:
+        raise ValueError("A tournament needs at least two meals.")
+    if len(set(meal_ids)) != len(meal_ids):
+        raise ValueError("Each meal can only enter a tournament once.")
+    if len(meal_ids) > TOURNAMENT_MAX_MEALS:
+        raise ValueError(f"A tournament can have at most {TOURNAMENT_MAX_MEALS} meals.")
+    if rounds is not None and (fmt != 'swiss' or rounds < 1):
+        raise ValueError("The number of rounds can only be set for Swiss tournaments, and must be positive.")
+    if rounds is not None and rounds > len(meal_ids) - 1:
+        # Past this every pairing is a rematch; use a round robin instead
+        raise ValueError(f"A Swiss tournament of {len(meal_ids)} meals can have at most {len(meal_ids) - 1} rounds.")
+
+    lookup = get_meals_by_ids(meal_ids)
+    if lookup['missing']:
+        raise ValueError(f"Meal with ID {lookup['missing'][0]} not found")
+    if lookup['deleted']:
+        raise ValueError(f"Meal with ID {lookup['deleted'][0]} has been deleted")
+    meals = lookup['found']
+    logger.info("Starting %s tournament with %d meals", fmt, len(meals))
+
+    tournament = Tournament(meals)
+    if fmt == 'single_elimination':
+        champion = tournament.run_single_elimination()
+    elif fmt == 'round_robin':
+        champion = tournament.run_round_robin()
+    else:
+        champion = tournament.run_swiss(rounds)
+
+    record_battle_results(tournament.results)
+    logger.info("Tournament finished after %d bouts, champion: %s", len(tournament.results), champion.meal)
+
+    return {
+        'format': fmt,
+        'champion': {'id': champion.id, 'meal': champion.meal},
+        'rounds': tournament.rounds,
+        'standings': tournament.standings(),
+    }
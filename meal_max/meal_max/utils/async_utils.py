@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import threading
+from typing import Any, Callable
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class BoundedExecutor:
+    """
+    Runs blocking calls (SQLite queries, provider refills) off the event loop on a fixed set
+    of threads.
+
+    The number of threads bounds how many blocking calls run at once; `max_pending` bounds how
+    many may be queued or running, so a burst of requests is shed instead of piling up.
+
+    Attributes:
+        max_workers (int): The number of threads, e.g. the size of the database pool.
+        max_pending (int): The most calls queued or running at once.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        if max_workers < 1 or max_pending < max_workers:
+            raise ValueError(f"Invalid executor bounds: {max_workers} workers, {max_pending} pending. "
+                             "Need at least one worker and no fewer pending slots than workers.")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="meal_max_db")
+
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # metrics
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs `func(*args, **kwargs)` on the executor and returns its result.
+
+        Raises:
+            RuntimeError: If `max_pending` calls are already queued or running.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise RuntimeError("Server is busy, try again later.")
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def shutdown(self) -> None:
+        """
+        Waits for running calls to finish and stops the threads.
+        """
+        self.executor.shutdown(wait=True)
+        logger.info("Executor shut down after %d calls.", self._completed)
+
+    def stats(self) -> dict:
+        """
+        Returns the executor's counters.
+
+        Returns:
+            dict: The thread and pending limits, the calls pending now, and completed/rejected counts.
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
@@ -0,0 +1,214 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class LRUCache:
+    """
+    A thread-safe cache bounded by entry count, with optional per-entry time to live.
+
+    When the cache is full, the least recently used entry is evicted. Entries older than
+    `ttl` seconds are treated as misses and dropped on access.
+
+    Attributes:
+        maxsize (int): The maximum number of entries. A size of 0 disables the cache.
+        ttl (float, optional): How long an entry stays valid, in seconds. None means forever.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        if maxsize < 0:
+            raise ValueError(f"Invalid cache size: {maxsize}. Cache size must not be negative.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        # metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for a key and marks it as recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any): The value to return on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return default
+
+    def generation(self) -> int:
+        """
+        Returns a counter that moves on every invalidation. Read it before loading a value and
+        pass it to set(), so a value loaded before an invalidation is not cached after it.
+        """
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Caches a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The key to cache the value under.
+            value (Any): The value to cache.
+            generation (int, optional): The generation() read before the value was loaded. If
+                anything was invalidated since, the value may be stale and is not cached.
+        """
+        if self.maxsize == 0:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a key from the cache, if present.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Removes every entry whose value matches the predicate.
+
+        Args:
+            predicate (Callable[[Any], bool]): Called with each cached value.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache. Counters are kept.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache's counters.
+
+        Returns:
+            dict: The size and capacity of the cache, hit/miss/eviction counts, and hit rate.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class _Flight:
+    # One in-flight call: the leader fills in the outcome, then wakes the followers
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is running, further calls
+    for the same key wait for it and share its result (or its exception) instead of running again.
+
+    Nothing is kept once a call finishes, so unlike a cache this never serves a result computed
+    before the caller arrived, except to callers that arrived while it was still running.
+    Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+
+        # metrics
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Returns `func()`, or the result of the identical call already running for `key`.
+
+        Args:
+            key (Hashable): Identifies calls that would return the same result.
+            func (Callable[[], Any]): The call to run if none is in flight for the key.
+
+        Raises:
+            Exception: Whatever `func` raised, in the leader and in every caller that waited on it.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> dict:
+        """
+        Returns the counters.
+
+        Returns:
+            dict: The calls executed, the calls that shared another call's result, and the calls running now.
+        """
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._flights),
+            }
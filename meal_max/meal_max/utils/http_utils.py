@@ -0,0 +1,151 @@
+import gzip
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask, Request, Response
+from flask.json.provider import DefaultJSONProvider
+
+from meal_max.utils.logger import configure_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# "orjson" serializes responses with orjson, "default" with Flask's json-based provider
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+# Encodings in order of preference when the client accepts several equally, and the smallest
+# body worth compressing, in bytes. An empty COMPRESSION_ALGORITHMS disables compression.
+COMPRESSION_ALGORITHMS = [name.strip() for name in os.getenv("COMPRESSION_ALGORITHMS", "zstd,br,gzip").split(",") if name.strip()]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    A Flask JSON provider that serializes with orjson, which handles dataclasses such as Meal
+    natively and writes bytes straight into the response.
+
+    Dict keys are sorted as with the default provider, and anything orjson cannot serialize
+    falls back to the default provider's conversions. Unlike the default provider, non-ASCII
+    text is written as UTF-8 rather than escaped, and dataclass fields keep declaration order.
+    """
+
+    def _options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Options orjson does not support, such as indent, go through the json module
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_json_provider(app: Flask, name: str = JSON_PROVIDER) -> DefaultJSONProvider:
+    """
+    Returns the JSON provider called `name` for the app.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    if name == "orjson":
+        if orjson is not None:
+            return OrjsonProvider(app)
+        logger.warning("orjson is not installed; using the default JSON provider.")
+        return DefaultJSONProvider(app)
+    if name == "default":
+        return DefaultJSONProvider(app)
+    raise ValueError(f"Invalid JSON provider: {name}. Must be 'orjson' or 'default'.")
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    # Levels favour speed, since every response is compressed on the request path
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=5)
+    if zstandard is not None:
+        compressors['zstd'] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+    return compressors
+
+COMPRESSORS = _compressors()
+
+
+def choose_encoding(request: Request, algorithms: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Picks the content encoding for a response from the request's Accept-Encoding header.
+
+    The client's highest quality value wins; ties go to the earliest entry in `algorithms`.
+    Returns None if the client accepts none of them.
+    """
+    available = [name for name in (algorithms if algorithms is not None else COMPRESSION_ALGORITHMS)
+                 if name in COMPRESSORS]
+    best, best_quality = None, 0
+    for name in available:
+        quality = request.accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress_response(request: Request, response: Response) -> Response:
+    """
+    Compresses a buffered response body with the best encoding the client accepts.
+
+    Small bodies, streamed bodies, non-text content and responses that already have a
+    Content-Encoding are left alone. A strong ETag becomes weak, since the compressed bytes
+    differ from the uncompressed ones but mean the same.
+    """
+    if not COMPRESSION_ALGORITHMS or response.status_code != 200 or request.method == "HEAD":
+        return response
+    if response.is_streamed or response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if response.content_length is not None and response.content_length < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    response.set_data(COMPRESSORS[encoding](response.get_data()))
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -1,26 +1,213 @@
+import atexit
+import copy
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+import threading
+from typing import Dict, Optional
 
-from flask import current_app, has_request_context
 
+# "sync" writes every record to stderr in the calling thread. "queue" hands records to a
+# background thread through a bounded queue, so request threads never wait on stderr.
+LOG_MODE = os.getenv("LOG_MODE", "sync")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# What to do when the queue is full: "drop" the record, or "block" for up to
+# LOG_QUEUE_BLOCK_TIMEOUT seconds before dropping it
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop")
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", "1.0"))
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# The level for every logger passed to configure_logger, and per-logger overrides as
+# comma-separated name=LEVEL pairs. An override applies to the named logger and the modules
+# under it, e.g. "meal_max.models=INFO,meal_max.models.kitchen_model=DEBUG".
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    A QueueHandler that drops records rather than growing without bound when the queue is full.
+
+    Attributes:
+        policy (str): "drop" to discard a record at once when the queue is full, or "block" to
+            wait up to `timeout` seconds for space first.
+        timeout (float): How long "block" waits for space, in seconds.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", timeout: float = 1.0):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Invalid log queue policy: {policy}. Must be 'drop' or 'block'.")
+
+        super().__init__(log_queue)
+        self.policy = policy
+        self.timeout = timeout
+
+        # metrics
+        self._counter_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare formats the message and traceback in the calling thread so the record
+        # can be pickled. This queue never leaves the process, so the record goes in unformatted and
+        # the listener's handler formats it. The copy keeps the listener's formatting from touching
+        # the record other handlers in the calling thread still see.
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._counter_lock:
+                self._dropped += 1
+            return
+
+        with self._counter_lock:
+            self._enqueued += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the handler's counters.
+
+        Returns:
+            dict: The queue limit and policy, the records waiting now, and enqueued/dropped counts.
+        """
+        with self._counter_lock:
+            return {
+                'mode': 'queue',
+                'policy': self.policy,
+                'queue_size': self.queue.maxsize,
+                'buffered': self.queue.qsize(),
+                'enqueued': self._enqueued,
+                'dropped': self._dropped,
+            }
+
+
+class _FlushingQueueListener(QueueListener):
+    # The stock listener enqueues its stop sentinel with put_nowait, which fails on a full queue.
+    # Waiting for space instead means every buffered record is written before shutdown.
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
 
-    # Create a console handler that logs to stderr
+
+_queue_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_queue_lock = threading.Lock()
+
+_root_handler: Optional[logging.Handler] = None
+_root_lock = threading.Lock()
+
+
+def _create_stream_handler() -> logging.Handler:
     handler = logging.StreamHandler(sys.stderr)
     handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+def _start_listener(handler: BoundedQueueHandler) -> None:
+    global _listener
+    _listener = _FlushingQueueListener(handler.queue, _create_stream_handler(), respect_handler_level=True)
+    _listener.start()
+
+def get_queue_handler() -> BoundedQueueHandler:
+    """
+    Returns the process-wide queue handler, starting the thread that writes its records to stderr.
+    """
+    global _queue_handler
+    if _queue_handler is None:
+        with _queue_lock:
+            if _queue_handler is None:
+                handler = BoundedQueueHandler(queue.Queue(LOG_QUEUE_SIZE), LOG_QUEUE_POLICY, LOG_QUEUE_BLOCK_TIMEOUT)
+                _start_listener(handler)
+                atexit.register(stop_log_listener)
+                _queue_handler = handler
+    return _queue_handler
+
+def stop_log_listener() -> None:
+    """
+    Writes out the records still queued and stops the listener thread.
+    """
+    global _listener
+    with _queue_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def reset_log_listener() -> None:
+    """
+    Gives the queue handler a fresh queue and listener thread. Call this in a forked child:
+    the parent's listener thread does not survive fork(), and its queue lock may be held.
+    """
+    global _listener
+    with _queue_lock:
+        if _queue_handler is not None:
+            _queue_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+            _start_listener(_queue_handler)
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+def get_log_stats() -> dict:
+    """
+    Returns the logging mode and, in queue mode, the queue's counters.
+    """
+    if _queue_handler is None:
+        return {'mode': LOG_MODE}
+    return _queue_handler.stats()
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+def parse_log_levels(spec: str) -> Dict[str, int]:
+    """
+    Parses per-logger levels such as "meal_max.utils.sql_utils=WARNING,asgi=INFO".
+
+    Raises:
+        ValueError: If an entry is not name=LEVEL or names an unknown level.
+    """
+    levels = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = entry.partition("=")
+        if not name.strip() or not isinstance(logging.getLevelName(level.strip().upper()), int):
+            raise ValueError(f"Invalid log level setting: {entry}. Expected name=LEVEL.")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+_levels = parse_log_levels(LOG_LEVELS)
+
+def resolve_log_level(name: str) -> int:
+    """
+    Returns the level for a logger: the override for its closest configured ancestor, or LOG_LEVEL.
+    """
+    while name:
+        if name in _levels:
+            return _levels[name]
+        name = name.rpartition(".")[0]
+    return logging.getLevelName(LOG_LEVEL.upper())
+
+def get_root_handler() -> logging.Handler:
+    """
+    Returns the handler every configured logger writes through, attaching it to the root logger
+    on first use: the queue handler in queue mode, otherwise a stderr stream handler.
+    """
+    global _root_handler
+    if _root_handler is None:
+        with _root_lock:
+            if _root_handler is None:
+                handler = get_queue_handler() if LOG_MODE == "queue" else _create_stream_handler()
+                logging.getLogger().addHandler(handler)
+                _root_handler = handler
+    return _root_handler
+
+
+def configure_logger(logger):
+    """
+    Sets a module logger's level from LOG_LEVEL and LOG_LEVELS and routes it to the root handler.
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    Safe to call any number of times: records reach the single root handler by propagation,
+    so the logger itself never gets a handler of its own.
+    """
+    get_root_handler()
+    logger.setLevel(resolve_log_level(logger.name))
+    logger.propagate = True
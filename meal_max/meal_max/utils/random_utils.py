@@ -1,5 +1,16 @@
+import asyncio
+from bisect import bisect_left
+from collections import deque
 import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from meal_max.utils.logger import configure_logger
 
@@ -7,32 +18,481 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random() -> float:
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+# random.org endpoint; point this at a local stub server in tests
+RANDOM_ORG_URL = os.getenv("RANDOM_ORG_URL", "https://www.random.org/decimal-fractions/")
+RANDOM_ORG_TIMEOUT = float(os.getenv("RANDOM_ORG_TIMEOUT", "5"))
+RANDOM_ORG_RETRIES = int(os.getenv("RANDOM_ORG_RETRIES", "2"))
+RANDOM_ORG_BACKOFF = float(os.getenv("RANDOM_ORG_BACKOFF", "0.2"))  # seconds, doubled per retry
+RANDOM_ORG_BREAKER_THRESHOLD = int(os.getenv("RANDOM_ORG_BREAKER_THRESHOLD", "5"))
+RANDOM_ORG_BREAKER_RESET = float(os.getenv("RANDOM_ORG_BREAKER_RESET", "30"))  # seconds
+
+# entropy pool settings
+RANDOM_SOURCE = os.getenv("RANDOM_SOURCE", "random.org")  # 'random.org' or 'local'
+RANDOM_FALLBACK = os.getenv("RANDOM_FALLBACK", "local")  # 'local' or 'none'
+RANDOM_POOL_BATCH_SIZE = int(os.getenv("RANDOM_POOL_BATCH_SIZE", "1000"))
+RANDOM_POOL_LOW_WATER = int(os.getenv("RANDOM_POOL_LOW_WATER", "100"))
+
+# random.org serves at most this many numbers per request
+RANDOM_ORG_MAX_NUM = 10000
+
+
+class LatencyHistogram:
+    """
+    A thread-safe histogram of request latencies with fixed bucket boundaries.
+
+    Attributes:
+        buckets (List[float]): The upper bounds of the buckets, in milliseconds.
+    """
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = buckets or [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """
+        Adds a latency measurement, in seconds.
+        """
+        milliseconds = seconds * 1000
+        with self._lock:
+            self._counts[bisect_left(self.buckets, milliseconds)] += 1
+            self._total += milliseconds
+            self._max = max(self._max, milliseconds)
+
+    def stats(self) -> dict:
+        """
+        Returns the bucket counts keyed by upper bound ('le_<ms>' and 'le_inf'), the number of
+        measurements, and their mean and maximum in milliseconds.
+        """
+        with self._lock:
+            count = sum(self._counts)
+            labels = [f"le_{bound:g}" for bound in self.buckets] + ["le_inf"]
+            return {
+                'buckets': dict(zip(labels, self._counts)),
+                'count': count,
+                'mean_ms': round(self._total / count, 3) if count else 0.0,
+                'max_ms': round(self._max, 3),
+            }
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service until it has had time to recover.
+
+    The breaker opens after `threshold` consecutive failures. While open, calls are refused
+    until `reset_timeout` seconds have passed; then a single trial call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+
+    Attributes:
+        threshold (int): The number of consecutive failures that opens the breaker.
+        reset_timeout (float): How long the breaker stays open, in seconds.
+    """
+
+    def __init__(self, threshold: int = RANDOM_ORG_BREAKER_THRESHOLD, reset_timeout: float = RANDOM_ORG_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Returns 'closed', 'open' or 'half_open'.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may be made now.
+        """
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'open':
+            return False
+        with self._lock:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Closes the breaker after a successful call.
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """
+        Counts a failed call, opening the breaker at the threshold or after a failed trial call.
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning("Opening circuit breaker after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+
+
+def create_session(pool_size: int = 4) -> requests.Session:
+    """
+    Creates an HTTP session that keeps connections to random.org alive between requests,
+    so only the first request pays for DNS, TCP and TLS setup.
+
+    Args:
+        pool_size (int): The number of keep-alive connections kept per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Shared by every random.org provider in the process
+_session = create_session()
+
+
+class RandomProvider:
+    """
+    A source of random decimal fractions in [0, 1) with two decimal places.
+
+    Subclasses implement fetch(); the entropy pool calls it to refill its buffer.
+    """
+
+    name = "base"
+
+    def fetch(self, count: int) -> List[float]:
+        """
+        Returns `count` random numbers.
+
+        Raises:
+            RuntimeError: If the source cannot be reached.
+            ValueError: If the source returns something that is not a number.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Returns provider specific metrics.
+        """
+        return {}
+
+
+class RandomOrgProvider(RandomProvider):
+    """
+    Fetches true random numbers from random.org, up to 10,000 per request.
+
+    Requests go through a keep-alive session. Failed requests are retried with exponential
+    backoff and full jitter, and a circuit breaker stops hammering random.org while it is down
+    so callers fail fast (and the entropy pool switches to its fallback).
+
+    Attributes:
+        url (str): The decimal-fractions endpoint of random.org or a compatible stub.
+        timeout (float): The request timeout in seconds.
+        retries (int): The number of retries after a failed request.
+        backoff (float): The base backoff between retries, in seconds.
+        breaker (CircuitBreaker): The circuit breaker guarding random.org.
+        latency (LatencyHistogram): The latency of every request made.
+    """
+
+    name = "random.org"
+
+    def __init__(self, url: str = RANDOM_ORG_URL, timeout: float = RANDOM_ORG_TIMEOUT,
+                 retries: int = RANDOM_ORG_RETRIES, backoff: float = RANDOM_ORG_BACKOFF,
+                 breaker: Optional[CircuitBreaker] = None, session: Optional[requests.Session] = None):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self._session = session or _session
+
+    def _request(self, url: str) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            start = time.monotonic()
+            try:
+                response = self._session.get(url, timeout=self.timeout)
+
+                # Check if the request was successful
+                response.raise_for_status()
+                return response
+
+            except requests.exceptions.RequestException as e:
+                # Client errors won't go away by retrying
+                status = getattr(e.response, 'status_code', None)
+                if attempt == self.retries or (status is not None and status < 500):
+                    raise
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                logger.warning("Request to random.org failed (%s), retrying in %.2fs", e, delay)
+                time.sleep(delay)
+
+            finally:
+                self.latency.record(time.monotonic() - start)
+
+    def fetch(self, count: int) -> List[float]:
+        url = f"{self.url}?num={count}&dec=2&col=1&format=plain&rnd=new"
+
+        if not self.breaker.allow():
+            logger.error("Circuit breaker for random.org is open.")
+            raise RuntimeError("Circuit breaker for random.org is open.")
+
+        try:
+            # Log the request to random.org
+            logger.info("Fetching random number from %s", url)
 
-    try:
-        # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
+            response = self._request(url)
 
-        response = requests.get(url, timeout=5)
+        except requests.exceptions.Timeout:
+            self.breaker.record_failure()
+            logger.error("Request to random.org timed out.")
+            raise RuntimeError("Request to random.org timed out.")
 
-        # Check if the request was successful
-        response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            logger.error("Request to random.org failed: %s", e)
+            raise RuntimeError("Request to random.org failed: %s" % e)
 
-        random_number_str = response.text.strip()
+        self.breaker.record_success()
 
+        numbers = []
+        for random_number_str in response.text.split():
+            try:
+                numbers.append(float(random_number_str))
+            except ValueError:
+                raise ValueError("Invalid response from random.org: %s" % random_number_str)
+
+        if len(numbers) != count:
+            raise ValueError("Invalid response from random.org: expected %d numbers, got %d" % (count, len(numbers)))
+
+        return numbers
+
+    def stats(self) -> dict:
+        return {'circuit_breaker': self.breaker.state, 'latency': self.latency.stats()}
+
+
+class LocalProvider(RandomProvider):
+    """
+    Generates random numbers locally from the operating system's CSPRNG.
+
+    Numbers are rounded to two decimal places to match what random.org serves.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self._random = secrets.SystemRandom()
+
+    def fetch(self, count: int) -> List[float]:
+        return [round(self._random.randrange(100) / 100, 2) for _ in range(count)]
+
+
+class EntropyPool:
+    """
+    A buffer of random numbers refilled in bulk from a provider.
+
+    Numbers are handed out from memory. When the buffer drops below the low-water mark a
+    background thread fetches another batch; if the buffer runs dry the caller refills it
+    synchronously. When the provider fails, the fallback provider (if any) fills the batch.
+
+    Attributes:
+        provider (RandomProvider): The preferred source of random numbers.
+        fallback (RandomProvider, optional): The source used when the provider fails.
+        batch_size (int): The number of random numbers fetched per refill.
+        low_water (int): The buffer size that triggers a background refill.
+    """
+
+    def __init__(self, provider: RandomProvider, fallback: Optional[RandomProvider] = None,
+                 batch_size: int = RANDOM_POOL_BATCH_SIZE, low_water: int = RANDOM_POOL_LOW_WATER):
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch size: {batch_size}. Batch size must be a positive integer.")
+        if isinstance(provider, RandomOrgProvider) and batch_size > RANDOM_ORG_MAX_NUM:
+            raise ValueError(f"Invalid batch size: {batch_size}. random.org serves at most {RANDOM_ORG_MAX_NUM} numbers.")
+
+        self.provider = provider
+        self.fallback = fallback
+        self.batch_size = batch_size
+        self.low_water = low_water
+
+        self._buffer: deque = deque()
+        self._refill_lock = threading.Lock()
+        self._refill_thread: Optional[threading.Thread] = None
+
+        # metrics
+        self._served = 0
+        self._refills = {}
+        self._failures = 0
+
+    def _refill(self) -> None:
+        with self._refill_lock:
+            # Another thread may have refilled while we were waiting for the lock
+            if len(self._buffer) > self.low_water:
+                return
+
+            try:
+                numbers = self.provider.fetch(self.batch_size)
+                source = self.provider
+            except (RuntimeError, ValueError) as e:
+                self._failures += 1
+                if self.fallback is None:
+                    raise
+                logger.warning("Random provider %s failed, using %s: %s", self.provider.name, self.fallback.name, e)
+                numbers = self.fallback.fetch(self.batch_size)
+                source = self.fallback
+
+            self._buffer.extend(numbers)
+            self._refills[source.name] = self._refills.get(source.name, 0) + 1
+            logger.info("Refilled entropy pool with %d numbers from %s", len(numbers), source.name)
+
+    def _background_refill(self) -> None:
+        try:
+            self._refill()
+        except (RuntimeError, ValueError) as e:
+            logger.error("Background refill of the entropy pool failed: %s", e)
+
+    def get(self) -> float:
+        """
+        Returns the next random number from the pool.
+
+        Raises:
+            RuntimeError: If the pool is empty and the provider (and fallback) cannot refill it.
+            ValueError: If the provider returns something that is not a number.
+        """
+        while True:
+            try:
+                number = self._buffer.popleft()
+                break
+            except IndexError:
+                self._refill()
+
+        self._drawn()
+        return number
+
+    def get_nowait(self) -> Optional[float]:
+        """
+        Returns the next random number if one is buffered, or None instead of refilling.
+
+        Never blocks on the provider, so it is safe to call from an event loop.
+        """
         try:
-            random_number = float(random_number_str)
-        except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            number = self._buffer.popleft()
+        except IndexError:
+            return None
+
+        self._drawn()
+        return number
+
+    def _drawn(self) -> None:
+        # Counts a served number and starts a background refill when the buffer runs low
+        self._served += 1
+        if len(self._buffer) <= self.low_water and not self._refill_lock.locked():
+            thread = self._refill_thread
+            if thread is None or not thread.is_alive():
+                self._refill_thread = threading.Thread(target=self._background_refill, daemon=True)
+                self._refill_thread.start()
+
+    def stats(self) -> dict:
+        """
+        Returns the pool's counters.
+
+        Returns:
+            dict: The provider names, buffered count, numbers served, refills per source, failures
+                and the provider's own metrics.
+        """
+        return {
+            'provider': self.provider.name,
+            'fallback': self.fallback.name if self.fallback else None,
+            'buffered': len(self._buffer),
+            'served': self._served,
+            'refills': dict(self._refills),
+            'failures': self._failures,
+            'provider_stats': self.provider.stats(),
+        }
+
+
+def _create_provider(name: str) -> RandomProvider:
+    if name == "random.org":
+        return RandomOrgProvider()
+    if name == "local":
+        return LocalProvider()
+    raise ValueError(f"Invalid random source: {name}. Must be 'random.org' or 'local'.")
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+_pool = None
+_pool_lock = threading.Lock()
 
-    except requests.exceptions.Timeout:
-        logger.error("Request to random.org timed out.")
-        raise RuntimeError("Request to random.org timed out.")
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Request to random.org failed: %s", e)
-        raise RuntimeError("Request to random.org failed: %s" % e)
+def get_entropy_pool() -> EntropyPool:
+    """
+    Returns the process-wide entropy pool, configured from RANDOM_SOURCE and RANDOM_FALLBACK.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                fallback = None if RANDOM_FALLBACK == "none" else _create_provider(RANDOM_FALLBACK)
+                _pool = EntropyPool(_create_provider(RANDOM_SOURCE), fallback)
+    return _pool
+
+def reset_entropy_pool() -> None:
+    """
+    Drops the process-wide entropy pool; the next draw builds a new one.
+
+    Forked worker processes call this, since the buffer and any refill thread belong to the parent.
+    """
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+def draw_random() -> float:
+    """
+    Returns a random number between 0 and 1 from the entropy pool without a network round trip.
+
+    Raises:
+        RuntimeError: If the pool is empty and cannot be refilled.
+    """
+    return get_entropy_pool().get()
+
+async def draw_random_async(run: Optional[Callable[[Callable[[], float]], Awaitable[float]]] = None) -> float:
+    """
+    Returns a random number between 0 and 1 from the entropy pool without blocking the event loop.
+
+    Buffered numbers are returned directly; only when the pool is empty is the refill awaited,
+    through `run` (e.g. BoundedExecutor.run, so its queue limit applies) or in the loop's default
+    executor if None.
+
+    Raises:
+        RuntimeError: If the pool is empty and cannot be refilled.
+    """
+    pool = get_entropy_pool()
+    number = pool.get_nowait()
+    if number is not None:
+        return number
+    if run is not None:
+        return await run(pool.get)
+    return await asyncio.get_running_loop().run_in_executor(None, pool.get)
+
+
+def get_random() -> float:
+    """
+    Fetches a single random number directly from random.org, bypassing the entropy pool.
+
+    Raises:
+        RuntimeError: If the request fails or times out.
+        ValueError: If random.org returns something that is not a number.
+    """
+    random_number = RandomOrgProvider(timeout=5, retries=0).fetch(1)[0]
+    logger.info("Received random number: %.3f", random_number)
+    return random_number
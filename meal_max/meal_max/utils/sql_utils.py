@@ -1,7 +1,11 @@
 from contextlib import contextmanager
 import logging
 import os
+import queue
 import sqlite3
+import threading
+import time
+from typing import Optional
 
 from meal_max.utils.logger import configure_logger
 
@@ -13,6 +17,278 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+# connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# database profile applied to every pooled connection
+DB_PROFILE = {
+    'journal_mode': os.getenv("DB_JOURNAL_MODE", "WAL"),
+    'synchronous': os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    'cache_size': int(os.getenv("DB_CACHE_SIZE", "-20000")),  # negative values are KiB
+    'mmap_size': int(os.getenv("DB_MMAP_SIZE", "268435456")),
+    'temp_store': os.getenv("DB_TEMP_STORE", "MEMORY"),
+    'busy_timeout': int(os.getenv("DB_BUSY_TIMEOUT", "5000")),  # milliseconds
+}
+
+VALID_PRAGMA_VALUES = {
+    'journal_mode': ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'],
+    'synchronous': ['OFF', 'NORMAL', 'FULL', 'EXTRA'],
+    'temp_store': ['DEFAULT', 'FILE', 'MEMORY'],
+}
+
+
+def apply_db_profile(conn: sqlite3.Connection, profile: Optional[dict] = None) -> None:
+    """
+    Applies the database profile (journal mode and tuning pragmas) to a connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        profile (dict, optional): The pragma settings to apply. Defaults to DB_PROFILE.
+
+    Raises:
+        ValueError: If a setting has an invalid value.
+        sqlite3.Error: If a pragma cannot be applied.
+    """
+    profile = DB_PROFILE if profile is None else profile
+
+    # PRAGMA values can't be bound as parameters, so validate them before interpolating
+    for name, value in profile.items():
+        if name in VALID_PRAGMA_VALUES:
+            if str(value).upper() not in VALID_PRAGMA_VALUES[name]:
+                raise ValueError(f"Invalid {name} setting: {value}. Must be one of {VALID_PRAGMA_VALUES[name]}.")
+        elif not isinstance(value, int):
+            raise ValueError(f"Invalid {name} setting: {value}. Must be an integer.")
+
+    for name, value in profile.items():
+        if name == 'journal_mode':
+            mode = conn.execute(f"PRAGMA journal_mode = {value};").fetchone()[0]
+            if mode.upper() != str(value).upper():
+                logger.warning("Requested journal_mode %s but database is using %s", value, mode)
+        else:
+            conn.execute(f"PRAGMA {name} = {value};")
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of long-lived SQLite connections.
+
+    Connections are checked out by a thread, used, and checked back in. On checkout a
+    connection is health checked with ``SELECT 1``; on checkin any open transaction is
+    rolled back so the next borrower always starts from a clean state. When the pool is
+    exhausted, callers wait up to ``timeout`` seconds for a connection to be returned.
+
+    Attributes:
+        db_path (str): The path to the SQLite database file.
+        size (int): The maximum number of open connections.
+        timeout (float): How long to wait for a free connection, in seconds.
+        profile (dict, optional): The pragma settings applied to each new connection.
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 profile: Optional[dict] = None):
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}. Pool size must be at least 1.")
+
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.profile = profile
+
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+        # metrics
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between worker threads, so we take care of exclusivity ourselves.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.profile is not None:
+            try:
+                apply_db_profile(conn, self.profile)
+            except (ValueError, sqlite3.Error):
+                conn.close()
+                raise
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;")
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Discarding unhealthy pooled connection: %s", str(e))
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+            self._discarded += 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Checks out a connection, opening a new one if the pool is not yet full.
+
+        Returns:
+            sqlite3.Connection: A healthy connection owned by the caller until released.
+
+        Raises:
+            RuntimeError: If the pool is closed or no connection frees up within the timeout.
+            ValueError: If the pool's database profile is invalid.
+            sqlite3.Error: If a new connection cannot be opened.
+        """
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+
+            try:
+                conn = self._idle.get_nowait()
+                with self._lock:
+                    self._hits += 1
+            except queue.Empty:
+                conn = None
+
+            if conn is None:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+                        self._misses += 1
+                if can_open:
+                    try:
+                        conn = self._connect()
+                    except (ValueError, sqlite3.Error):
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+                    logger.info("Opened new pooled database connection.")
+                    return conn
+
+                # The pool is full, wait for another thread to give a connection back
+                start = time.monotonic()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    logger.error("Timed out waiting %.1fs for a database connection.", self.timeout)
+                    raise RuntimeError("Timed out waiting for a database connection.")
+                finally:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_time += time.monotonic() - start
+
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """
+        Checks a connection back in, rolling back anything left uncommitted.
+
+        Args:
+            conn (sqlite3.Connection): The connection obtained from acquire().
+            discard (bool): Close the connection instead of returning it to the pool.
+        """
+        if not discard and not self._closed:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+                return
+            except sqlite3.Error as e:
+                logger.warning("Failed to reset pooled connection: %s", str(e))
+        self._discard(conn)
+
+    def close(self) -> None:
+        """
+        Closes every idle connection and stops handing out new ones.
+
+        Connections still checked out are closed when they are released.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+        logger.info("Connection pool closed.")
+
+    def stats(self) -> dict:
+        """
+        Returns the pool's counters, useful for sizing the pool.
+
+        Returns:
+            dict: The pool size, open/idle connection counts, and hit/miss/wait metrics.
+        """
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'idle': self._idle.qsize(),
+                'hits': self._hits,
+                'misses': self._misses,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_time, 6),
+                'timeouts': self._timeouts,
+                'discarded': self._discarded,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, profile=DB_PROFILE)
+                logger.info("Created database connection pool of size %d for %s", _pool.size, DB_PATH)
+    return _pool
+
+def close_pool() -> None:
+    """
+    Closes the process-wide connection pool. The next get_db_connection() builds a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def get_pool_stats() -> dict:
+    """
+    Returns the metrics of the process-wide connection pool.
+    """
+    return get_pool().stats()
+
+def configure_database() -> None:
+    """
+    Applies the database profile once at startup.
+
+    The journal mode is persistent, so switching to WAL here means the very first
+    requests already run with readers that no longer block behind writers.
+    """
+    with get_db_connection():
+        logger.info("Database profile applied: %s", DB_PROFILE)
+
 
 def check_database_connection():
     try:
@@ -45,14 +321,15 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
+    pool = get_pool()
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = pool.acquire()
         yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
         if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+            pool.release(conn)
+            logger.debug("Database connection returned to pool.")
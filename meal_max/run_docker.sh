@@ -43,6 +43,7 @@ fi
 echo "Running Docker container..."
 docker run -d \
   --name ${IMAGE_NAME}_container \
+  --stop-timeout 35 \
   --env-file .env \
   -p ${HOST_PORT}:${CONTAINER_PORT} \
   -v ${DB_VOLUME_PATH}:/app/db \
@@ -7,5 +7,19 @@ CREATE TABLE meals (
     difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
-    deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+    deleted BOOLEAN DEFAULT FALSE,
+    win_pct REAL GENERATED ALWAYS AS (CASE WHEN battles > 0 THEN wins * 1.0 / battles END) VIRTUAL,
+    -- Same formula as Meal.battle_score; keep the difficulty modifiers in sync with kitchen_model
+    battle_score REAL GENERATED ALWAYS AS (price * LENGTH(cuisine) - CASE difficulty
+        WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END) STORED
+);
+
+-- Partial indexes serving the leaderboard; queries must use the exact same WHERE clause
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins
+    ON meals (wins DESC, id) WHERE deleted = 0 AND battles > 0;
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct
+    ON meals (win_pct DESC, id) WHERE deleted = 0 AND battles > 0;
+
+-- Serves matchmaking by battle score
+CREATE INDEX IF NOT EXISTS idx_meals_battle_score
+    ON meals (battle_score) WHERE deleted = 0;
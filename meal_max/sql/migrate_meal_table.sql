@@ -0,0 +1,9 @@
+-- Indexes added to existing databases by kitchen_model.migrate_meals_table().
+-- Keep in sync with create_meal_table.sql.
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins
+    ON meals (wins DESC, id) WHERE deleted = 0 AND battles > 0;
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct
+    ON meals (win_pct DESC, id) WHERE deleted = 0 AND battles > 0;
+
+CREATE INDEX IF NOT EXISTS idx_meals_battle_score
+    ON meals (battle_score) WHERE deleted = 0;
@@ -0,0 +1,117 @@
+import importlib
+import os
+
+import dotenv
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.logger import get_root_handler
+
+
+SQL_DIR = os.path.join(os.path.dirname(__file__), '..', 'sql')
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    """Fixture importing the Flask app against a fresh database, without the developer's .env."""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(dotenv, "load_dotenv", lambda *args, **kwargs: False)
+    monkeypatch.setattr(sql_utils, "DB_PATH", str(tmp_path_factory.mktemp("db") / "meal_max.db"))
+    monkeypatch.setenv("SQL_CREATE_TABLE_PATH", os.path.join(SQL_DIR, 'create_meal_table.sql'))
+    monkeypatch.setenv("SQL_MIGRATE_TABLE_PATH", os.path.join(SQL_DIR, 'migrate_meal_table.sql'))
+    monkeypatch.setenv("IN_MEMORY_LEADERBOARD", "false")
+    sql_utils.close_pool()
+
+    module = importlib.import_module("app")
+    module.kitchen_model.clear_meals()
+    yield module
+
+    sql_utils.close_pool()
+    monkeypatch.undo()
+
+@pytest.fixture
+def client(app_module):
+    """Fixture providing a test client for the Flask app."""
+    return app_module.app.test_client()
+
+######################################################
+#
+#    Logging
+#
+######################################################
+
+def test_route_logs_reach_root_handler(client, mocker):
+    """Test that INFO logs from the routes are not filtered out by the root logger's level."""
+    handle = mocker.spy(get_root_handler(), "handle")
+
+    client.get('/api/get-meal-by-id/999')
+
+    messages = [call.args[0].getMessage() for call in handle.call_args_list]
+    assert "Retrieving meal by ID: 999" in messages
+
+######################################################
+#
+#    Meals
+#
+######################################################
+
+def test_get_meal_not_found(client):
+    """Test that a missing meal is a 404, as in asgi.py."""
+    response = client.get('/api/get-meal-by-id/999')
+
+    assert response.status_code == 404
+    assert response.get_json() == {'error': "Meal with ID 999 not found"}
+    assert client.get('/api/get-meal-by-name/Nothing').status_code == 404
+
+def test_import_rejects_undecodable_line(client):
+    """Test that a line that is not valid UTF-8 is rejected without failing the upload."""
+    body = b'\xef\xbb\xbfmeal,cuisine,price,difficulty\nCaf\xe9,French,10,LOW\nBagel,Diner,3,LOW\n'
+    response = client.post('/api/import-meals', data=body, content_type='text/csv')
+
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 1
+    assert response.get_json()['errors'][0]['line'] == 2
+
+######################################################
+#
+#    Tournament
+#
+######################################################
+
+def test_tournament_rejects_boolean_meal_ids(client):
+    """Test that true/false are not accepted as meal IDs or rounds."""
+    response = client.post('/api/tournament', json={'meal_ids': [True, False]})
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'meal_ids and rounds must be integers'}
+
+    response = client.post('/api/tournament', json={'meal_ids': [1, 2], 'format': 'swiss', 'rounds': False})
+
+    assert response.status_code == 400
+
+def test_tournament_rejects_too_many_rounds(client):
+    """Test that a Swiss tournament cannot be asked for more rounds than there are opponents."""
+    response = client.post('/api/tournament', json={'meal_ids': [1, 2, 3], 'format': 'swiss', 'rounds': 2000})
+
+    assert response.status_code == 400
+
+######################################################
+#
+#    Simulation
+#
+######################################################
+
+def test_simulate_rejects_boolean_and_duplicate_meal_ids(client):
+    """Test that true/false and repeated meals are refused with 400."""
+    response = client.post('/api/simulate', json={'meal_ids': [True, False]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'meal_ids must be a list of integers'}
+
+    response = client.post('/api/simulate', json={'meal_ids': [1, 1]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Each meal can only be simulated once.'}
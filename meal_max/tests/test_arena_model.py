@@ -0,0 +1,258 @@
+from contextlib import contextmanager
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from meal_max.models.arena_model import MemoryArenaStore, SQLiteArenaStore, create_arena_store
+from meal_max.models.kitchen_model import Meal
+
+
+@pytest.fixture
+def registry():
+    """Fixture providing a small registry for each test."""
+    return MemoryArenaStore(max_arenas=2, idle_timeout=60)
+
+@pytest.fixture
+def mock_record_battle_result(mocker):
+    """Mock the record_battle_result function so battles need no database."""
+    return mocker.patch("meal_max.models.battle_model.record_battle_result")
+
+@pytest.fixture
+def fake_clock(mocker):
+    """Mock time.monotonic with a clock the test can move forward."""
+    clock = {'now': 1000.0}
+    mocker.patch("meal_max.models.arena_model.time.monotonic", side_effect=lambda: clock['now'])
+    return clock
+
+
+def test_arenas_are_independent(registry):
+    """Test each arena keeps its own combatants."""
+    arena_1, arena_2 = registry.create(), registry.create()
+    meal = Meal(1, 'Meal 1', 'French', 15.0, 'LOW')
+
+    with registry.use(arena_1) as battle_model:
+        battle_model.prep_combatant(meal)
+
+    with registry.use(arena_2) as battle_model:
+        assert battle_model.get_combatants() == []
+    with registry.use(arena_1) as battle_model:
+        assert battle_model.get_combatants() == [meal]
+
+def test_arena_battle(registry, mock_record_battle_result):
+    """Test battling in an arena."""
+    arena_id = registry.create()
+    with registry.use(arena_id) as battle_model:
+        battle_model.prep_combatant(Meal(1, 'Meal 1', 'French', 15.0, 'LOW'))
+        battle_model.prep_combatant(Meal(2, 'Meal 2', 'Italian', 20.0, 'HIGH'))
+        assert battle_model.battle() in ('Meal 1', 'Meal 2')
+        assert len(battle_model.get_combatants()) == 1
+
+    mock_record_battle_result.assert_called_once()
+
+def test_unknown_arena(registry):
+    """Test error when using an arena that does not exist."""
+    with pytest.raises(KeyError, match="Arena missing not found"):
+        with registry.use("missing"):
+            pass
+    with pytest.raises(KeyError):
+        registry.delete("missing")
+
+def test_registry_full(registry):
+    """Test arenas are refused once the registry is full of active arenas."""
+    registry.create()
+    registry.create()
+
+    with pytest.raises(RuntimeError, match="Too many active arenas"):
+        registry.create()
+    assert registry.stats()['rejected'] == 1
+
+def test_idle_arenas_are_evicted(registry, fake_clock):
+    """Test idle arenas make room for new ones and can no longer be used."""
+    arena_1 = registry.create()
+    fake_clock['now'] += 30
+    arena_2 = registry.create()
+
+    fake_clock['now'] += 45
+    arena_3 = registry.create()
+
+    with pytest.raises(KeyError):
+        with registry.use(arena_1):
+            pass
+    with registry.use(arena_2):
+        pass
+    with registry.use(arena_3):
+        pass
+    assert registry.stats() == {'store': 'memory', 'active': 2, 'max_arenas': 2, 'created': 3, 'evicted': 1, 'rejected': 0}
+
+def test_using_an_arena_keeps_it_alive(registry, fake_clock):
+    """Test that using an arena resets its idle timer."""
+    arena_1 = registry.create()
+    fake_clock['now'] += 50
+    with registry.use(arena_1):
+        pass
+
+    fake_clock['now'] += 50
+    with registry.use(arena_1):
+        pass
+    assert registry.stats()['evicted'] == 0
+
+def test_arena_lock_serializes_use(registry):
+    """Test that an arena can only be used by one thread at a time."""
+    arena_id = registry.create()
+    other_arena_id = registry.create()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_arena():
+        with registry.use(arena_id):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold_arena)
+    thread.start()
+    entered.wait(5)
+
+    # Another arena is not blocked
+    with registry.use(other_arena_id):
+        pass
+
+    acquired = threading.Event()
+
+    def wait_for_arena():
+        with registry.use(arena_id):
+            acquired.set()
+
+    waiter = threading.Thread(target=wait_for_arena)
+    waiter.start()
+    assert not acquired.wait(0.1), "A second user should wait for the arena"
+
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+    assert acquired.is_set()
+
+
+##################################################
+# SQLite store
+##################################################
+
+@pytest.fixture
+def stored_meals():
+    """Fixture providing the meals in the database, by ID. Remove one to delete it."""
+    return {1: Meal(1, 'Meal 1', 'French', 15.0, 'LOW'), 2: Meal(2, 'Meal 2', 'Italian', 20.0, 'HIGH')}
+
+@pytest.fixture
+def sqlite_store(mocker, tmp_path, stored_meals):
+    """Fixture providing a SQLite arena store on a temporary database."""
+    db_path = str(tmp_path / "meal_max.db")
+
+    @contextmanager
+    def sqlite_get_db_connection():
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    mocker.patch("meal_max.models.arena_model.get_db_connection", sqlite_get_db_connection)
+    mocker.patch("meal_max.models.arena_model.get_meals_by_ids", side_effect=lambda meal_ids: {
+        'found': [stored_meals[meal_id] for meal_id in meal_ids if meal_id in stored_meals],
+        'deleted': [meal_id for meal_id in meal_ids if meal_id not in stored_meals],
+        'missing': [],
+    })
+    return SQLiteArenaStore(max_arenas=2, idle_timeout=60, lease=5, lock_timeout=0.05)
+
+def test_sqlite_store_keeps_combatants(sqlite_store):
+    """Test combatants survive between uses, as they would between worker processes."""
+    arena_id = sqlite_store.create()
+    with sqlite_store.use(arena_id) as battle_model:
+        battle_model.prep_combatant(Meal(1, 'Meal 1', 'French', 15.0, 'LOW'))
+
+    # A second store on the same database stands in for another worker
+    other_worker = SQLiteArenaStore(max_arenas=2, idle_timeout=60)
+    with other_worker.use(arena_id) as battle_model:
+        assert [meal.id for meal in battle_model.get_combatants()] == [1]
+        battle_model.prep_combatant(Meal(2, 'Meal 2', 'Italian', 20.0, 'HIGH'))
+
+    with sqlite_store.use(arena_id) as battle_model:
+        assert [meal.id for meal in battle_model.get_combatants()] == [1, 2]
+
+def test_sqlite_store_drops_deleted_meals(sqlite_store, stored_meals):
+    """Test that a meal deleted after it was prepared is dropped from the arena instead of failing it."""
+    arena_id = sqlite_store.create()
+    with sqlite_store.use(arena_id) as battle_model:
+        battle_model.prep_combatant(stored_meals[1])
+        battle_model.prep_combatant(stored_meals[2])
+
+    del stored_meals[2]
+    with sqlite_store.use(arena_id) as battle_model:
+        assert [meal.id for meal in battle_model.get_combatants()] == [1]
+
+    # The arena was stored without the deleted meal, so there is room for another combatant
+    stored_meals[3] = Meal(3, 'Meal 3', 'Thai', 12.0, 'MED')
+    with sqlite_store.use(arena_id) as battle_model:
+        battle_model.prep_combatant(stored_meals[3])
+        assert [meal.id for meal in battle_model.get_combatants()] == [1, 3]
+
+def test_sqlite_store_keeps_combatants_when_rebuild_fails(sqlite_store, stored_meals, mocker):
+    """Test that a failed meal lookup releases the arena without wiping its stored combatants."""
+    arena_id = sqlite_store.create()
+    with sqlite_store.use(arena_id) as battle_model:
+        battle_model.prep_combatant(stored_meals[1])
+
+    lookup = mocker.patch("meal_max.models.arena_model.get_meals_by_ids",
+                          side_effect=sqlite3.OperationalError("database is locked"))
+    with pytest.raises(sqlite3.OperationalError):
+        with sqlite_store.use(arena_id):
+            pass
+
+    lookup.side_effect = None
+    lookup.return_value = {'found': [stored_meals[1]], 'deleted': [], 'missing': []}
+    with sqlite_store.use(arena_id) as battle_model:
+        assert [meal.id for meal in battle_model.get_combatants()] == [1]
+    assert lookup.call_args[0][0] == [1]
+
+def test_sqlite_store_busy_arena(sqlite_store):
+    """Test an arena held by one worker cannot be used by another until released."""
+    arena_id = sqlite_store.create()
+    with sqlite_store.use(arena_id):
+        with pytest.raises(RuntimeError, match="is busy"):
+            with sqlite_store.use(arena_id):
+                pass
+
+    with sqlite_store.use(arena_id):
+        pass
+    assert sqlite_store.stats()['lock_waits'] == 1
+
+def test_sqlite_store_limit_and_eviction(sqlite_store, mocker):
+    """Test the arena limit, and that idle arenas are evicted to make room."""
+    arena_1 = sqlite_store.create()
+    sqlite_store.create()
+    with pytest.raises(RuntimeError, match="Too many active arenas"):
+        sqlite_store.create()
+
+    now = time.time()
+    mocker.patch("meal_max.models.arena_model.time.time", return_value=now + 120)
+    sqlite_store.create()
+
+    with pytest.raises(KeyError):
+        with sqlite_store.use(arena_1):
+            pass
+    assert sqlite_store.stats() == {
+        'store': 'sqlite', 'active': 1, 'max_arenas': 2, 'created': 3, 'evicted': 2, 'rejected': 1, 'lock_waits': 0,
+    }
+
+def test_sqlite_store_delete(sqlite_store):
+    """Test deleting an arena."""
+    arena_id = sqlite_store.create()
+    sqlite_store.delete(arena_id)
+
+    with pytest.raises(KeyError):
+        sqlite_store.delete(arena_id)
+
+def test_create_arena_store_invalid():
+    """Test error when the configured arena store is unknown."""
+    with pytest.raises(ValueError, match="Invalid arena store: redis"):
+        create_arena_store("redis")
@@ -0,0 +1,113 @@
+import asyncio
+import importlib
+import json
+
+import dotenv
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture(scope="module")
+def asgi_module():
+    """Fixture importing the ASGI app without loading the developer's .env."""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(dotenv, "load_dotenv", lambda *args, **kwargs: False)
+    module = importlib.import_module("asgi")
+    yield module
+    monkeypatch.undo()
+
+def call(asgi_module, method: str, path: str, chunks=(b'',), headers=(), query=b'') -> tuple:
+    """Sends one HTTP request through the ASGI app and returns the status and decoded JSON body."""
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query, 'headers': list(headers)}
+    asyncio.run(asgi_module.app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+######################################################
+#
+#    Routes
+#
+######################################################
+
+def test_get_meal_by_id(asgi_module, mocker):
+    """Test retrieving a meal through the ASGI app."""
+    mocker.patch("meal_max.models.kitchen_model.get_meal_by_id", return_value=Meal(1, "Pasta", "Italian", 10.0, "LOW"))
+
+    status, payload = call(asgi_module, 'GET', '/api/get-meal-by-id/1')
+
+    assert status == 200
+    assert payload['meal']['meal'] == "Pasta"
+
+def test_get_meal_not_found(asgi_module, mocker):
+    """Test that a missing or deleted meal is a 404, as in app.py."""
+    mocker.patch("meal_max.models.kitchen_model.get_meal_by_id", side_effect=ValueError("Meal with ID 9 not found"))
+    mocker.patch("meal_max.models.kitchen_model.get_meal_by_name", side_effect=ValueError("Meal with name Soup not found"))
+
+    assert call(asgi_module, 'GET', '/api/get-meal-by-id/9') == (404, {'error': "Meal with ID 9 not found"})
+    assert call(asgi_module, 'GET', '/api/get-meal-by-name/Soup')[0] == 404
+    assert call(asgi_module, 'POST', '/api/battle', [b'{"meal_1": "Soup", "meal_2": "Pasta"}'])[0] == 404
+
+def test_battle_rejects_non_string_names(asgi_module):
+    """Test that meal names that are not strings are a 400 rather than a failed lookup."""
+    for body in (b'{"meal_1": ["Soup"], "meal_2": "Pasta"}', b'{"meal_1": "Soup", "meal_2": {"id": 1}}'):
+        assert call(asgi_module, 'POST', '/api/battle', [body]) == (400, {'error': 'You must name two combatants, meal_1 and meal_2'})
+
+def test_battle_refills_entropy_through_bounded_executor(asgi_module, mocker):
+    """Test that an entropy pool refill counts against the executor's queue limit."""
+    mocker.patch("meal_max.models.kitchen_model.get_meal_by_name", return_value=Meal(1, "Pasta", "Italian", 10.0, "LOW"))
+    mocker.patch("meal_max.models.kitchen_model.record_battle_result")
+    pool = mocker.Mock(**{'get_nowait.return_value': None, 'get.return_value': 0.5})
+    mocker.patch("meal_max.utils.random_utils.get_entropy_pool", return_value=pool)
+    run = mocker.spy(asgi_module.executor, "run")
+
+    status, _ = call(asgi_module, 'POST', '/api/battle', [b'{"meal_1": "Pasta", "meal_2": "Pasta"}'])
+
+    assert status == 200
+    assert mocker.call(pool.get) in run.call_args_list
+
+def test_leaderboard_paging(asgi_module, mocker):
+    """Test that top and the keyset cursor are passed through, as in app.py."""
+    rows = [{'id': 3, 'wins': 5}, {'id': 7, 'wins': 2}]
+    get_leaderboard = mocker.patch("meal_max.models.kitchen_model.get_leaderboard", return_value=rows)
+
+    status, payload = call(asgi_module, 'GET', '/api/leaderboard', query=b'top=2&after_wins=9&after_id=1')
+
+    assert status == 200
+    get_leaderboard.assert_called_once_with('wins', limit=2, offset=0, after_wins=9, after_id=1)
+    assert payload['next_cursor'] == {'after_wins': 2, 'after_id': 7}
+    assert call(asgi_module, 'GET', '/api/leaderboard', query=b'top=two')[0] == 400
+
+def test_unknown_route(asgi_module):
+    """Test unknown paths and methods."""
+    assert call(asgi_module, 'GET', '/api/nothing-here')[0] == 404
+    assert call(asgi_module, 'GET', '/api/battle')[0] == 405
+
+def test_body_too_large(asgi_module, mocker):
+    """Test that bodies over ASGI_MAX_BODY_SIZE are refused, whether or not they declare a length."""
+    mocker.patch.object(asgi_module, "ASGI_MAX_BODY_SIZE", 16)
+
+    status, _ = call(asgi_module, 'POST', '/api/battle', headers=[(b'content-length', b'1000')])
+    assert status == 413
+
+    status, _ = call(asgi_module, 'POST', '/api/battle', [b'{"meal_1": "Pasta", ', b'"meal_2": "Sushi"}'])
+    assert status == 413
+
+def test_invalid_json_body(asgi_module):
+    """Test that a malformed body is a 400."""
+    assert call(asgi_module, 'POST', '/api/battle', [b'{not json']) == (400, {'error': 'Invalid JSON body'})
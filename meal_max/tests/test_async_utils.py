@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from meal_max.utils.async_utils import BoundedExecutor
+
+
+def test_bounded_executor_run():
+    """Test that calls run on the executor's threads and return their results."""
+    executor = BoundedExecutor(max_workers=2, max_pending=4)
+
+    async def run():
+        return await executor.run(lambda x, y=0: (threading.current_thread().name, x + y), 1, y=2)
+
+    thread_name, result = asyncio.run(run())
+    executor.shutdown()
+
+    assert result == 3
+    assert thread_name.startswith("meal_max_db")
+    assert executor.stats()['completed'] == 1
+
+def test_bounded_executor_rejects_when_full():
+    """Test that calls beyond max_pending are rejected instead of queued."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def run():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="Server is busy"):
+            await executor.run(lambda: None)
+        release.set()
+        await blocked
+
+    asyncio.run(run())
+    executor.shutdown()
+
+    stats = executor.stats()
+    assert stats['rejected'] == 1
+    assert stats['pending'] == 0
+
+def test_bounded_executor_propagates_errors():
+    """Test that an exception raised by the call reaches the caller and frees its slot."""
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+
+    def fail():
+        raise ValueError("Meal with ID 1 not found")
+
+    with pytest.raises(ValueError, match="Meal with ID 1 not found"):
+        asyncio.run(executor.run(fail))
+    executor.shutdown()
+
+    assert executor.stats()['pending'] == 0
+
+def test_bounded_executor_invalid_bounds():
+    """Test error when there are fewer pending slots than workers."""
+    with pytest.raises(ValueError, match="Invalid executor bounds"):
+        BoundedExecutor(max_workers=4, max_pending=2)
@@ -9,9 +9,9 @@ def battle_model():
     return BattleModel()
 
 @pytest.fixture
-def mock_update_meal_stats(mocker):
-    """Mock the update_meal_stats function for testing purposes."""
-    return mocker.patch("meal_max.models.battle_model.update_meal_stats")
+def mock_record_battle_result(mocker):
+    """Mock the record_battle_result function for testing purposes."""
+    return mocker.patch("meal_max.models.battle_model.record_battle_result")
 
 """Fixtures providing sample meals for the tests."""
 @pytest.fixture
@@ -72,13 +72,14 @@ def test_get_combatants(battle_model, sample_combatants):
 def test_get_battle_score(battle_model, sample_meal1):
     """Test getting the battle score of a combatant."""
     assert battle_model.get_battle_score(sample_meal1) == 87, "Expected battle score"
+    assert sample_meal1.battle_score == 87, "Expected the score to be computed when the meal is created"
 
 
 ##################################################
 # Battle Test Cases
 ##################################################
     
-def test_battle(battle_model, sample_combatants, mock_update_meal_stats):
+def test_battle(battle_model, sample_combatants, mock_record_battle_result):
     """Test running a battle between two meals."""
     battle_model.combatants.extend(sample_combatants)
 
@@ -88,14 +89,13 @@ def test_battle(battle_model, sample_combatants, mock_update_meal_stats):
     # Assert that the number of combatants after the battle is exactly 1 (the winner remains)
     assert len(battle_model.combatants) == 1, "There should be exactly 1 remaining combatant after the battle."
 
-    # Assert that update_meal_stats was called with the correct meal IDs
-    mock_update_meal_stats.assert_any_call(2, 'win')  # Meal with ID 1 and result 'win'
-    mock_update_meal_stats.assert_any_call(1, 'loss')  # Meal with ID 2 and result 'loss'
-
     # Check that the combatants are updated correctly based on the battle
     winner = battle_model.combatants[0]
     loser_id = 1 if winner.id == 2 else 2  # The loser is the one whose ID doesn't match the winner
 
+    # Assert that both results were recorded together with the correct meal IDs
+    mock_record_battle_result.assert_called_once_with(winner.id, loser_id)
+
     # Ensure that the loser was properly removed
     assert all(meal.id != loser_id for meal in battle_model.combatants), "The losing meal should have been removed from the combatants list."
 
@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from meal_max.utils.cache_utils import LRUCache, SingleFlight
+
+
+def test_cache_hit_and_miss():
+    """Test that cached values are returned and lookups are counted."""
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_ttl(mocker):
+    """Test that entries expire after their time to live."""
+    clock = mocker.patch("meal_max.utils.cache_utils.time.monotonic", return_value=100.0)
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set('a', 1)
+
+    clock.return_value = 109.0
+    assert cache.get('a') == 1
+
+    clock.return_value = 111.0
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+def test_cache_invalidate_where():
+    """Test removing every entry whose value matches a predicate."""
+    cache = LRUCache(maxsize=4)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 1)
+
+    cache.invalidate_where(lambda value: value == 1)
+
+    assert cache.stats()['size'] == 1
+    assert cache.get('b') == 2
+
+def test_cache_set_skipped_after_invalidation():
+    """Test that a value loaded before an invalidation is not cached after it."""
+    cache = LRUCache(maxsize=4)
+    generation = cache.generation()
+    cache.invalidate('a')
+    cache.set('a', 1, generation)
+
+    assert cache.get('a') is None
+
+    cache.set('a', 2, cache.generation())
+    assert cache.get('a') == 2
+
+def test_cache_disabled():
+    """Test that a cache of size 0 never stores anything."""
+    cache = LRUCache(maxsize=0)
+    cache.set('a', 1)
+
+    assert cache.get('a') is None
+
+def test_cache_invalid_size():
+    """Test error when creating a cache with a negative size."""
+    with pytest.raises(ValueError, match="Invalid cache size: -1. Cache size must not be negative."):
+        LRUCache(maxsize=-1)
+
+######################################################
+#
+#    Single flight
+#
+######################################################
+
+def run_concurrently(flights, key, func, callers):
+    """Starts `callers` threads calling flights.do(key, func) and returns their results or errors."""
+    outcomes = []
+    outcomes_lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = flights.do(key, func)
+        except Exception as e:
+            outcome = e
+        with outcomes_lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def wait_for_followers(flights, count):
+    while flights.stats()['coalesced'] < count:
+        threading.Event().wait(0.001)
+
+def test_single_flight_shares_result():
+    """Test that concurrent calls for the same key run the function once and share its result."""
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def query():
+        calls.append(1)
+        release.wait()
+        return ['Pasta']
+
+    threads, outcomes = run_concurrently(flights, 'leaderboard', query, 5)
+    wait_for_followers(flights, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert outcomes == [['Pasta']] * 5
+    assert flights.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+
+def test_single_flight_shares_error():
+    """Test that every waiting caller gets the exception raised by the shared call."""
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def query():
+        release.wait()
+        raise ValueError("Meal with ID 1 not found")
+
+    threads, outcomes = run_concurrently(flights, ('meal_by_id', 1), query, 3)
+    wait_for_followers(flights, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 3
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+def test_single_flight_does_not_cache():
+    """Test that a call made after the previous one finished runs again."""
+    flights = SingleFlight()
+    results = iter([1, 2])
+
+    assert flights.do('key', lambda: next(results)) == 1
+    assert flights.do('key', lambda: next(results)) == 2
+    assert flights.stats()['executed'] == 2
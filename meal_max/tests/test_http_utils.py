@@ -0,0 +1,112 @@
+import gzip
+
+from flask import Flask, Response, jsonify
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils import http_utils
+from meal_max.utils.http_utils import OrjsonProvider, choose_encoding, compress_response, create_json_provider
+
+
+@pytest.fixture
+def app():
+    """Fixture providing a bare Flask app using the orjson provider and response compression."""
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+
+    @app.after_request
+    def compress(response):
+        from flask import request
+        return compress_response(request, response)
+
+    @app.route('/meal')
+    def meal():
+        return jsonify({'meal': Meal(id=1, meal="Pizza", cuisine="Italian", price=10.0, difficulty="LOW")})
+
+    @app.route('/leaderboard')
+    def leaderboard():
+        response = jsonify({'leaderboard': [{'id': i, 'meal': f"Meal {i}", 'wins': i} for i in range(200)]})
+        response.set_etag("v1")
+        return response
+
+    @app.route('/stream')
+    def stream():
+        return Response((b"x" * 2000 for _ in range(2)), mimetype="text/csv")
+
+    return app
+
+######################################################
+#
+#    JSON provider
+#
+######################################################
+
+def test_orjson_provider_matches_default(app):
+    """Test that the orjson provider writes the same JSON as Flask's default provider."""
+    payload = {'b': [1, 2.5, None], 'a': {'wins': 3, 'meal': "Pizza", 'id': 1}}
+    default = create_json_provider(app, "default")
+
+    with app.app_context():
+        assert app.json.response(payload).get_data() == default.response(payload).get_data()
+        assert app.json.dumps({'meal': "Crème brûlée"}) == '{"meal":"Crème brûlée"}'
+    assert app.json.loads(b'{"meal": "Pizza"}') == {'meal': "Pizza"}
+
+def test_orjson_provider_serializes_meal(app):
+    """Test that a Meal in a route's response is serialized with all its fields."""
+    response = app.test_client().get('/meal')
+
+    assert response.get_json() == {'meal': {'id': 1, 'meal': "Pizza", 'cuisine': "Italian", 'price': 10.0,
+                                            'difficulty': "LOW", 'battle_score': 67.0}}
+
+def test_create_json_provider_invalid():
+    """Test error when the JSON provider is unknown."""
+    with pytest.raises(ValueError, match="Invalid JSON provider: ujson"):
+        create_json_provider(Flask(__name__), "ujson")
+
+######################################################
+#
+#    Compression
+#
+######################################################
+
+def test_compress_response_gzip(app):
+    """Test that a large JSON response is gzipped for a client accepting only gzip, with a weak ETag."""
+    response = app.test_client().get('/leaderboard', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'] == 'W/"v1"'
+    assert len(gzip.decompress(response.get_data())) > http_utils.COMPRESSION_MIN_SIZE
+
+def test_compress_response_small_body(app):
+    """Test that bodies under the size threshold are sent uncompressed."""
+    response = app.test_client().get('/meal', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+def test_compress_response_not_accepted(app):
+    """Test that responses stay uncompressed when the client accepts no supported encoding."""
+    response = app.test_client().get('/leaderboard', headers={'Accept-Encoding': 'identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == '"v1"'
+
+def test_compress_response_streamed(app):
+    """Test that streamed responses are passed through untouched."""
+    response = app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b"x" * 4000
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, br, zstd", "zstd"),
+    ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+    ("*", "zstd"),
+    ("deflate", None),
+])
+def test_choose_encoding(app, accept, expected):
+    """Test that the client's quality values win and ties follow the server's preference order."""
+    with app.test_request_context(headers={'Accept-Encoding': accept}):
+        from flask import request
+        assert choose_encoding(request, ["zstd", "br", "gzip"]) == expected
@@ -0,0 +1,156 @@
+import pytest
+
+from meal_max.models.import_model import import_meals, parse_csv, parse_ndjson, validate_meal_row
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def mock_create_meals(mocker):
+    """Mock create_meals so that every valid row is created."""
+    return mocker.patch(
+        "meal_max.models.import_model.create_meals",
+        side_effect=lambda batch, batch_size: {'created': len(batch), 'errors': []}
+    )
+
+######################################################
+#
+#    Parsing
+#
+######################################################
+
+def test_parse_ndjson():
+    """Test parsing NDJSON lines, skipping blank lines and reporting malformed ones."""
+    lines = [
+        b'{"meal": "Pasta", "cuisine": "Italian", "price": 10.0, "difficulty": "LOW"}\n',
+        b'\n',
+        b'{"meal": "Sushi",\n',
+    ]
+
+    parsed = list(parse_ndjson(lines))
+
+    assert parsed[0] == (1, {'meal': "Pasta", 'cuisine': "Italian", 'price': 10.0, 'difficulty': "LOW"})
+    assert parsed[1][0] == 3
+    assert isinstance(parsed[1][1], ValueError)
+
+def test_parse_csv():
+    """Test parsing CSV lines using the header row as field names."""
+    lines = [b'meal,cuisine,price,difficulty\n', b'Pasta,Italian,10.50,LOW\n', b'"Fish, Chips",British,8,MED\n']
+
+    parsed = list(parse_csv(lines))
+
+    assert parsed == [
+        (2, {'meal': "Pasta", 'cuisine': "Italian", 'price': "10.50", 'difficulty': "LOW"}),
+        (3, {'meal': "Fish, Chips", 'cuisine': "British", 'price': "8", 'difficulty': "MED"}),
+    ]
+
+def test_parse_invalid_utf8():
+    """Test that a line that is not valid UTF-8 is reported on its own, in both formats."""
+    ndjson = [b'{"meal": "Pasta"}\n', b'{"meal": "Caf\xe9"}\n', b'{"meal": "Sushi"}\n']
+    parsed = list(parse_ndjson(ndjson))
+
+    assert [line for line, _ in parsed] == [1, 2, 3]
+    assert isinstance(parsed[1][1], ValueError) and "Invalid UTF-8" in str(parsed[1][1])
+    assert parsed[2][1] == {'meal': "Sushi"}
+
+    csv_lines = [b'meal,cuisine,price,difficulty\n', b'Caf\xe9,French,10,LOW\n', b'Sushi,Japanese,20,HIGH\n']
+    parsed = list(parse_csv(csv_lines))
+
+    assert parsed[0][0] == 2 and "Invalid UTF-8" in str(parsed[0][1])
+    assert parsed[1] == (3, {'meal': "Sushi", 'cuisine': "Japanese", 'price': "20", 'difficulty': "HIGH"})
+
+def test_parse_csv_with_byte_order_mark():
+    """Test that a byte order mark before the header does not become part of the first column name."""
+    lines = [b'\xef\xbb\xbfmeal,cuisine,price,difficulty\n', b'Pasta,Italian,10.50,LOW\n']
+
+    assert list(parse_csv(lines)) == [(2, {'meal': "Pasta", 'cuisine': "Italian", 'price': "10.50", 'difficulty': "LOW"})]
+    assert list(parse_csv(line.decode('utf-8') for line in lines))[0][1]['meal'] == "Pasta"
+
+def test_validate_meal_row():
+    """Test that prices are converted to numbers."""
+    row = validate_meal_row({'meal': "Pasta", 'cuisine': "Italian", 'price': "10.50", 'difficulty': "LOW"})
+
+    assert row == {'meal': "Pasta", 'cuisine': "Italian", 'price': 10.5, 'difficulty': "LOW"}
+
+def test_validate_meal_row_invalid_difficulty():
+    """Test that rows are checked with the same rules as Meal."""
+    with pytest.raises(ValueError, match="Difficulty must be 'LOW', 'MED', or 'HIGH'."):
+        validate_meal_row({'meal': "Pasta", 'cuisine': "Italian", 'price': 10, 'difficulty': "EASY"})
+
+def test_validate_meal_row_invalid_price():
+    """Test error when the price is not a number."""
+    with pytest.raises(ValueError, match="Invalid price: cheap. Price must be a number."):
+        validate_meal_row({'meal': "Pasta", 'cuisine': "Italian", 'price': "cheap", 'difficulty': "LOW"})
+
+def test_validate_meal_row_non_finite_price():
+    """Test error when the price parses as NaN or infinity."""
+    for price in ("nan", "inf", True):
+        with pytest.raises(ValueError, match=f"Invalid price: {price}. Price must be a number."):
+            validate_meal_row({'meal': "Pasta", 'cuisine': "Italian", 'price': price, 'difficulty': "LOW"})
+
+def test_validate_meal_row_wrong_types():
+    """Test error when the name, cuisine or difficulty is not a string."""
+    with pytest.raises(ValueError, match="Meal name, cuisine and difficulty must be strings"):
+        validate_meal_row({'meal': "Pasta", 'cuisine': 5, 'price': 10, 'difficulty': "LOW"})
+
+######################################################
+#
+#    Import
+#
+######################################################
+
+def test_import_meals_in_batches(mock_create_meals):
+    """Test that rows are committed in batches of the requested size."""
+    lines = (f'{{"meal": "Meal {i}", "cuisine": "Diner", "price": 5, "difficulty": "LOW"}}\n' for i in range(5))
+    progress = []
+
+    summary = import_meals(lines, fmt='ndjson', batch_size=2, progress=progress.append)
+
+    assert [len(call.args[0]) for call in mock_create_meals.call_args_list] == [2, 2, 1]
+    assert summary == {'processed': 5, 'created': 5, 'rejected': 0, 'errors': []}
+    assert progress[-1] == {'processed': 5, 'created': 5, 'rejected': 0}
+
+def test_import_meals_reports_rejected_lines(mocker):
+    """Test that invalid rows and duplicates are reported with their line numbers."""
+    mocker.patch(
+        "meal_max.models.import_model.create_meals",
+        return_value={'created': 1, 'errors': [{'index': 1, 'meal': "Sushi", 'error': "Meal with name 'Sushi' already exists"}]}
+    )
+    lines = [
+        'meal,cuisine,price,difficulty\n',
+        'Pasta,Italian,10,LOW\n',
+        'Tacos,Mexican,free,LOW\n',
+        'Sushi,Japanese,20,HIGH\n',
+    ]
+
+    summary = import_meals(lines, fmt='csv')
+
+    assert summary['processed'] == 3
+    assert summary['created'] == 1
+    assert summary['rejected'] == 2
+    assert summary['errors'] == [
+        {'line': 3, 'error': "Invalid price: free. Price must be a number."},
+        {'line': 4, 'error': "Meal with name 'Sushi' already exists"},
+    ]
+
+def test_import_meals_rejects_malformed_ndjson(mock_create_meals):
+    """Test that wrongly typed fields and non-finite prices reject their line, not the import."""
+    lines = [
+        '{"meal": "Pasta", "cuisine": 5, "price": 10, "difficulty": "LOW"}\n',
+        '{"meal": "Tacos", "cuisine": "Mexican", "price": "nan", "difficulty": "LOW"}\n',
+        '{"meal": "Sushi", "cuisine": "Japanese", "price": 20, "difficulty": "HIGH"}\n',
+    ]
+
+    summary = import_meals(lines, fmt='ndjson')
+
+    assert summary['created'] == 1
+    assert [error['line'] for error in summary['errors']] == [1, 2]
+
+def test_import_meals_invalid_format():
+    """Test error when importing an unsupported format."""
+    with pytest.raises(ValueError, match="Invalid import format: xml."):
+        import_meals([], fmt='xml')
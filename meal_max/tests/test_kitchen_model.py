@@ -1,19 +1,40 @@
 from contextlib import contextmanager
+import os
 import re
 import sqlite3
+import threading
 
 import pytest
 
 from meal_max.models.kitchen_model import (
+    MEAL_CACHE_SIZE,
+    MEAL_CACHE_TTL,
+    Leaderboard,
     Meal,
     create_meal,
+    create_meals,
     clear_meals,
+    clear_meal_cache,
     delete_meal,
     get_meal_by_name,
     get_meal_by_id,
     get_leaderboard,
+    get_leaderboard_rank,
+    get_data_version,
+    get_meal_cache_stats,
+    get_meals_by_ids,
+    get_meals_by_names,
+    get_single_flight_stats,
+    find_opponents,
+    load_leaderboard,
+    migrate_meals_table,
+    record_battle_result,
+    record_battle_results,
+    stream_leaderboard,
     update_meal_stats,
+    _commit_and_update_leaderboard,
 )
+from meal_max.utils.cache_utils import LRUCache, SingleFlight
 
 ######################################################
 #
@@ -31,6 +52,12 @@ def kitchen_model():
     # Teardown if needed (e.g., closing database connections or cleanup)
     model.cleanup()
 
+@pytest.fixture(autouse=True)
+def empty_meal_cache(mocker):
+    """Fixture making sure every test starts with empty meal lookup caches and zeroed counters."""
+    mocker.patch("meal_max.models.kitchen_model._meals_by_id", LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL))
+    mocker.patch("meal_max.models.kitchen_model._meals_by_name", LRUCache(MEAL_CACHE_SIZE, MEAL_CACHE_TTL))
+
 def normalize_whitespace(sql_query: str) -> str:
     return re.sub(r'\s+', ' ', sql_query).strip()
 
@@ -55,6 +82,48 @@ def mock_cursor(mocker):
 
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
+SQL_DIR = os.path.join(os.path.dirname(__file__), '..', 'sql')
+
+@pytest.fixture
+def sqlite_db(mocker, tmp_path):
+    """Fixture providing a real SQLite database that kitchen_model connects to."""
+    db_path = str(tmp_path / "meal_max.db")
+
+    @contextmanager
+    def sqlite_get_db_connection():
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", sqlite_get_db_connection)
+    mocker.patch.dict('os.environ', {'SQL_MIGRATE_TABLE_PATH': os.path.join(SQL_DIR, 'migrate_meal_table.sql')})
+
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def meals_table(sqlite_db):
+    """Fixture providing a real meals table with a few meals that have battled."""
+    with open(os.path.join(SQL_DIR, 'create_meal_table.sql')) as fh:
+        sqlite_db.executescript(fh.read())
+    sqlite_db.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, 'Diner', 5.0, 'LOW', ?, ?)",
+        [("Pasta", 4, 3), ("Sushi", 10, 5), ("Tacos", 2, 2), ("Salad", 0, 0)]
+    )
+    sqlite_db.commit()
+    return sqlite_db
+
+@pytest.fixture
+def in_memory_leaderboard(mocker, meals_table):
+    """Fixture loading a fresh in-memory leaderboard that is discarded after the test."""
+    leaderboard = Leaderboard()
+    mocker.patch("meal_max.models.kitchen_model._leaderboard", leaderboard)
+    load_leaderboard()
+    return leaderboard
+
 ######################################################
 #
 #    Add and delete
@@ -109,6 +178,83 @@ def test_create_meal_invalid_difficulty():
     with pytest.raises(ValueError, match="Invalid difficulty level: invalid. Must be 'LOW', 'MED', or 'HIGH'."):
         create_meal(meal="Pasta", cuisine="Italian", price=10.0, difficulty="invalid")
 
+def test_create_meals(mock_cursor):
+    """Test creating meals in bulk with executemany in a single transaction."""
+    meals = [
+        {'meal': "eggs", 'cuisine': 'diner', 'price': 10.0, 'difficulty': 'HIGH'},
+        {'meal': "toast", 'cuisine': 'diner', 'price': 4.5, 'difficulty': 'LOW'},
+        {'meal': "jam", 'cuisine': 'diner', 'price': 2.0, 'difficulty': 'LOW'},
+    ]
+
+    result = create_meals(meals, batch_size=2)
+
+    assert result == {'created': 3, 'errors': []}
+    assert mock_cursor.executemany.call_count == 2, "Expected one executemany call per chunk."
+
+    expected_query = normalize_whitespace("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)")
+    assert normalize_whitespace(mock_cursor.executemany.call_args_list[0][0][0]) == expected_query
+    assert mock_cursor.executemany.call_args_list[0][0][1] == [("eggs", 'diner', 10.0, 'HIGH'), ("toast", 'diner', 4.5, 'LOW')]
+    assert mock_cursor.executemany.call_args_list[1][0][1] == [("jam", 'diner', 2.0, 'LOW')]
+
+def test_create_meals_reports_invalid_rows(mock_cursor):
+    """Test that invalid and duplicate rows are reported without aborting the batch."""
+    # Simulate that "eggs" already exists in the database
+    mock_cursor.fetchall.return_value = [("eggs",)]
+    meals = [
+        {'meal': "eggs", 'cuisine': 'diner', 'price': 10.0, 'difficulty': 'HIGH'},
+        {'meal': "toast", 'cuisine': 'diner', 'price': -1, 'difficulty': 'LOW'},
+        {'meal': "jam", 'cuisine': 'diner', 'price': 2.0, 'difficulty': 'LOW'},
+        {'meal': "jam", 'cuisine': 'diner', 'price': 3.0, 'difficulty': 'LOW'},
+    ]
+
+    result = create_meals(meals)
+
+    assert result['created'] == 1
+    assert [(error['index'], error['meal']) for error in result['errors']] == [(0, "eggs"), (1, "toast"), (3, "jam")]
+    assert result['errors'][0]['error'] == "Meal with name 'eggs' already exists"
+    assert result['errors'][1]['error'] == "Invalid price: -1. Price must be a positive number."
+    assert mock_cursor.executemany.call_args[0][1] == [("jam", 'diner', 2.0, 'LOW')]
+
+def test_create_meals_reports_malformed_rows(mock_cursor):
+    """Test that rows with wrongly typed fields or non-finite prices are reported per row."""
+    meals = [
+        {'meal': ["eggs"], 'cuisine': 'diner', 'price': 10.0, 'difficulty': 'HIGH'},
+        {'meal': "toast", 'cuisine': 5, 'price': 4.5, 'difficulty': 'LOW'},
+        {'meal': "jam", 'cuisine': 'diner', 'price': float("nan"), 'difficulty': 'LOW'},
+        {'meal': "tea", 'cuisine': 'diner', 'price': True, 'difficulty': 'LOW'},
+        {'meal': "coffee", 'cuisine': 'diner', 'price': 3.0, 'difficulty': 'LOW'},
+    ]
+
+    result = create_meals(meals)
+
+    assert result['created'] == 1
+    assert [error['index'] for error in result['errors']] == [0, 1, 2, 3]
+    assert result['errors'][0]['error'] == "Meal name and cuisine must be strings"
+    assert result['errors'][2]['error'] == "Invalid price: nan. Price must be a positive number."
+    assert mock_cursor.executemany.call_args[0][1] == [("coffee", 'diner', 3.0, 'LOW')]
+
+def test_create_meals_chunks_duplicate_check(meals_table, mocker):
+    """Test that a batch larger than SQL_MAX_PARAMETERS checks names in several queries."""
+    mocker.patch("meal_max.models.kitchen_model.SQL_MAX_PARAMETERS", 2)
+    meals = [{'meal': name, 'cuisine': 'Diner', 'price': 5.0, 'difficulty': 'LOW'}
+             for name in ("Soup", "Pasta", "Stew", "Tacos", "Pie")]
+
+    result = create_meals(meals, batch_size=5)
+
+    assert result['created'] == 3
+    assert [error['meal'] for error in result['errors']] == ["Pasta", "Tacos"]
+
+def test_create_meals_database(meals_table):
+    """Test that bulk created meals end up in a real database."""
+    result = create_meals([
+        {'meal': "Pasta", 'cuisine': 'Italian', 'price': 10.0, 'difficulty': 'LOW'},
+        {'meal': "Ramen", 'cuisine': 'Japanese', 'price': 12.0, 'difficulty': 'MED'},
+    ])
+
+    assert result['created'] == 1
+    assert result['errors'][0]['meal'] == "Pasta"
+    assert get_meal_by_name("Ramen").cuisine == 'Japanese'
+
 def test_delete_meal(mock_cursor):
     """Test soft deleting a meal from the database by meal ID."""
 
@@ -218,6 +364,155 @@ def test_get_meal_by_name(mock_cursor):
     expected_arguments = ('Pasta',)
     assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
 
+def test_get_meals_by_ids(meals_table):
+    """Test looking up many meals by ID, split into found, deleted and missing."""
+    meals_table.execute("UPDATE meals SET deleted = 1 WHERE id = 2")
+    meals_table.commit()
+
+    result = get_meals_by_ids([3, 1, 2, 99, 3])
+
+    assert [meal.id for meal in result['found']] == [3, 1]
+    assert result['deleted'] == [2]
+    assert result['missing'] == [99]
+
+def test_get_meals_by_names_temp_table(meals_table, mocker):
+    """Test that lookups larger than one IN list go through a temporary table in a single query."""
+    mocker.patch("meal_max.models.kitchen_model.SQL_MAX_PARAMETERS", 2)
+    meals_table.execute("UPDATE meals SET deleted = 1 WHERE meal = 'Tacos'")
+    meals_table.commit()
+
+    result = get_meals_by_names(["Salad", "Tacos", "Pasta", "Pizza"])
+
+    assert [meal.meal for meal in result['found']] == ["Salad", "Pasta"]
+    assert result['deleted'] == ["Tacos"]
+    assert result['missing'] == ["Pizza"]
+
+def test_get_meals_by_ids_uses_cache(mock_cursor):
+    """Test that cached meals are not looked up again."""
+    mock_cursor.fetchall.return_value = [(1, "Meal A", "Cuisine A", 10.0, "LOW", False)]
+    get_meals_by_ids([1])
+
+    mock_cursor.fetchall.return_value = [(2, "Meal B", "Cuisine B", 12.0, "MED", False)]
+    result = get_meals_by_ids([1, 2])
+
+    assert [meal.id for meal in result['found']] == [1, 2]
+    assert mock_cursor.execute.call_args[0][1] == [2]
+
+@pytest.mark.parametrize("meal_ids, message", [
+    ([1, "2"], "Meal IDs must be integers"),
+    ([True], "Meal IDs must be integers"),
+    (list(range(10001)), "Too many meals to look up: 10001"),
+])
+def test_get_meals_by_ids_invalid(meal_ids, message):
+    """Test error when the IDs are not integers or there are too many of them."""
+    with pytest.raises(ValueError, match=message):
+        get_meals_by_ids(meal_ids)
+
+def test_concurrent_lookups_share_one_query(mock_cursor, mocker):
+    """Test that concurrent lookups of the same meal run one query, unless a write lands in between."""
+    mocker.patch("meal_max.models.kitchen_model._flights", SingleFlight())
+    mocker.patch("meal_max.models.kitchen_model._meals_by_id", LRUCache(0))
+    release = threading.Event()
+
+    def slow_fetchone():
+        release.wait()
+        return (1, "Pasta", "Italian", 10.0, "LOW", False)
+
+    mock_cursor.fetchone.side_effect = slow_fetchone
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_meal_by_id(1))) for _ in range(3)]
+    for thread in threads[:2]:
+        thread.start()
+    while get_single_flight_stats()['coalesced'] < 1:
+        threading.Event().wait(0.001)
+
+    # A write bumps the data version, so the next caller starts its own query
+    create_meal("Curry", "Indian", 8.0, "MED")
+    threads[2].start()
+    while get_single_flight_stats()['executed'] < 2:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 3 and all(meal.meal == "Pasta" for meal in results)
+    assert mock_cursor.fetchone.call_count == 2
+    assert get_single_flight_stats() == {'executed': 2, 'coalesced': 1, 'in_flight': 0}
+
+def test_find_opponents(meals_table):
+    """Test finding the meals with the closest battle score."""
+    meals_table.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, 'Diner', ?, 'LOW')",
+        [("Soup", 5.5), ("Steak", 40.0), ("Fries", 4.0)]
+    )
+    meals_table.commit()
+
+    opponents = find_opponents(1, limit=3)
+
+    # Pasta scores 22, Soup 25, Fries 17, and the other meals at 5.0 tie with Pasta
+    assert [opponent.meal for opponent in opponents] == ["Sushi", "Tacos", "Salad"]
+    assert [opponent.meal for opponent in find_opponents(5, limit=2)] == ["Pasta", "Sushi"]
+    assert [opponent.meal for opponent in find_opponents(6, limit=1)] == ["Soup"]
+
+def test_find_opponents_invalid_limit():
+    """Test error when the number of opponents is not positive."""
+    with pytest.raises(ValueError, match="Invalid limit: 0"):
+        find_opponents(1, limit=0)
+
+def test_get_meal_by_id_cached(mock_cursor):
+    """Test that a second lookup of the same meal is served from the cache."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 10.0, 'LOW', False)
+
+    first = get_meal_by_id(1)
+    second = get_meal_by_id(1)
+
+    assert first == second
+    assert mock_cursor.execute.call_count == 1, "Expected the second lookup to skip the database."
+    assert get_meal_cache_stats()['by_id']['hits'] == 1
+
+def test_get_meal_by_name_cached(mock_cursor):
+    """Test that a second lookup of the same meal name is served from the cache."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 15.0, "HIGH", False)
+
+    get_meal_by_name("Pasta")
+    get_meal_by_name("Pasta")
+
+    assert mock_cursor.execute.call_count == 1, "Expected the second lookup to skip the database."
+
+def test_deleted_meal_not_cached(mock_cursor):
+    """Test that lookups of deleted meals are not cached."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 15.0, "HIGH", True)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+            get_meal_by_id(1)
+
+    assert mock_cursor.execute.call_count == 2
+
+def test_delete_meal_invalidates_cache(mock_cursor):
+    """Test that deleting a meal drops it from both lookup caches."""
+    mock_cursor.fetchone.return_value = (1, "Pasta", "Italian", 15.0, "HIGH", False)
+    get_meal_by_id(1)
+    get_meal_by_name("Pasta")
+
+    mock_cursor.fetchone.return_value = [False]
+    delete_meal(1)
+
+    assert get_meal_cache_stats()['by_id']['size'] == 0
+    assert get_meal_cache_stats()['by_name']['size'] == 0
+
+def test_meal_deleted_during_lookup_not_cached(mock_cursor):
+    """Test that a row read before a concurrent delete is not cached after the delete."""
+    def fetch_then_delete():
+        # Another request deletes the meal after this lookup read the row
+        clear_meal_cache()
+        return (1, "Pasta", "Italian", 15.0, "HIGH", False)
+
+    mock_cursor.fetchone.side_effect = fetch_then_delete
+    assert get_meal_by_id(1).meal == "Pasta"
+
+    assert get_meal_cache_stats()['by_id']['size'] == 0
+
 def test_get_leaderboard(mock_cursor):
     """Test that the leaderboard correctly sorts meals by battle score."""
     #kitchen_model.combatants.extend(sample_combatants)
@@ -257,6 +552,191 @@ def test_get_leaderboard(mock_cursor):
     assert result == expected
 
 
+def test_get_leaderboard_top(mock_cursor):
+    """Test that a limited leaderboard pushes LIMIT and OFFSET down into SQL."""
+    get_leaderboard(sort_by="win_pct", limit=10, offset=20)
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_query.endswith("ORDER BY win_pct DESC, id LIMIT ? OFFSET ?")
+    assert mock_cursor.execute.call_args[0][1] == [10, 20]
+
+def test_get_leaderboard_cursor(mock_cursor):
+    """Test that a keyset cursor is pushed down into the WHERE clause."""
+    get_leaderboard(sort_by="wins", limit=10, after_wins=5, after_id=42)
+
+    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert "AND wins <= ? AND (wins < ? OR id > ?) ORDER BY wins DESC, id LIMIT ? OFFSET ?" in actual_query
+    assert mock_cursor.execute.call_args[0][1] == [5, 5, 42, 10, 0]
+
+def test_get_leaderboard_incomplete_cursor():
+    """Test error when only half of the keyset cursor is given."""
+    with pytest.raises(ValueError, match="Both after_wins and after_id are required"):
+        get_leaderboard(sort_by="wins", after_wins=5)
+
+def test_get_leaderboard_cursor_win_pct():
+    """Test error when paging the win percentage leaderboard by cursor."""
+    with pytest.raises(ValueError, match="Cursor pagination is only supported when sorting by wins."):
+        get_leaderboard(sort_by="win_pct", after_wins=5, after_id=1)
+
+def test_get_leaderboard_invalid_limit():
+    """Test error when requesting a leaderboard page without any meals."""
+    with pytest.raises(ValueError, match="Invalid limit: 0. Limit must be a positive integer."):
+        get_leaderboard(limit=0)
+
+def test_get_leaderboard_pages(sqlite_db):
+    """Test that paging through the leaderboard by cursor visits every meal exactly once, in order."""
+    with open(os.path.join(SQL_DIR, 'create_meal_table.sql')) as fh:
+        sqlite_db.executescript(fh.read())
+    sqlite_db.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, 'Diner', 5.0, 'LOW', 10, ?)",
+        [(f"Meal {i}", i % 4) for i in range(10)]
+    )
+    sqlite_db.commit()
+
+    expected = [meal['id'] for meal in get_leaderboard(sort_by="wins")]
+
+    paged = []
+    page = get_leaderboard(sort_by="wins", limit=3)
+    while page:
+        paged.extend(meal['id'] for meal in page)
+        page = get_leaderboard(sort_by="wins", limit=3, after_wins=page[-1]['wins'], after_id=page[-1]['id'])
+
+    assert paged == expected
+    assert len(paged) == 10
+
+######################################################
+#
+#    In-memory Leaderboard
+#
+######################################################
+
+def test_leaderboard_page():
+    """Test paging through the in-memory leaderboard by offset and by cursor."""
+    leaderboard = Leaderboard()
+    leaderboard.load([
+        (1, "Pasta", "Italian", 12.5, "LOW", 10, 8, 0.8),
+        (2, "Sushi", "Japanese", 15.0, "HIGH", 20, 15, 0.75),
+        (3, "Tacos", "Mexican", 8.0, "MED", 8, 8, 1.0),
+    ])
+
+    assert [meal['id'] for meal in leaderboard.page("wins", None, 0, None, None)] == [2, 1, 3]
+    assert [meal['id'] for meal in leaderboard.page("win_pct", None, 0, None, None)] == [3, 1, 2]
+    assert [meal['id'] for meal in leaderboard.page("wins", 1, 1, None, None)] == [1]
+    assert [meal['id'] for meal in leaderboard.page("wins", 5, 0, 8, 1)] == [3]
+    assert leaderboard.page("wins", None, 0, None, None)[0]['win_pct'] == 75.0
+
+def test_leaderboard_upsert_and_remove():
+    """Test that upserting moves a meal to its new rank and removing takes it off the board."""
+    leaderboard = Leaderboard()
+    leaderboard.load([
+        (1, "Pasta", "Italian", 12.5, "LOW", 10, 8, 0.8),
+        (2, "Sushi", "Japanese", 15.0, "HIGH", 20, 15, 0.75),
+    ])
+
+    leaderboard.upsert((1, "Pasta", "Italian", 12.5, "LOW", 30, 20, 20 / 30))
+    assert leaderboard.rank(1, "wins")['rank'] == 1
+    assert leaderboard.rank(2, "wins")['rank'] == 2
+
+    leaderboard.remove(1)
+    assert leaderboard.rank(1, "wins") is None
+    assert [meal['id'] for meal in leaderboard.page("wins", None, 0, None, None)] == [2]
+
+def test_get_leaderboard_from_memory(in_memory_leaderboard, meals_table):
+    """Test that the in-memory leaderboard matches SQL and is served without querying the database."""
+    in_memory = get_leaderboard(sort_by="win_pct")
+
+    in_memory_leaderboard.loaded = False
+    from_sql = get_leaderboard(sort_by="win_pct")
+    in_memory_leaderboard.loaded = True
+
+    assert in_memory == from_sql
+    assert [meal['meal'] for meal in in_memory] == ["Tacos", "Pasta", "Sushi"]
+
+def test_in_memory_leaderboard_tracks_battles(in_memory_leaderboard):
+    """Test that recorded battles and deletions are reflected in the in-memory leaderboard."""
+    # Salad (id 4) wins its first battle against Pasta (id 1), tying Tacos (id 3) at 100%
+    record_battle_result(4, 1)
+    assert get_leaderboard_rank(4, sort_by="win_pct")['rank'] == 2
+    assert get_leaderboard_rank(1, sort_by="wins")['battles'] == 5
+
+    update_meal_stats(2, 'win')
+    assert get_leaderboard(sort_by="wins", limit=1)[0]['meal'] == "Sushi"
+
+    delete_meal(2)
+    assert [meal['id'] for meal in get_leaderboard(sort_by="wins")] == [1, 3, 4]
+
+def test_leaderboard_update_drops_deleted_meal(in_memory_leaderboard, meals_table):
+    """Test that a write committed after a delete does not put the deleted meal back on the leaderboard."""
+    # The delete has committed, but the in-memory leaderboard has not caught up yet
+    meals_table.execute("UPDATE meals SET deleted = 1 WHERE id = 2")
+    _commit_and_update_leaderboard(meals_table, [1, 2])
+
+    assert [meal['id'] for meal in get_leaderboard(sort_by="wins")] == [1, 3]
+
+def test_stream_leaderboard(meals_table):
+    """Test streaming the leaderboard in batches, in the same order as get_leaderboard."""
+    batches = list(stream_leaderboard("win_pct", batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert [entry for batch in batches for entry in batch] == get_leaderboard("win_pct")
+
+def test_stream_leaderboard_pages_through_ties(meals_table):
+    """Test that batches seek past ties without skipping or repeating meals."""
+    meals_table.executemany(
+        "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES (?, 'Diner', 5.0, 'LOW', ?, ?)",
+        [("Curry", 4, 3), ("Ramen", 6, 3), ("Pizza", 5, 2)]
+    )
+    meals_table.commit()
+
+    for sort_by in ("wins", "win_pct"):
+        batches = list(stream_leaderboard(sort_by, batch_size=1))
+
+        assert [entry for batch in batches for entry in batch] == get_leaderboard(sort_by)
+
+def test_stream_leaderboard_releases_connection_between_batches(mock_cursor, mocker):
+    """Test that no pooled connection is held while the caller works through a batch."""
+    mock_cursor.fetchall.side_effect = [
+        [(1, "Pasta", "Diner", 5.0, "LOW", 4, 3, 0.75)],
+        [(2, "Sushi", "Diner", 5.0, "LOW", 4, 2, 0.5)],
+    ]
+    checked_out = []
+
+    @contextmanager
+    def tracked_get_db_connection():
+        checked_out.append(True)
+        try:
+            yield mock_cursor.connection
+        finally:
+            checked_out.pop()
+
+    mock_cursor.connection.cursor.return_value = mock_cursor
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", tracked_get_db_connection)
+
+    for batch in stream_leaderboard(batch_size=1):
+        assert checked_out == [], "A connection was held across a yield."
+        if batch[0]['id'] == 2:
+            break
+
+    # The second query seeks past the last row of the first batch
+    assert mock_cursor.execute.call_args_list[1][0][1] == [3, 3, 1, 1]
+
+def test_stream_leaderboard_invalid_sort():
+    """Test that an invalid sort is rejected before any batch is requested."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: losses"):
+        stream_leaderboard("losses")
+
+def test_get_leaderboard_rank_from_sql(meals_table):
+    """Test computing a meal's rank with SQL when the leaderboard is not loaded."""
+    entry = get_leaderboard_rank(1, sort_by="wins")
+
+    assert entry['meal'] == "Pasta"
+    assert entry['rank'] == 2
+
+def test_get_leaderboard_rank_unranked(meals_table):
+    """Test error when asking for the rank of a meal that has never battled."""
+    with pytest.raises(ValueError, match="Meal with ID 4 is not on the leaderboard"):
+        get_leaderboard_rank(4)
+
 ######################################################
 #
 #    Clear Database
@@ -305,4 +785,166 @@ def test_update_meal_stats(mock_cursor):
 
     # Assert that the SQL query was executed with the correct arguments (meal ID)
     expected_arguments = (meal_id,)
-    assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
\ No newline at end of file
+    assert actual_arguments == expected_arguments, f"The SQL query arguments did not match. Expected {expected_arguments}, got {actual_arguments}."
+
+def test_record_battle_result(mock_cursor):
+    """Test recording the result of a battle for both meals in one transaction."""
+    # Simulate that both meals exist and are not deleted
+    mock_cursor.fetchall.return_value = [(1, False), (2, False)]
+
+    record_battle_result(1, 2)
+
+    expected_select_sql = normalize_whitespace("SELECT id, deleted FROM meals WHERE id IN (?, ?)")
+    expected_update_sql = normalize_whitespace("""
+        UPDATE meals SET battles = battles + 1, wins = wins + CASE WHEN id = ? THEN 1 ELSE 0 END WHERE id IN (?, ?)
+    """)
+
+    assert mock_cursor.execute.call_count == 3, "Expected BEGIN IMMEDIATE, a single SELECT and a single UPDATE."
+    assert mock_cursor.execute.call_args_list[0][0][0] == "BEGIN IMMEDIATE"
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[1][0][0]) == expected_select_sql
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[2][0][0]) == expected_update_sql
+    assert mock_cursor.execute.call_args_list[1][0][1] == (1, 2)
+    assert mock_cursor.execute.call_args_list[2][0][1] == (1, 1, 2)
+
+def test_record_battle_result_missing_meal(mock_cursor):
+    """Test error when one of the meals in the battle does not exist."""
+    mock_cursor.fetchall.return_value = [(1, False)]
+
+    with pytest.raises(ValueError, match="Meal with ID 999 not found"):
+        record_battle_result(1, 999)
+
+def test_record_battle_result_deleted_meal(mock_cursor):
+    """Test error when one of the meals in the battle has been deleted."""
+    mock_cursor.fetchall.return_value = [(1, True), (2, False)]
+
+    with pytest.raises(ValueError, match="Meal with ID 1 has been deleted"):
+        record_battle_result(1, 2)
+
+def test_record_battle_result_same_meal():
+    """Test error when a meal is recorded as battling itself."""
+    with pytest.raises(ValueError, match="Meal with ID 1 cannot battle itself"):
+        record_battle_result(1, 1)
+
+def test_record_battle_results(meals_table):
+    """Test recording many battles at once, aggregated into one update per meal."""
+    record_battle_results([(1, 2), (1, 3), (2, 3)])
+
+    rows = meals_table.execute("SELECT id, battles, wins FROM meals ORDER BY id").fetchall()
+    assert rows == [(1, 6, 5), (2, 12, 6), (3, 4, 2), (4, 0, 0)]
+
+def test_record_battle_results_deleted_meal(meals_table):
+    """Test that no result is recorded when one of the meals has been deleted."""
+    meals_table.execute("UPDATE meals SET deleted = 1 WHERE id = 3")
+    meals_table.commit()
+
+    with pytest.raises(ValueError, match="Meal with ID 3 has been deleted"):
+        record_battle_results([(1, 2), (2, 3)])
+
+    assert meals_table.execute("SELECT battles FROM meals WHERE id = 1").fetchone() == (4,)
+
+######################################################
+#
+#    Data version
+#
+######################################################
+
+def test_writes_bump_data_version(meals_table, mocker):
+    """Test that every committed write changes the data version."""
+    mocker.patch.dict('os.environ', {'SQL_CREATE_TABLE_PATH': os.path.join(SQL_DIR, 'create_meal_table.sql')})
+    writes = [
+        lambda: create_meal("Curry", "Indian", 8.0, "MED"),
+        lambda: create_meals([{'meal': "Ramen", 'cuisine': "Japanese", 'price': 9.0, 'difficulty': "HIGH"}]),
+        lambda: update_meal_stats(1, 'win'),
+        lambda: record_battle_result(1, 2),
+        lambda: record_battle_results([(2, 3)]),
+        lambda: delete_meal(4),
+        clear_meals,
+    ]
+
+    versions = [get_data_version()[0]]
+    for write in writes:
+        write()
+        versions.append(get_data_version()[0])
+
+    assert len(set(versions)) == len(versions)
+
+def test_reads_and_failed_writes_keep_data_version(in_memory_leaderboard):
+    """Test that reads and rejected writes leave the data version alone."""
+    version = get_data_version()[0]
+
+    get_meal_by_id(1)
+    get_leaderboard()
+    with pytest.raises(ValueError):
+        create_meal("Pasta", "Italian", 5.0, "LOW")
+    with pytest.raises(ValueError):
+        record_battle_result(1, 99)
+
+    assert get_data_version()[0] == version
+
+def test_leaderboard_write_bumps_data_version(in_memory_leaderboard):
+    """Test that writes going through the in-memory leaderboard change the data version."""
+    version, _ = get_data_version()
+
+    record_battle_result(1, 2)
+
+    assert get_data_version()[0] != version
+
+######################################################
+#
+#    Migrations
+#
+######################################################
+
+def test_migrate_meals_table(sqlite_db):
+    """Test that an old meals table gets the generated columns and the indexes."""
+    sqlite_db.executescript("""
+        CREATE TABLE meals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meal TEXT NOT NULL UNIQUE,
+            cuisine TEXT NOT NULL,
+            price REAL NOT NULL,
+            difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+            battles INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            deleted BOOLEAN DEFAULT FALSE
+        );
+        INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES ('Pasta', 'Italian', 10.0, 'LOW', 4, 3);
+    """)
+
+    migrate_meals_table()
+    # Running it again must be a no-op
+    migrate_meals_table()
+
+    assert sqlite_db.execute("SELECT win_pct, battle_score FROM meals").fetchone() == (0.75, 67.0)
+
+    indexes = {row[1] for row in sqlite_db.execute("PRAGMA index_list(meals)")}
+    assert {'idx_meals_leaderboard_wins', 'idx_meals_leaderboard_win_pct', 'idx_meals_battle_score'} <= indexes
+
+def test_battle_score_column_matches_meal(meals_table):
+    """Test that the generated battle_score column agrees with Meal.battle_score."""
+    for meal_id, meal, cuisine, price, difficulty, battle_score in meals_table.execute(
+            "SELECT id, meal, cuisine, price, difficulty, battle_score FROM meals"):
+        assert Meal(meal_id, meal, cuisine, price, difficulty).battle_score == battle_score
+
+def test_leaderboard_uses_index(sqlite_db, mocker):
+    """Test that the leaderboard query is served by the partial index instead of a scan and sort."""
+    with open(os.path.join(SQL_DIR, 'create_meal_table.sql')) as fh:
+        sqlite_db.executescript(fh.read())
+
+    # Capture the SQL that get_leaderboard actually runs
+    statements = []
+    sqlite_db.set_trace_callback(statements.append)
+
+    @contextmanager
+    def traced_get_db_connection():
+        yield sqlite_db
+
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection", traced_get_db_connection)
+
+    get_leaderboard(sort_by="wins")
+    sqlite_db.set_trace_callback(None)
+
+    query = statements[-1]
+    plan = " ".join(row[3] for row in sqlite_db.execute("EXPLAIN QUERY PLAN " + query))
+    assert "USING INDEX idx_meals_leaderboard_wins" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,145 @@
+import logging
+from logging.handlers import QueueListener
+import queue
+import threading
+
+import pytest
+
+from meal_max.utils import logger as logger_utils
+from meal_max.utils.logger import BoundedQueueHandler, configure_logger, parse_log_levels, resolve_log_level
+
+
+class ListHandler(logging.Handler):
+    """A handler collecting the formatted records it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_logger(handler, name="test_logger"):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def test_queue_handler_hands_records_to_listener():
+    """Test that queued records are written by the listener thread."""
+    handler = BoundedQueueHandler(queue.Queue(10))
+    target = ListHandler()
+    listener = QueueListener(handler.queue, target)
+    listener.start()
+
+    make_logger(handler).info("Meal %s added", "Pizza")
+    listener.stop()
+
+    assert target.lines == ["Meal Pizza added"]
+    assert handler.stats()['enqueued'] == 1
+
+def test_queue_handler_formats_in_listener_thread():
+    """Test that the message is formatted by the listener, not by the thread that logged it."""
+    formatted_in = []
+
+    class Name:
+        def __str__(self):
+            formatted_in.append(threading.current_thread())
+            return "Pizza"
+
+    handler = BoundedQueueHandler(queue.Queue(10))
+    target = ListHandler()
+    listener = QueueListener(handler.queue, target)
+    listener.start()
+
+    make_logger(handler).info("Meal %s added", Name())
+    listener.stop()
+
+    assert target.lines == ["Meal Pizza added"]
+    assert formatted_in and threading.current_thread() not in formatted_in
+
+def test_queue_handler_drops_when_full():
+    """Test that records are dropped and counted, rather than blocking, when the queue is full."""
+    handler = BoundedQueueHandler(queue.Queue(2), policy="drop")
+    logger = make_logger(handler)
+
+    for i in range(5):
+        logger.info("line %d", i)
+
+    stats = handler.stats()
+    assert stats['buffered'] == 2
+    assert stats['enqueued'] == 2
+    assert stats['dropped'] == 3
+
+def test_queue_handler_blocks_until_space():
+    """Test that the block policy waits for the listener to make space instead of dropping."""
+    handler = BoundedQueueHandler(queue.Queue(1), policy="block", timeout=5)
+    logger = make_logger(handler)
+    logger.info("first")
+
+    consumer = threading.Timer(0.05, handler.queue.get)
+    consumer.start()
+    logger.info("second")
+    consumer.join()
+
+    assert handler.stats()['dropped'] == 0
+    assert handler.queue.get_nowait().getMessage() == "second"
+
+def test_queue_handler_block_timeout():
+    """Test that the block policy drops the record once the timeout passes."""
+    handler = BoundedQueueHandler(queue.Queue(1), policy="block", timeout=0.01)
+    logger = make_logger(handler)
+
+    logger.info("first")
+    logger.info("second")
+
+    assert handler.stats()['dropped'] == 1
+
+def test_queue_handler_invalid_policy():
+    """Test error when the queue policy is unknown."""
+    with pytest.raises(ValueError, match="Invalid log queue policy: wait"):
+        BoundedQueueHandler(queue.Queue(1), policy="wait")
+
+######################################################
+#
+#    Logger configuration
+#
+######################################################
+
+def test_configure_logger_is_idempotent():
+    """Test that configuring a logger repeatedly never adds handlers."""
+    logger = logging.getLogger("meal_max.tests.idempotent")
+    configure_logger(logger)
+    root_handlers = list(logging.getLogger().handlers)
+
+    for _ in range(3):
+        configure_logger(logger)
+
+    assert logger.handlers == []
+    assert logger.propagate
+    assert logging.getLogger().handlers == root_handlers
+    assert logger_utils.get_root_handler() in root_handlers
+
+def test_parse_log_levels():
+    """Test parsing per-logger levels from the environment format."""
+    levels = parse_log_levels(" meal_max.models=info, asgi=WARNING ,")
+
+    assert levels == {'meal_max.models': logging.INFO, 'asgi': logging.WARNING}
+
+@pytest.mark.parametrize("spec", ["meal_max.models", "meal_max.models=LOUD", "=INFO"])
+def test_parse_log_levels_invalid(spec):
+    """Test error when a level setting is malformed or names an unknown level."""
+    with pytest.raises(ValueError, match="Invalid log level setting"):
+        parse_log_levels(spec)
+
+def test_resolve_log_level(mocker):
+    """Test that the closest configured ancestor wins, falling back to LOG_LEVEL."""
+    mocker.patch.object(logger_utils, "_levels", parse_log_levels("meal_max.models=WARNING,meal_max.models.kitchen_model=DEBUG"))
+    mocker.patch.object(logger_utils, "LOG_LEVEL", "INFO")
+
+    assert resolve_log_level("meal_max.models.kitchen_model") == logging.DEBUG
+    assert resolve_log_level("meal_max.models.battle_model") == logging.WARNING
+    assert resolve_log_level("meal_max.utils.sql_utils") == logging.INFO
@@ -1,7 +1,18 @@
+import asyncio
+
 import pytest
 import requests
 
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.random_utils import (
+    CircuitBreaker,
+    EntropyPool,
+    LatencyHistogram,
+    LocalProvider,
+    RandomOrgProvider,
+    RandomProvider,
+    draw_random_async,
+    get_random,
+)
 
 
 RANDOM_NUMBER = 42
@@ -9,12 +20,12 @@ NUM_MEALS = 100
 
 @pytest.fixture
 def mock_random_org(mocker):
-    # Patch the requests.get call
-    # requests.get returns an object, which we have replaced with a mock object
+    # Patch the requests.Session.get call
+    # Session.get returns an object, which we have replaced with a mock object
     mock_response = mocker.Mock()
     # We are giving that object a text attribute
     mock_response.text = f"{RANDOM_NUMBER}"
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
     return mock_response
 
 
@@ -26,18 +37,18 @@ def test_get_random(mock_random_org):
     assert result == RANDOM_NUMBER, f"Expected random number {RANDOM_NUMBER}, but got {result}"
 
     # Ensure that the correct URL was called
-    requests.get.assert_called_once_with('https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new', timeout=5)
+    requests.Session.get.assert_called_once_with('https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new', timeout=5)
 
 def test_get_random_request_failure(mocker):
     """Simulate  a request failure."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Connection error"))
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.RequestException("Connection error"))
 
     with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
         get_random()
 
 def test_get_random_timeout(mocker):
     """Simulate  a timeout."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.Timeout)
 
     with pytest.raises(RuntimeError, match="Request to random.org timed out."):
         get_random()
@@ -47,4 +58,177 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random()
\ No newline at end of file
+        get_random()
+
+######################################################
+#
+#    Providers
+#
+######################################################
+
+class StubProvider(RandomProvider):
+    """A provider returning a fixed sequence of numbers, or failing on demand."""
+
+    name = "stub"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def fetch(self, count):
+        self.calls.append(count)
+        if self.fail:
+            raise RuntimeError("Request to random.org timed out.")
+        return [i / 100 for i in range(count)]
+
+
+def test_random_org_provider_fetches_in_bulk(mock_random_org):
+    """Test fetching many random numbers with a single request."""
+    mock_random_org.text = "0.12\n0.34\n0.56\n"
+
+    numbers = RandomOrgProvider(url="http://localhost:8000/", timeout=1, retries=0).fetch(3)
+
+    assert numbers == [0.12, 0.34, 0.56]
+    requests.Session.get.assert_called_once_with('http://localhost:8000/?num=3&dec=2&col=1&format=plain&rnd=new', timeout=1)
+
+def test_random_org_provider_short_response(mock_random_org):
+    """Test error when random.org returns fewer numbers than requested."""
+    mock_random_org.text = "0.12\n"
+
+    with pytest.raises(ValueError, match="expected 2 numbers, got 1"):
+        RandomOrgProvider().fetch(2)
+
+def test_local_provider():
+    """Test that the local provider returns numbers in [0, 1) with two decimals."""
+    numbers = LocalProvider().fetch(500)
+
+    assert len(numbers) == 500
+    assert all(0 <= number < 1 and round(number, 2) == number for number in numbers)
+
+def test_random_org_provider_retries(mocker, mock_random_org):
+    """Test that a failed request is retried with backoff before giving up."""
+    mock_random_org.text = "0.12\n"
+    mocker.patch("requests.Session.get", side_effect=[requests.exceptions.ConnectionError("reset"), mock_random_org])
+    sleep = mocker.patch("meal_max.utils.random_utils.time.sleep")
+
+    provider = RandomOrgProvider(retries=2, backoff=0.1)
+
+    assert provider.fetch(1) == [0.12]
+    assert requests.Session.get.call_count == 2
+    assert 0 <= sleep.call_args[0][0] <= 0.1
+    assert provider.stats()['latency']['count'] == 2
+
+def test_random_org_provider_circuit_breaker(mocker):
+    """Test that repeated failures open the breaker so later calls fail fast."""
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.ConnectionError("refused"))
+    provider = RandomOrgProvider(retries=0, breaker=CircuitBreaker(threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="Request to random.org failed"):
+            provider.fetch(1)
+
+    with pytest.raises(RuntimeError, match="Circuit breaker for random.org is open."):
+        provider.fetch(1)
+    assert requests.Session.get.call_count == 2
+    assert provider.stats()['circuit_breaker'] == 'open'
+
+def test_circuit_breaker_half_open(mocker):
+    """Test that the breaker lets a single trial call through after the reset timeout."""
+    clock = mocker.patch("meal_max.utils.random_utils.time.monotonic", return_value=0.0)
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.return_value = 11.0
+    assert breaker.allow()
+    assert not breaker.allow(), "Only one trial call may run while half open."
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+def test_latency_histogram():
+    """Test that latencies are counted in the right buckets."""
+    histogram = LatencyHistogram(buckets=[10, 100])
+    histogram.record(0.005)
+    histogram.record(0.05)
+    histogram.record(2.0)
+
+    stats = histogram.stats()
+    assert stats['buckets'] == {'le_10': 1, 'le_100': 1, 'le_inf': 1}
+    assert stats['count'] == 3
+    assert stats['max_ms'] == 2000.0
+
+######################################################
+#
+#    Entropy Pool
+#
+######################################################
+
+def test_entropy_pool_refills_in_bulk():
+    """Test that the pool serves many numbers from a single provider request."""
+    provider = StubProvider()
+    pool = EntropyPool(provider, batch_size=50, low_water=0)
+
+    numbers = [pool.get() for _ in range(49)]
+
+    assert numbers == [i / 100 for i in range(49)]
+    assert provider.calls == [50]
+    assert pool.stats()['served'] == 49
+
+def test_entropy_pool_background_refill():
+    """Test that dropping below the low-water mark refills the pool in the background."""
+    provider = StubProvider()
+    pool = EntropyPool(provider, batch_size=10, low_water=5)
+
+    for _ in range(5):
+        pool.get()
+    pool._refill_thread.join(timeout=1)
+
+    assert provider.calls == [10, 10]
+    assert pool.stats()['buffered'] == 15
+
+def test_entropy_pool_fallback():
+    """Test that the fallback provider fills the pool when the provider fails."""
+    fallback = StubProvider()
+    pool = EntropyPool(StubProvider(fail=True), fallback=fallback, batch_size=10, low_water=0)
+
+    assert pool.get() == 0.0
+
+    stats = pool.stats()
+    assert stats['failures'] == 1
+    assert stats['refills'] == {'stub': 1}
+
+def test_entropy_pool_get_nowait():
+    """Test that get_nowait serves buffered numbers and returns None instead of refilling."""
+    provider = StubProvider()
+    pool = EntropyPool(provider, batch_size=10, low_water=0)
+
+    assert pool.get_nowait() is None
+    assert provider.calls == []
+
+    pool.get()
+    assert pool.get_nowait() == 0.01
+    assert pool.stats()['served'] == 2
+
+def test_draw_random_async(mocker):
+    """Test that draw_random_async refills an empty pool off the event loop, then serves from the buffer."""
+    provider = StubProvider()
+    mocker.patch("meal_max.utils.random_utils.get_entropy_pool", return_value=EntropyPool(provider, batch_size=10, low_water=0))
+
+    async def draw_twice():
+        return [await draw_random_async(), await draw_random_async()]
+
+    assert asyncio.run(draw_twice()) == [0.0, 0.01]
+    assert provider.calls == [10]
+
+def test_entropy_pool_no_fallback():
+    """Test error when the provider fails and there is no fallback."""
+    pool = EntropyPool(StubProvider(fail=True), batch_size=10)
+
+    with pytest.raises(RuntimeError, match="Request to random.org timed out."):
+        pool.get()
+
+def test_entropy_pool_random_org_batch_limit():
+    """Test error when asking random.org for more numbers than it serves per request."""
+    with pytest.raises(ValueError, match="random.org serves at most 10000 numbers."):
+        EntropyPool(RandomOrgProvider(), batch_size=20000)
@@ -0,0 +1,136 @@
+from contextlib import contextmanager
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.simulation_model import (
+    load_meal_arrays,
+    simulate,
+    simulate_pairs,
+    win_probabilities,
+    win_probability_matrix,
+)
+
+
+SQL_DIR = os.path.join(os.path.dirname(__file__), '..', 'sql')
+
+@pytest.fixture
+def meals():
+    """Fixture providing meals of every difficulty."""
+    return [
+        Meal(1, 'Pasta', 'Italian', 12.5, 'MED'),
+        Meal(2, 'Sushi', 'Japanese', 20.0, 'HIGH'),
+        Meal(3, 'Tacos', 'Mexican', 3.0, 'LOW'),
+        Meal(4, 'Salad', 'Greek', 7.25, 'LOW'),
+    ]
+
+@pytest.fixture
+def meals_table(mocker, tmp_path, meals):
+    """Fixture providing a real meals table that simulation_model connects to."""
+    db_path = str(tmp_path / "meal_max.db")
+
+    @contextmanager
+    def sqlite_get_db_connection():
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    mocker.patch("meal_max.models.simulation_model.get_db_connection", sqlite_get_db_connection)
+
+    conn = sqlite3.connect(db_path)
+    with open(os.path.join(SQL_DIR, 'create_meal_table.sql')) as fh:
+        conn.executescript(fh.read())
+    conn.executemany(
+        "INSERT INTO meals (id, meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?, ?)",
+        [(meal.id, meal.meal, meal.cuisine, meal.price, meal.difficulty) for meal in meals]
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_scores_match_battle_model(meals_table, meals):
+    """Test the vectorized scores are the ones BattleModel computes one meal at a time."""
+    arrays = load_meal_arrays()
+
+    expected = [BattleModel().get_battle_score(meal) for meal in meals]
+    np.testing.assert_allclose(arrays.scores(), expected)
+
+def test_load_meal_arrays_order(meals_table):
+    """Test meals are loaded in the requested order."""
+    arrays = load_meal_arrays([3, 1])
+    assert arrays.ids.tolist() == [3, 1]
+    assert arrays.names == ['Tacos', 'Pasta']
+
+def test_load_meal_arrays_deleted_meal(meals_table):
+    """Test error when a requested meal has been deleted."""
+    meals_table.execute("UPDATE meals SET deleted = 1 WHERE id = 2")
+    meals_table.commit()
+
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        load_meal_arrays([1, 2])
+    assert load_meal_arrays().ids.tolist() == [1, 3, 4]
+
+def test_win_probabilities():
+    """Test the win chance is the normalized delta, capped at 1."""
+    probabilities = win_probabilities(np.array([50.0, 10.0, 300.0]), np.array([10.0, 50.0, 0.0]))
+    np.testing.assert_allclose(probabilities, [0.4, 0.4, 1.0])
+
+def test_win_probability_matrix():
+    """Test the matrix holds the win chance of every ordered pairing."""
+    matrix = win_probability_matrix(np.array([0.0, 20.0, 50.0]))
+    assert matrix.shape == (3, 3)
+    np.testing.assert_allclose(np.diag(matrix), 0.0)
+    assert matrix[0, 2] == pytest.approx(0.5)
+    assert matrix[1, 2] == pytest.approx(0.3)
+
+def test_simulate_pairs_converges():
+    """Test simulated win rates approach the exact probabilities."""
+    wins = simulate_pairs(np.array([30.0, 90.0]), np.array([10.0, 0.0]), 100000, np.random.default_rng(0))
+    np.testing.assert_allclose(wins / 100000, [0.2, 0.9], atol=0.01)
+
+def test_simulate(meals_table):
+    """Test simulating every pair of meals."""
+    result = simulate(trials=500, seed=1)
+
+    assert result['meals'] == 4
+    assert result['pairs'] == 6
+    assert len(result['standings']) == 4
+    assert all(entry['bouts'] == 1500 for entry in result['standings'])
+    assert sum(entry['simulated_wins'] for entry in result['standings']) == 6 * 500
+    assert sum(entry['expected_wins'] for entry in result['standings']) == pytest.approx(6 * 500)
+    assert simulate(trials=500, seed=1) == result, "Seeded simulations should be reproducible."
+
+def test_simulate_pairs_only_loads_paired_meals(meals_table):
+    """Test explicit pairings only involve the meals they name."""
+    result = simulate(pairs=[(1, 2), (2, 1)], trials=10)
+
+    assert result['meals'] == 2
+    assert {entry['id'] for entry in result['standings']} == {1, 2}
+
+def test_simulate_invalid_trials():
+    """Test error when the number of trials is not positive."""
+    with pytest.raises(ValueError, match="Invalid number of trials: 0"):
+        simulate(trials=0)
+
+def test_simulate_duplicate_meals():
+    """Test error when a meal is listed more than once."""
+    with pytest.raises(ValueError, match="Each meal can only be simulated once."):
+        simulate([1, 1])
+
+def test_simulate_pair_with_itself():
+    """Test error when a meal is paired with itself."""
+    with pytest.raises(ValueError, match="cannot battle itself"):
+        simulate(pairs=[(1, 1)])
+
+def test_simulate_too_many_pairs(meals_table, mocker):
+    """Test error when the catalog would produce too many pairings."""
+    mocker.patch("meal_max.models.simulation_model.SIMULATION_MAX_PAIRS", 5)
+    with pytest.raises(ValueError, match="at most 5 pairings"):
+        simulate()
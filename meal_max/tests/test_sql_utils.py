@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+
+import pytest
+
+from meal_max.utils.sql_utils import ConnectionPool, apply_db_profile
+
+
+######################################################
+#
+#    Fixtures
+#
+######################################################
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fixture providing the path to a fresh SQLite database file."""
+    return str(tmp_path / "meal_max.db")
+
+@pytest.fixture
+def profile():
+    """Fixture providing a database profile with non-default values."""
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -4000,
+        'mmap_size': 1048576,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 2500,
+    }
+
+@pytest.fixture
+def pool(db_path):
+    """Fixture providing a small connection pool that is closed after each test."""
+    pool = ConnectionPool(db_path, size=2, timeout=0.1)
+    yield pool
+    pool.close()
+
+######################################################
+#
+#    Connection Pool
+#
+######################################################
+
+def test_pool_reuses_connections(pool):
+    """Test that a released connection is handed out again instead of opening a new one."""
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+
+    stats = pool.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert stats['open'] == 1
+
+def test_pool_invalid_size(db_path):
+    """Test error when creating a pool without any connections."""
+    with pytest.raises(ValueError, match="Invalid pool size: 0. Pool size must be at least 1."):
+        ConnectionPool(db_path, size=0)
+
+def test_pool_timeout_when_exhausted(pool):
+    """Test error when every connection is checked out and none is returned in time."""
+    pool.acquire()
+    pool.acquire()
+
+    with pytest.raises(RuntimeError, match="Timed out waiting for a database connection."):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['timeouts'] == 1
+
+def test_pool_waits_for_release(pool):
+    """Test that a waiting thread receives a connection released by another thread."""
+    pool.timeout = 5
+    first = pool.acquire()
+    pool.acquire()
+
+    timer = threading.Timer(0.05, pool.release, args=(first,))
+    timer.start()
+
+    assert pool.acquire() is first
+    timer.join()
+    assert pool.stats()['waits'] == 1
+
+def test_pool_resets_on_release(pool):
+    """Test that uncommitted work is rolled back when a connection is returned."""
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE meals (meal TEXT)")
+    conn.commit()
+    conn.execute("INSERT INTO meals (meal) VALUES ('eggs')")
+    assert conn.in_transaction
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM meals").fetchone()[0] == 0
+
+def test_pool_discards_unhealthy_connection(pool):
+    """Test that a connection failing the health check is replaced on checkout."""
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+
+    new_conn = pool.acquire()
+    assert new_conn is not conn
+    assert pool.stats()['discarded'] == 1
+
+def test_pool_closed(pool):
+    """Test error when checking out a connection from a closed pool."""
+    conn = pool.acquire()
+    pool.close()
+    pool.release(conn)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(RuntimeError, match="Connection pool is closed."):
+        pool.acquire()
+
+######################################################
+#
+#    Database Profile
+#
+######################################################
+
+def test_apply_db_profile(db_path, profile):
+    """Test that every setting of the profile is applied to the connection."""
+    conn = sqlite3.connect(db_path)
+    apply_db_profile(conn, profile)
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4000
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 2500
+    conn.close()
+
+def test_apply_db_profile_invalid_value(db_path, profile):
+    """Test error when the profile contains a value that is not a valid pragma setting."""
+    profile['synchronous'] = 'SOMETIMES; DROP TABLE meals'
+    conn = sqlite3.connect(db_path)
+
+    with pytest.raises(ValueError, match="Invalid synchronous setting"):
+        apply_db_profile(conn, profile)
+    conn.close()
+
+def test_pool_applies_db_profile(db_path, profile):
+    """Test that connections handed out by the pool have the profile applied."""
+    pool = ConnectionPool(db_path, size=1, profile=profile)
+    conn = pool.acquire()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 2500
+    pool.release(conn)
+    pool.close()
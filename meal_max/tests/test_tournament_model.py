@@ -0,0 +1,154 @@
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import Tournament, run_tournament
+
+
+@pytest.fixture
+def meals():
+    """Fixture providing eight meals with distinct battle scores."""
+    return [Meal(i, f'Meal {i}', 'French', 10.0 + i, 'LOW') for i in range(1, 9)]
+
+@pytest.fixture
+def mock_get_meals_by_ids(mocker, meals):
+    """Mock get_meals_by_ids to find the sample meals."""
+    by_id = {meal.id: meal for meal in meals}
+    return mocker.patch("meal_max.models.tournament_model.get_meals_by_ids", side_effect=lambda meal_ids: {
+        'found': [by_id[meal_id] for meal_id in meal_ids if meal_id in by_id],
+        'deleted': [],
+        'missing': [meal_id for meal_id in meal_ids if meal_id not in by_id],
+    })
+
+@pytest.fixture
+def mock_record_battle_results(mocker):
+    """Mock record_battle_results so no database is needed."""
+    return mocker.patch("meal_max.models.tournament_model.record_battle_results")
+
+@pytest.fixture(autouse=True)
+def mock_draw_random(mocker):
+    """Mock the random draw so the first combatant never wins by chance."""
+    return mocker.patch("meal_max.models.tournament_model.draw_random", return_value=1.0)
+
+
+##################################################
+# Formats
+##################################################
+
+def test_single_elimination(meals):
+    """Test a full bracket of eight meals takes three rounds and seven bouts."""
+    tournament = Tournament(meals)
+    champion = tournament.run_single_elimination()
+
+    assert [len(bouts) for bouts in tournament.rounds] == [4, 2, 1]
+    assert len(tournament.results) == 7
+    assert tournament.rounds[0][0] == {'meal_1': 1, 'meal_2': 8, 'winner': 8}
+    assert champion.id in {meal.id for meal in meals}
+
+def test_single_elimination_byes(meals):
+    """Test the top seeds get byes when the field is not a power of two."""
+    tournament = Tournament(meals[:5])
+    tournament.run_single_elimination()
+
+    assert [bout['bye'] for bout in tournament.rounds[0] if 'bye' in bout] == [1, 2, 3]
+    assert [bout for bout in tournament.rounds[0] if 'bye' not in bout] == [{'meal_1': 4, 'meal_2': 5, 'winner': 5}]
+    assert len(tournament.results) == 4, "A knockout of n meals always has n - 1 bouts."
+
+def test_single_elimination_seeding(mock_draw_random):
+    """Test that when the higher seed always wins, seeds 1 and 2 first meet in the final."""
+    mock_draw_random.return_value = 0.0
+    meals = [Meal(i, f'Meal {i}', 'French', 10.0 + i, 'LOW') for i in range(1, 17)]
+    tournament = Tournament(meals)
+    champion = tournament.run_single_elimination()
+
+    assert [[(bout['meal_1'], bout['meal_2']) for bout in bouts] for bouts in tournament.rounds[1:]] == [
+        [(1, 8), (4, 5), (2, 7), (3, 6)],
+        [(1, 4), (2, 3)],
+        [(1, 2)],
+    ]
+    assert champion.id == 1
+
+def test_round_robin(meals):
+    """Test every pair of meals meets exactly once."""
+    tournament = Tournament(meals[:5])
+    tournament.run_round_robin()
+
+    pairs = {frozenset(result) for result in tournament.results}
+    assert len(tournament.results) == 10
+    assert len(pairs) == 10
+    assert len(tournament.rounds) == 5
+    for bouts in tournament.rounds:
+        assert sum('bye' in bout for bout in bouts) == 1
+
+def test_swiss(meals):
+    """Test a Swiss tournament avoids rematches and plays every meal each round."""
+    tournament = Tournament(meals)
+    tournament.run_swiss()
+
+    assert len(tournament.rounds) == 3
+    assert all(len(bouts) == 4 for bouts in tournament.rounds)
+    assert len({frozenset(result) for result in tournament.results}) == 12
+
+def test_swiss_odd_field(meals):
+    """Test a different meal sits out each round of an odd Swiss tournament."""
+    tournament = Tournament(meals[:5])
+    tournament.run_swiss(rounds=4)
+
+    byes = [bout['bye'] for bouts in tournament.rounds for bout in bouts if 'bye' in bout]
+    assert len(byes) == 4
+    assert len(set(byes)) == 4
+
+def test_standings(meals):
+    """Test standings are ordered by wins."""
+    tournament = Tournament(meals[:4])
+    tournament.run_round_robin()
+
+    wins = [entry['wins'] for entry in tournament.standings()]
+    assert wins == sorted(wins, reverse=True)
+    assert sum(wins) == 6
+
+
+##################################################
+# run_tournament
+##################################################
+
+def test_run_tournament(meals, mock_get_meals_by_ids, mock_record_battle_results):
+    """Test a tournament loads its meals in one lookup and records all of its results in a single batch."""
+    result = run_tournament([meal.id for meal in meals], 'round_robin')
+
+    assert result['format'] == 'round_robin'
+    assert result['champion']['id'] == result['standings'][0]['id']
+    mock_get_meals_by_ids.assert_called_once_with([meal.id for meal in meals])
+    mock_record_battle_results.assert_called_once()
+    assert len(mock_record_battle_results.call_args[0][0]) == 28
+
+def test_run_tournament_missing_meal(mock_get_meals_by_ids, mock_record_battle_results):
+    """Test error when an entrant does not exist, before any bout is fought."""
+    with pytest.raises(ValueError, match="Meal with ID 42 not found"):
+        run_tournament([1, 42])
+
+    mock_record_battle_results.assert_not_called()
+
+def test_run_tournament_invalid_format():
+    """Test error when the tournament format is unknown."""
+    with pytest.raises(ValueError, match="Invalid tournament format: ladder"):
+        run_tournament([1, 2], 'ladder')
+
+def test_run_tournament_too_few_meals():
+    """Test error when fewer than two meals enter."""
+    with pytest.raises(ValueError, match="at least two meals"):
+        run_tournament([1])
+
+def test_run_tournament_duplicate_meals():
+    """Test error when a meal enters twice."""
+    with pytest.raises(ValueError, match="only enter a tournament once"):
+        run_tournament([1, 2, 1])
+
+def test_run_tournament_rounds_outside_swiss():
+    """Test error when rounds are given for a format other than Swiss."""
+    with pytest.raises(ValueError, match="Swiss"):
+        run_tournament([1, 2], 'round_robin', rounds=3)
+
+def test_run_tournament_too_many_rounds():
+    """Test error when a Swiss tournament asks for more rounds than there are opponents."""
+    with pytest.raises(ValueError, match="A Swiss tournament of 4 meals can have at most 3 rounds."):
+        run_tournament([1, 2, 3, 4], fmt='swiss', rounds=4)